@@ -0,0 +1,106 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created by the former Base.metadata.create_all at startup
+    # already have this schema; adopt them instead of failing. Offline (--sql)
+    # scripts can't inspect the database, so they are for new databases only
+    if not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table('quizzes'):
+        return
+
+    op.create_table(
+        'quizzes',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('invite_code', sa.String(), nullable=False),
+        sa.Column('status', sa.Enum('DRAFT', 'WAITING', 'IN_PROGRESS', 'COMPLETED', name='quizstatus'), nullable=False),
+        sa.Column('current_question_order', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_quizzes_invite_code', 'quizzes', ['invite_code'], unique=True)
+
+    op.create_table(
+        'questions',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('quiz_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('order', sa.Integer(), nullable=False),
+        sa.Column('text', sa.String(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('is_last', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'teams',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('quiz_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('joined_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'question_options',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('question_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('text', sa.String(), nullable=False),
+        sa.Column('order', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'participants',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('team_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('first_name', sa.String(), nullable=False),
+        sa.Column('last_name', sa.String(), nullable=False),
+        sa.Column('contact_info', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('profession', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['team_id'], ['teams.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'answers',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('participant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('question_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('text_answer', sa.String(), nullable=True),
+        sa.Column('selected_options', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('answered_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['participant_id'], ['participants.id']),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('answers')
+    op.drop_table('participants')
+    op.drop_table('question_options')
+    op.drop_table('teams')
+    op.drop_table('questions')
+    op.drop_index('ix_quizzes_invite_code', table_name='quizzes')
+    op.drop_table('quizzes')
+    sa.Enum(name='quizstatus').drop(op.get_bind())
@@ -0,0 +1,44 @@
+"""One answer per participant per question
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:05:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The answer upsert (ON CONFLICT (participant_id, question_id)) needs this
+    # constraint in every ingest mode. Offline (--sql) scripts can't inspect
+    # the database and always add it
+    if not context.is_offline_mode() and 'uq_answers_participant_question' in {
+        constraint['name'] for constraint in sa.inspect(op.get_bind()).get_unique_constraints('answers')
+    }:
+        return
+
+    # Keep only the latest answer of each participant per question
+    op.execute(
+        """
+        DELETE FROM answers a
+        USING answers b
+        WHERE a.participant_id = b.participant_id
+          AND a.question_id = b.question_id
+          AND (a.answered_at, a.id) < (b.answered_at, b.id)
+        """
+    )
+    op.create_unique_constraint(
+        'uq_answers_participant_question', 'answers', ['participant_id', 'question_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_answers_participant_question', 'answers', type_='unique')
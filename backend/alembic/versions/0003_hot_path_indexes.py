@@ -0,0 +1,38 @@
+"""Hot-path indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_answers_question_id', 'answers', ['question_id']),
+    ('ix_questions_quiz_id_order', 'questions', ['quiz_id', 'order']),
+    ('ix_question_options_question_id', 'question_options', ['question_id']),
+    ('ix_teams_quiz_id', 'teams', ['quiz_id']),
+    ('ix_participants_team_id', 'participants', ['team_id']),
+]
+
+
+def upgrade() -> None:
+    # Offline (--sql) scripts can't inspect the database and create every index
+    inspector = None if context.is_offline_mode() else sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector is None or name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
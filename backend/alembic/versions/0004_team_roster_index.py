@@ -0,0 +1,34 @@
+"""Index teams in roster order
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves both quiz lookups and keyset pagination on (joined_at, id). Offline
+    # (--sql) scripts can't inspect the database and assume the schema of 0003
+    if context.is_offline_mode():
+        indexes = {'ix_teams_quiz_id'}
+    else:
+        indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('teams')}
+    if 'ix_teams_quiz_id_joined_at_id' not in indexes:
+        op.create_index('ix_teams_quiz_id_joined_at_id', 'teams', ['quiz_id', 'joined_at', 'id'])
+    if 'ix_teams_quiz_id' in indexes:
+        op.drop_index('ix_teams_quiz_id', table_name='teams')
+
+
+def downgrade() -> None:
+    op.create_index('ix_teams_quiz_id', 'teams', ['quiz_id'])
+    op.drop_index('ix_teams_quiz_id_joined_at_id', table_name='teams')
@@ -0,0 +1,24 @@
+"""Answer counts of generated options
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('question_options', sa.Column('answer_count', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('question_options', 'answer_count')
@@ -1,25 +1,94 @@
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import quiz, team, host, answer, statistics
+from app.routers import quiz, team, host, answer, statistics, export, events
 from app.websocket import handlers
-from app.database import engine, Base
+from app.database import async_engine
+from app.services.quiz_cache import quiz_cache
+from app.services.question_cache import RenderedQuestion, question_cache
+from app.services.answer_service import answer_ingestor
+from app.services.live_statistics import live_statistics
+from app.services.answer_tally import answer_tally
+import json
 import logging
 import os
+from typing import Optional
+from uuid import UUID
 
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Quiz System API", version="1.0.0")
 
-# Create database tables
+# The schema is managed by Alembic: run `alembic upgrade head` before starting the app
+
+
+# Quiz status and current question only change together with one of these events.
+# Dropping the cached state when a worker receives one keeps every worker's cache coherent.
+QUIZ_STATE_EVENTS = {"quiz_started", "question_changed", "quiz_completed", "team_joined", "teams_imported"}
+
+
+def invalidate_quiz_state(envelope: dict):
+    if envelope.get("type") not in QUIZ_STATE_EVENTS:
+        return
+    invite_code = envelope["invite_code"]
+    quiz_cache.invalidate(invite_code)
+    question_cache.invalidate(invite_code)
+    # A frame carrying the new current question primes the cache for the GETs that follow it
+    question = (envelope.get("embed") or {}).get("question")
+    if question is not None:
+        question_cache.prime(invite_code, json.loads(question)["order"], RenderedQuestion.from_body(question.encode()))
+
+
+def resync_after_gap():
+    # The lost broadcasts may have included invalidations
+    quiz_cache.clear()
+    question_cache.clear()
+    handlers.start_resync()
+
+
+@app.on_event("startup")
+async def start_broadcast_backend():
+    handlers.manager.add_delivery_listener(invalidate_quiz_state)
+    handlers.manager.add_gap_listener(resync_after_gap)
+    # Other workers write answers too, so this worker's tallies would miss them
+    answer_tally.exclusive = not handlers.manager.backend.distributed
+    await handlers.manager.start()
+
+
+@app.on_event("startup")
+async def start_answer_ingestor():
+    await answer_ingestor.start()
+
+
 @app.on_event("startup")
-def create_tables():
-    try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.error(f"Error creating database tables: {e}")
-        # Don't fail startup if tables already exist
-        pass
+async def start_live_statistics():
+    await live_statistics.start()
+
+
+@app.on_event("shutdown")
+async def stop_answer_ingestor():
+    # Write queued answers before the engine goes away
+    await answer_ingestor.stop()
+
+
+@app.on_event("shutdown")
+async def stop_progress_aggregator():
+    await handlers.progress_aggregator.stop()
+
+
+@app.on_event("shutdown")
+async def stop_live_statistics():
+    await live_statistics.stop()
+
+
+@app.on_event("shutdown")
+async def stop_broadcast_backend():
+    await handlers.manager.stop()
+
+
+@app.on_event("shutdown")
+async def dispose_engine():
+    await async_engine.dispose()
+
 
 # CORS middleware
 frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
@@ -39,6 +108,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count"],
 )
 
 # Include routers
@@ -47,12 +117,33 @@ app.include_router(team.router)
 app.include_router(host.router)
 app.include_router(answer.router)
 app.include_router(statistics.router)
+app.include_router(export.router)
+app.include_router(events.router)
 
 
 @app.websocket("/ws/{invite_code}")
-async def websocket_endpoint(websocket: WebSocket, invite_code: str):
-    """WebSocket endpoint for quiz synchronization."""
-    await handlers.websocket_endpoint(websocket, invite_code)
+async def websocket_endpoint(
+    websocket: WebSocket,
+    invite_code: str,
+    role: str = "participant",
+    payload: str = "lean",
+    participant_id: Optional[UUID] = None,
+    last_seq: Optional[int] = None,
+    epoch: Optional[str] = None
+):
+    """WebSocket endpoint for quiz synchronization.
+    
+    With ``payload=full`` the quiz_started and question_changed frames also
+    carry the current question, so the client doesn't need to fetch it.
+    Offering the ``quiz.compact.v2`` or ``quiz.msgpack.v2`` subprotocol
+    switches to batched frames without the human-readable message fields;
+    without one, frames are plain JSON text. Broadcasts carry a ``seq``;
+    reconnecting with ``last_seq`` and ``epoch`` replays the missed ones.
+    """
+    await handlers.websocket_endpoint(
+        websocket, invite_code, role, full_payload=payload == "full", participant_id=participant_id,
+        last_seq=last_seq, epoch=epoch
+    )
 
 
 @app.get("/")
@@ -64,3 +155,16 @@ def root():
 def health():
     return {"status": "ok"}
 
+
+@app.get("/metrics")
+def metrics():
+    """In-process counters for this worker."""
+    return {
+        "quiz_cache": quiz_cache.stats(),
+        "question_cache": question_cache.stats(),
+        "answer_ingestor": answer_ingestor.stats(),
+        "answer_progress": handlers.progress_aggregator.stats(),
+        "live_statistics": live_statistics.stats(),
+        "answer_tally": answer_tally.stats(),
+        "websocket": handlers.manager.stats(),
+    }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSON, ARRAY
 from sqlalchemy.orm import relationship
 import uuid
@@ -9,6 +9,12 @@ from app.database import Base
 
 class Answer(Base):
     __tablename__ = "answers"
+    __table_args__ = (
+        # One answer per participant per question; target of the bulk upsert
+        UniqueConstraint("participant_id", "question_id", name="uq_answers_participant_question"),
+        # Per-question counts and statistics; participant lookups use the unique constraint
+        Index("ix_answers_question_id", "question_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     participant_id = Column(UUID(as_uuid=True), ForeignKey("participants.id"), nullable=False)
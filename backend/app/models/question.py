@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -8,6 +8,10 @@ from app.database import Base
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        # Current/next/max question lookups filter by quiz and sort or match on order
+        Index("ix_questions_quiz_id_order", "quiz_id", "order"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     quiz_id = Column(UUID(as_uuid=True), ForeignKey("quizzes.id"), nullable=False)
@@ -23,11 +27,16 @@ class Question(Base):
 
 class QuestionOption(Base):
     __tablename__ = "question_options"
+    __table_args__ = (
+        Index("ix_question_options_question_id", "question_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id"), nullable=False)
     text = Column(String, nullable=False)
     order = Column(Integer, nullable=False)
+    # Text answers the generated option stands for; None for options entered by the host
+    answer_count = Column(Integer, nullable=True)
 
     question = relationship("Question", back_populates="options")
 
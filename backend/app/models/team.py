@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSON
 from sqlalchemy.orm import relationship
 import uuid
@@ -9,6 +9,10 @@ from app.database import Base
 
 class Team(Base):
     __tablename__ = "teams"
+    __table_args__ = (
+        # Roster lookups and keyset pagination in join order
+        Index("ix_teams_quiz_id_joined_at_id", "quiz_id", "joined_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     quiz_id = Column(UUID(as_uuid=True), ForeignKey("quizzes.id"), nullable=False)
@@ -21,6 +25,9 @@ class Team(Base):
 
 class Participant(Base):
     __tablename__ = "participants"
+    __table_args__ = (
+        Index("ix_participants_team_id", "team_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     team_id = Column(UUID(as_uuid=True), ForeignKey("teams.id"), nullable=False)
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from app.database import get_db
-from app.schemas.answer import AnswerCreate, AnswerResponse
-from app.services import answer_service, quiz_service, team_service
-from app.models import Participant
-from app.models.quiz import QuizStatus
+from app.schemas.answer import (
+    AnswerBatchCreate, AnswerBatchItemResult, AnswerBatchResult, AnswerCreate, AnswerResponse
+)
+from app.services import answer_service
 from app.websocket import handlers
 
 router = APIRouter(prefix="/api/quizzes/{invite_code}/answers", tags=["answers"])
@@ -16,33 +16,60 @@ async def submit_answer(
     invite_code: str,
     participant_id: UUID,
     answer_data: AnswerCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Submit an answer."""
-    quiz = quiz_service.get_quiz_by_invite_code(db, invite_code)
-    if not quiz:
-        raise HTTPException(status_code=404, detail="Quiz not found")
-    
-    if quiz.status != QuizStatus.IN_PROGRESS:
-        raise HTTPException(status_code=400, detail="Quiz is not in progress")
-    
-    # Verify participant belongs to a team in this quiz
-    participant = db.query(Participant).filter(
-        Participant.id == participant_id
-    ).first()
+    try:
+        quiz = await answer_service.get_quiz_accepting_answers(db, invite_code)
+        # Membership of participant and question is checked by the upsert itself
+        answer = await answer_service.create_answer(db, quiz.id, participant_id, answer_data)
+    except answer_service.AnswerSubmissionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    # Coalesced into a periodic answers_progress event for the hosts
+    handlers.notify_answer_submitted(invite_code, quiz.id, answer_data.question_id)
+    return answer
+
+
+@router.post("/batch", response_model=AnswerBatchResult)
+async def submit_answers(
+    invite_code: str,
+    batch: AnswerBatchCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Submit answers of several participants and/or questions at once.
     
-    if not participant:
-        raise HTTPException(status_code=404, detail="Participant not found")
+    All answers are validated and stored with a single upsert; each gets its
+    own result, so one rejected answer doesn't fail the rest.
+    """
+    try:
+        quiz = await answer_service.get_quiz_accepting_answers(db, invite_code)
+    except answer_service.AnswerSubmissionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     
-    team = team_service.get_team_by_id(db, participant.team_id)
-    if not team or team.quiz_id != quiz.id:
-        raise HTTPException(status_code=403, detail="Participant does not belong to this quiz")
+    stored = await answer_service.create_answers(db, quiz.id, batch.answers)
+    results = []
+    question_ids = set()
+    for item, outcome in zip(batch.answers, stored):
+        if isinstance(outcome, answer_service.AnswerSubmissionError):
+            results.append(AnswerBatchItemResult(
+                participant_id=item.participant_id,
+                question_id=item.question_id,
+                status_code=outcome.status_code,
+                error=str(outcome)
+            ))
+        else:
+            question_ids.add(item.question_id)
+            results.append(AnswerBatchItemResult(
+                participant_id=item.participant_id,
+                question_id=item.question_id,
+                status_code=201,
+                answer=AnswerResponse.model_validate(outcome)
+            ))
     
-    try:
-        answer = answer_service.create_answer(db, participant_id, answer_data)
-        # Broadcast answer submitted event
-        await handlers.broadcast_answer_submitted(invite_code, str(participant_id))
-        return answer
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
+    # Coalesced into a single answers_progress event for the hosts
+    for question_id in question_ids:
+        handlers.notify_answer_submitted(invite_code, quiz.id, question_id)
+    return AnswerBatchResult(
+        stored=sum(result.answer is not None for result in results),
+        results=results
+    )
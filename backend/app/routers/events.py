@@ -0,0 +1,43 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from app.database import AsyncSessionLocal
+from app.services import quiz_service
+from app.websocket import handlers
+
+router = APIRouter(prefix="/api/quizzes/{invite_code}/events", tags=["events"])
+
+
+@router.get("")
+async def stream_events(
+    invite_code: str,
+    payload: str = "lean",
+    last_event_id: Optional[str] = Header(None)
+):
+    """Stream the quiz's broadcasts as Server-Sent Events (for projectors and spectators).
+    
+    Sends the same messages as the WebSocket, read-only. EventSource resumes
+    from the Last-Event-ID it sends on reconnect; ``payload=full`` embeds
+    the current question as on the WebSocket.
+    """
+    # Not a get_db dependency: that session would be closed only when the stream
+    # ends, holding a pooled connection for as long as the client listens
+    async with AsyncSessionLocal() as db:
+        quiz = await quiz_service.get_quiz_state(db, invite_code)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    stream = handlers.open_event_stream(invite_code, full_payload=payload == "full", last_event_id=last_event_id)
+    if stream is None:
+        raise HTTPException(status_code=503, detail="Too many connections")
+    
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={
+            # Every response is a live stream; shared caches must not store or coalesce it
+            "Cache-Control": "no-cache, no-transform",
+            # Stop nginx-style proxies from buffering events
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.database import AsyncSessionLocal
+from app.services import export_service, quiz_service
+
+router = APIRouter(prefix="/api/quizzes/{invite_code}/export", tags=["export"])
+
+
+@router.get("")
+async def export_answers(
+    invite_code: str,
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$")
+):
+    """Download all answers of a quiz with participant, team and question (for host).
+    
+    The file is streamed while rows are read from a server-side cursor, so
+    memory use stays flat and the first bytes are sent right away.
+    """
+    # Not a get_db dependency: that session would be closed only after the body
+    # has streamed, holding a pooled connection for the whole download
+    async with AsyncSessionLocal() as db:
+        quiz = await quiz_service.get_quiz_state(db, invite_code)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    if format == "parquet" and not export_service.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow to be installed")
+    
+    exporters = {
+        "csv": export_service.export_csv,
+        "ndjson": export_service.export_ndjson,
+        "parquet": export_service.export_parquet,
+    }
+    return StreamingResponse(
+        exporters[format](quiz.id),
+        media_type=export_service.EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="quiz-{invite_code}-answers.{format}"'}
+    )
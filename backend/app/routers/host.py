@@ -1,10 +1,16 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.schemas.quiz import QuestionResponse
 from app.services import quiz_service
-from app.services.last_question_service import get_or_create_last_question, create_last_question_in_db
+from app.services.answer_service import answer_ingestor
+from app.services.answer_tally import answer_tally
+from app.services.quiz_cache import quiz_cache
+from app.services.question_cache import question_cache
+from app.services.last_question_service import create_last_question_in_db
 from app.models import Question, Quiz
 from app.models.quiz import QuizStatus
 from app.websocket import handlers
@@ -15,9 +21,9 @@ router = APIRouter(prefix="/api/quizzes/{invite_code}", tags=["host"])
 
 
 @router.post("/start", status_code=200)
-async def start_quiz(invite_code: str, db: Session = Depends(get_db)):
+async def start_quiz(invite_code: str, db: AsyncSession = Depends(get_db)):
     """Start the quiz (host only)."""
-    quiz = quiz_service.get_quiz_by_invite_code(db, invite_code)
+    quiz = await quiz_service.get_quiz_by_invite_code(db, invite_code)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
@@ -25,9 +31,13 @@ async def start_quiz(invite_code: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Quiz cannot be started in current status")
     
     # Set first question as current
-    first_question = db.query(Question).filter(
-        Question.quiz_id == quiz.id
-    ).order_by(Question.order).first()
+    result = await db.execute(
+        select(Question)
+        .where(Question.quiz_id == quiz.id)
+        .order_by(Question.order)
+        .limit(1)
+    )
+    first_question = result.scalars().first()
     
     if not first_question:
         raise HTTPException(status_code=400, detail="No questions found")
@@ -35,10 +45,13 @@ async def start_quiz(invite_code: str, db: Session = Depends(get_db)):
     # Update both status and current_question_order in a single transaction
     quiz.current_question_order = first_question.order
     quiz.status = QuizStatus.IN_PROGRESS
+    # No answers exist before the quiz starts, so its text answers can be tallied from here
+    answer_tally.begin(quiz.id)
     logger.info(f"Starting quiz {invite_code}: setting current_question_order to {first_question.order}")
-    db.flush()
-    db.commit()
-    db.refresh(quiz)
+    await db.flush()
+    await db.commit()
+    await db.refresh(quiz)
+    quiz_cache.invalidate(invite_code)
     logger.info(f"Quiz {invite_code} started: status={quiz.status}, current_question_order={quiz.current_question_order}")
     
     # Broadcast quiz started event (don't fail if broadcast fails)
@@ -51,9 +64,17 @@ async def start_quiz(invite_code: str, db: Session = Depends(get_db)):
 
 
 @router.get("/current-question", response_model=QuestionResponse)
-def get_current_question(invite_code: str, db: Session = Depends(get_db)):
-    """Get current question."""
-    quiz = quiz_service.get_quiz_by_invite_code(db, invite_code)
+async def get_current_question(
+    invite_code: str,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get current question.
+    
+    The rendered response is cached per (quiz, question order) and carries a
+    strong ETag; a matching If-None-Match gets 304 Not Modified.
+    """
+    quiz = await quiz_service.get_quiz_state(db, invite_code)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
@@ -66,36 +87,22 @@ def get_current_question(invite_code: str, db: Session = Depends(get_db)):
         logger.warning(f"No current question set for quiz {invite_code}")
         raise HTTPException(status_code=404, detail="No current question")
     
-    # Get max order of existing questions
-    max_order = db.query(Question.order).filter(
-        Question.quiz_id == quiz.id
-    ).order_by(Question.order.desc()).first()
-    
-    max_order_value = max_order[0] if max_order else 0
-    logger.debug(f"Max order for quiz {invite_code}: {max_order_value}, current_question_order: {quiz.current_question_order}")
-    
-    # If current question order is greater than max, it's the last (dynamic) question
-    if quiz.current_question_order > max_order_value:
-        # Generate last question dynamically
-        return get_or_create_last_question(db, quiz.id)
-    
-    # Regular question from DB
-    question = db.query(Question).filter(
-        Question.quiz_id == quiz.id,
-        Question.order == quiz.current_question_order
-    ).first()
-    
-    if not question:
+    rendered = await quiz_service.get_rendered_question(db, quiz)
+    if rendered is None:
         logger.error(f"Question not found for quiz {invite_code} with order {quiz.current_question_order}")
         raise HTTPException(status_code=404, detail="Question not found")
     
-    return question
+    headers = {"ETag": rendered.etag, "Cache-Control": "no-cache"}
+    if rendered.matches(if_none_match):
+        question_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=rendered.body, media_type="application/json", headers=headers)
 
 
 @router.post("/next-question", status_code=200)
-async def next_question(invite_code: str, db: Session = Depends(get_db)):
+async def next_question(invite_code: str, db: AsyncSession = Depends(get_db)):
     """Move to next question (host only)."""
-    quiz = quiz_service.get_quiz_by_invite_code(db, invite_code)
+    quiz = await quiz_service.get_quiz_state(db, invite_code)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
@@ -106,28 +113,36 @@ async def next_question(invite_code: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="No current question")
     
     # Get next question
-    current_question = db.query(Question).filter(
-        Question.quiz_id == quiz.id,
-        Question.order == quiz.current_question_order
-    ).first()
+    result = await db.execute(
+        select(Question).where(
+            Question.quiz_id == quiz.id,
+            Question.order == quiz.current_question_order
+        )
+    )
+    current_question = result.scalars().first()
     
     if not current_question:
         raise HTTPException(status_code=404, detail="Current question not found")
     
     # Get max order of existing questions
-    max_order = db.query(Question.order).filter(
-        Question.quiz_id == quiz.id
-    ).order_by(Question.order.desc()).first()
+    max_order = await db.scalar(
+        select(Question.order)
+        .where(Question.quiz_id == quiz.id)
+        .order_by(Question.order.desc())
+        .limit(1)
+    )
     
-    max_order_value = max_order[0] if max_order else 0
+    max_order_value = max_order or 0
     
     # Check if current question is the last text question
     if current_question.order >= max_order_value:
         # This is the last text question, move to dynamic last question
         # Create the last question in DB
         try:
-            last_question = create_last_question_in_db(db, quiz.id)
-            quiz_service.set_current_question(db, quiz.id, last_question.order)
+            # Write queued answers first, so options generated from the database include them
+            await answer_ingestor.flush()
+            last_question = await create_last_question_in_db(db, quiz.id)
+            await quiz_service.set_current_question(db, quiz.id, last_question.order)
             
             # Broadcast question changed event
             await handlers.broadcast_question_changed(invite_code, last_question.order)
@@ -137,16 +152,22 @@ async def next_question(invite_code: str, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail=str(e))
     
     # Regular next question
-    next_question = db.query(Question).filter(
-        Question.quiz_id == quiz.id,
-        Question.order > current_question.order
-    ).order_by(Question.order).first()
+    result = await db.execute(
+        select(Question)
+        .where(
+            Question.quiz_id == quiz.id,
+            Question.order > current_question.order
+        )
+        .order_by(Question.order)
+        .limit(1)
+    )
+    next_question = result.scalars().first()
     
     if not next_question:
         # Should not happen, but handle it
         raise HTTPException(status_code=400, detail="Next question not found")
     
-    quiz_service.set_current_question(db, quiz.id, next_question.order)
+    await quiz_service.set_current_question(db, quiz.id, next_question.order)
     
     # Broadcast question changed event
     await handlers.broadcast_question_changed(invite_code, next_question.order)
@@ -155,9 +176,9 @@ async def next_question(invite_code: str, db: Session = Depends(get_db)):
 
 
 @router.post("/finish", status_code=200)
-async def finish_quiz(invite_code: str, db: Session = Depends(get_db)):
+async def finish_quiz(invite_code: str, db: AsyncSession = Depends(get_db)):
     """Finish the quiz (host only)."""
-    quiz = quiz_service.get_quiz_by_invite_code(db, invite_code)
+    quiz = await quiz_service.get_quiz_by_invite_code(db, invite_code)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
@@ -166,8 +187,9 @@ async def finish_quiz(invite_code: str, db: Session = Depends(get_db)):
     
     # Update quiz status to completed
     quiz.status = QuizStatus.COMPLETED
-    db.commit()
-    db.refresh(quiz)
+    await db.commit()
+    await db.refresh(quiz)
+    quiz_cache.invalidate(invite_code)
     logger.info(f"Quiz {invite_code} finished: status={quiz.status}")
     
     # Broadcast quiz completed event
@@ -1,28 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.schemas.statistics import StatisticsResponse
 from app.services import quiz_service, statistics_service
+from app.services.answer_service import answer_ingestor
+from app.services.live_statistics import live_statistics
+from app.services.quiz_cache import QuizState
 from app.models.quiz import QuizStatus
+from app.websocket import handlers
 
 router = APIRouter(prefix="/api/quizzes/{invite_code}/statistics", tags=["statistics"])
 
 
 @router.get("", response_model=StatisticsResponse)
-def get_statistics(invite_code: str, db: Session = Depends(get_db)):
+async def get_statistics(invite_code: str, db: AsyncSession = Depends(get_db)):
     """Get statistics for the last question. Only available after quiz completion."""
-    quiz = quiz_service.get_quiz_by_invite_code(db, invite_code)
+    quiz = await quiz_service.get_quiz_state(db, invite_code)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
     if quiz.status != QuizStatus.COMPLETED:
         raise HTTPException(status_code=403, detail="Statistics are only available after quiz completion")
     
-    try:
-        stats = statistics_service.get_statistics_for_last_question(db, quiz.id)
-        if not stats:
-            raise HTTPException(status_code=404, detail="No statistics available")
-        return stats
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    stats = await _statistics(db, quiz)
+    if not stats:
+        raise HTTPException(status_code=404, detail="No statistics available")
+    return stats
 
+
+@router.get("/live", response_model=StatisticsResponse)
+async def get_live_statistics(invite_code: str, db: AsyncSession = Depends(get_db)):
+    """Get running vote counts for the last question while it is being answered (host only)."""
+    quiz = await quiz_service.get_quiz_state(db, invite_code)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    if quiz.status not in (QuizStatus.IN_PROGRESS, QuizStatus.COMPLETED):
+        raise HTTPException(status_code=400, detail="Quiz has not started")
+    
+    stats = await _statistics(db, quiz)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Last question has not been reached yet")
+    return stats
+
+
+async def _statistics(db: AsyncSession, quiz: QuizState):
+    """Vote counts of the quiz's last question, or None if it doesn't exist yet.
+    
+    The live counter only sees this worker's answers, including buffered ones
+    not written yet, until it is reconciled. It is served while the question
+    is being answered on a single worker; final results, and every result
+    with a distributed backend, are counted from the database.
+    """
+    if quiz.status == QuizStatus.IN_PROGRESS and not handlers.manager.backend.distributed:
+        stats = await live_statistics.get(db, quiz.id)
+        return stats.snapshot() if stats else None
+    
+    # Write this worker's queued answers first, so the counts include them
+    await answer_ingestor.flush()
+    return await statistics_service.get_statistics_for_last_question(db, quiz.id)
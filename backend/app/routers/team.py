@@ -1,23 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from app.database import get_db
-from app.schemas.team import TeamCreate, TeamResponse
-from app.services import quiz_service, team_service
+from app.schemas.team import TeamCreate, TeamImportResult, TeamResponse
+from app.services import quiz_service, team_import, team_service
 from app.websocket import handlers
 
 router = APIRouter(prefix="/api/quizzes/{invite_code}/teams", tags=["teams"])
 
 
 @router.post("", response_model=TeamResponse, status_code=201)
-async def create_team(invite_code: str, team_data: TeamCreate, db: Session = Depends(get_db)):
+async def create_team(invite_code: str, team_data: TeamCreate, db: AsyncSession = Depends(get_db)):
     """Register a new team for a quiz."""
-    quiz = quiz_service.get_quiz_by_invite_code(db, invite_code)
+    quiz = await quiz_service.get_quiz_state(db, invite_code)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
     try:
-        team = team_service.create_team(db, quiz.id, team_data)
+        team = await team_service.create_team(db, quiz.id, team_data)
         # Broadcast team joined event
         await handlers.broadcast_team_joined(invite_code, team.name)
         return team
@@ -26,12 +27,80 @@ async def create_team(invite_code: str, team_data: TeamCreate, db: Session = Dep
 
 
 @router.get("", response_model=List[TeamResponse])
-def get_teams(invite_code: str, db: Session = Depends(get_db)):
-    """Get all teams for a quiz (for host)."""
-    quiz = quiz_service.get_quiz_by_invite_code(db, invite_code)
+async def get_teams(
+    invite_code: str,
+    response: Response,
+    after: Optional[str] = None,
+    since: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get teams for a quiz in join order (for host).
+    
+    The X-Next-Cursor response header points past the last returned team:
+    passing it back as ``after`` returns the next page or, once the roster
+    is exhausted, only teams that joined since. ``since`` filters on the
+    join time instead. X-Total-Count is the number of teams in the whole
+    roster: a team whose registration committed late can appear behind the
+    cursor, so a client holding fewer teams should fetch the roster again.
+    """
+    quiz = await quiz_service.get_quiz_state(db, invite_code)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
-    teams = team_service.get_teams_by_quiz(db, quiz.id)
+    try:
+        position = team_service.decode_roster_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    teams = await team_service.get_teams_by_quiz(db, quiz.id, after=position, since=since, limit=limit)
+    if teams:
+        response.headers["X-Next-Cursor"] = team_service.encode_roster_cursor(teams[-1])
+    elif after:
+        response.headers["X-Next-Cursor"] = after
+    if after is None and since is None and limit is None:
+        response.headers["X-Total-Count"] = str(len(teams))
+    else:
+        response.headers["X-Total-Count"] = str(await team_service.count_teams(db, quiz.id))
     return teams
 
+
+# Content types accepted by the bulk import, by file format
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+@router.post("/import", response_model=TeamImportResult)
+async def import_teams(invite_code: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """Bulk-register teams from a CSV or NDJSON request body (for host).
+    
+    CSV has one participant per row with columns team, first_name,
+    last_name, optional profession and any contact columns (phone, email,
+    ...); NDJSON has one create-team object per line. Valid rows are inserted
+    in one transaction, invalid ones are reported by line number, and a single
+    teams_imported event is broadcast.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    file_format = IMPORT_CONTENT_TYPES.get(content_type)
+    if file_format is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Content-Type must be one of: {', '.join(IMPORT_CONTENT_TYPES)}"
+        )
+    
+    quiz = await quiz_service.get_quiz_by_invite_code(db, invite_code)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    try:
+        data = (await request.body()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    
+    result = await team_import.import_teams_from_file(db, quiz, data, file_format)
+    if result.imported_teams:
+        await handlers.broadcast_teams_imported(invite_code, result.imported_teams)
+    return result
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Literal, Optional, List
 from uuid import UUID
 from datetime import datetime
 
@@ -20,3 +20,30 @@ class AnswerResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class AnswerBatchItem(AnswerCreate):
+    participant_id: UUID
+
+
+class AnswerBatchCreate(BaseModel):
+    answers: List[AnswerBatchItem] = Field(min_length=1, max_length=500)
+
+
+class AnswerBatchItemResult(BaseModel):
+    participant_id: UUID
+    question_id: UUID
+    status_code: int  # 201 if stored, otherwise the status a single submission would get
+    answer: Optional[AnswerResponse] = None
+    error: Optional[str] = None
+
+
+class AnswerBatchResult(BaseModel):
+    stored: int
+    results: List[AnswerBatchItemResult]  # in the order of the submitted answers
+
+
+class AnswerSubmitMessage(AnswerCreate):
+    """submit_answer request sent over the quiz WebSocket."""
+    type: Literal["submit_answer"]
+    request_id: str  # echoed in the answer_ack/error reply
+    participant_id: UUID
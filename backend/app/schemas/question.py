@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 
@@ -12,6 +12,7 @@ class QuestionOptionResponse(BaseModel):
     id: UUID
     text: str
     order: int
+    answer_count: Optional[int] = None  # answers grouped into a generated option
 
     class Config:
         from_attributes = True
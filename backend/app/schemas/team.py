@@ -36,3 +36,13 @@ class TeamResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class TeamImportError(BaseModel):
+    row: int  # line number in the uploaded file
+    error: str
+
+
+class TeamImportResult(BaseModel):
+    imported_teams: int
+    imported_participants: int
+    errors: List[TeamImportError] = []
@@ -0,0 +1,167 @@
+import asyncio
+import enum
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+UpsertFunc = Callable[[AsyncSession, List[dict]], Awaitable[list]]
+# Called with the values of an answer that could not be written
+FailureFunc = Callable[[dict], None]
+
+
+class IngestMode(str, enum.Enum):
+    """When an answer submission is acknowledged to the client."""
+    SYNC = "sync"  # upserted and committed inside the request
+    FLUSH = "flush"  # queued; acknowledged once the batch holding it is committed
+    BUFFERED = "buffered"  # queued; acknowledged at once, lost if the process dies before the flush
+
+
+class _PendingAnswer:
+    __slots__ = ("values", "future")
+
+    def __init__(self, values: dict, future: Optional[asyncio.Future]):
+        self.values = values
+        self.future = future
+
+
+class AnswerIngestor:
+    """Write-behind queue that turns concurrent answer submissions into batched upserts.
+
+    Answers are collected in memory and written by a background task every
+    ``flush_interval`` seconds, or as soon as ``max_batch_size`` answers are
+    waiting, with one multi-row upsert per batch.
+    """
+
+    def __init__(
+        self,
+        upsert: UpsertFunc,
+        mode: IngestMode = IngestMode.FLUSH,
+        flush_interval: float = 0.05,
+        max_batch_size: int = 500,
+        on_failure: Optional[FailureFunc] = None,
+    ):
+        self._upsert = upsert
+        self._on_failure = on_failure
+        self.mode = mode
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self._pending: List[_PendingAnswer] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        # Held while a flush writes, so flush() also waits for the flusher's batch in flight
+        self._flushing: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.flushes = 0
+        self.flushed_answers = 0
+        self.failed_answers = 0
+
+    async def start(self):
+        """Start the background flusher (no-op in sync mode)."""
+        if self.mode == IngestMode.SYNC or self._task is not None:
+            return
+        self._stopping = False
+        # Created here so that they belong to the loop the flusher runs on
+        self._wakeup = asyncio.Event()
+        self._flushing = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher after writing everything still queued."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    async def submit(self, db: AsyncSession, values: dict):
+        """Store an answer according to the configured mode.
+
+        Returns the stored row (None if the upsert left the answer out), or
+        in buffered mode the submitted values (whose id is provisional if the
+        answer replaces an earlier one).
+        """
+        if self.mode == IngestMode.SYNC or self._task is None:
+            rows = await self._upsert(db, [values])
+            await db.commit()
+            return rows[0] if rows else None
+
+        # End the caller's transaction so its pooled connection is free while queued;
+        # otherwise waiting requests could starve the flusher of connections
+        await db.commit()
+
+        future = None
+        if self.mode == IngestMode.FLUSH:
+            future = asyncio.get_running_loop().create_future()
+        self._pending.append(_PendingAnswer(values, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._wakeup.set()
+
+        if future is None:
+            return values
+        return await future
+
+    async def flush(self):
+        """Write all queued answers now; returns once every answer queued before the call is written."""
+        if self._flushing is None:
+            # Never started, so nothing was queued
+            return
+        async with self._flushing:
+            while self._pending:
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+                await self._write(batch)
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing answers: {e}")
+        await self.flush()
+
+    async def _write(self, batch: List[_PendingAnswer]):
+        try:
+            async with AsyncSessionLocal() as db:
+                rows = await self._upsert(db, [item.values for item in batch])
+                await db.commit()
+        except Exception as e:
+            if len(batch) > 1:
+                # Retry one by one so a single bad answer doesn't fail the whole batch
+                for item in batch:
+                    await self._write([item])
+                return
+            self.failed_answers += 1
+            logger.error(f"Error writing answer {batch[0].values.get('id')}: {e}")
+            if self._on_failure is not None:
+                self._on_failure(batch[0].values)
+            if batch[0].future is not None and not batch[0].future.done():
+                batch[0].future.set_exception(e)
+            return
+
+        self.flushes += 1
+        self.flushed_answers += len(batch)
+        rows_by_key = {(row.participant_id, row.question_id): row for row in rows}
+        for item in batch:
+            if item.future is not None and not item.future.done():
+                key = (item.values["participant_id"], item.values["question_id"])
+                item.future.set_result(rows_by_key.get(key))
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode.value,
+            "queued": len(self._pending),
+            "flushes": self.flushes,
+            "flushed_answers": self.flushed_answers,
+            "failed_answers": self.failed_answers,
+        }
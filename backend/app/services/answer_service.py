@@ -1,59 +1,298 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+import os
+from sqlalchemy import DateTime, JSON, String, and_, column, func, select, values as values_clause
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from uuid import UUID
-from app.models import Answer, Participant, Question, Quiz
-from app.schemas.answer import AnswerCreate
+import uuid
+from app.models import Answer, Participant, Question, Quiz, Team
+from app.models.quiz import QuizStatus
+from app.schemas.answer import AnswerBatchItem, AnswerCreate
+from app.services.answer_ingestion import AnswerIngestor, IngestMode
+from app.services import quiz_service
+from app.services.answer_tally import answer_tally
+from app.services.live_statistics import live_statistics
+from app.services.quiz_cache import QuizState
 
 
-def create_answer(db: Session, participant_id: UUID, answer_data: AnswerCreate) -> Answer:
-    """Create an answer for a participant."""
-    # Check if participant exists
-    participant = db.query(Participant).filter(Participant.id == participant_id).first()
-    if not participant:
-        raise ValueError("Participant not found")
+class AnswerSubmissionError(ValueError):
+    """An answer that can't be stored, with the HTTP status to report."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+async def get_quiz_accepting_answers(db: AsyncSession, invite_code: str) -> QuizState:
+    """Get the state of a quiz that is in progress; raises AnswerSubmissionError otherwise."""
+    quiz = await quiz_service.get_quiz_state(db, invite_code)
+    if not quiz:
+        raise AnswerSubmissionError("Quiz not found", status_code=404)
+    if quiz.status != QuizStatus.IN_PROGRESS:
+        raise AnswerSubmissionError("Quiz is not in progress")
+    return quiz
+
+
+async def create_answer(db: AsyncSession, quiz_id: UUID, participant_id: UUID, answer_data: AnswerCreate):
+    """Create or update an answer for a participant of a quiz.
+
+    The write goes through the answer ingestor, so depending on
+    ANSWER_INGEST_MODE it is upserted inline or as part of a batch. The
+    upsert itself checks that the participant's team and the question belong
+    to the quiz, so a valid answer costs a single statement; only a rejected
+    one is looked up again to explain why.
+    """
+    values = build_answer_values(quiz_id, participant_id, answer_data)
+    if answer_ingestor.mode == IngestMode.BUFFERED:
+        # Acknowledged before it is written, so validate up front
+        is_last = await check_answer_target(db, quiz_id, participant_id, answer_data.question_id)
+        answer = await answer_ingestor.submit(db, values)
+    else:
+        answer = await answer_ingestor.submit(db, values)
+        if answer is None:
+            await check_answer_target(db, quiz_id, participant_id, answer_data.question_id)
+            raise AnswerSubmissionError("Answer could not be stored")
+        is_last = answer.is_last
     
-    # Check if question exists
-    question = db.query(Question).filter(Question.id == answer_data.question_id).first()
-    if not question:
-        raise ValueError("Question not found")
+    _record_answer(values, is_last)
+    return answer
+
+
+async def create_answers(db: AsyncSession, quiz_id: UUID, answers: list[AnswerBatchItem]) -> list:
+    """Create or update several answers of a quiz with one upsert and one commit.
+
+    Bypasses the ingestor: the whole batch is already a single statement.
+    Returns, in input order, the stored row or the AnswerSubmissionError
+    of each answer; rejected answers don't prevent the others from being
+    stored, and the reasons for all of them are found with one more query.
+    """
+    values = [build_answer_values(quiz_id, answer.participant_id, answer) for answer in answers]
+    rows = await upsert_answers(db, values)
+    await db.commit()
     
+    rows_by_key = {(row.participant_id, row.question_id): row for row in rows}
+    rejected = [key for key in ((v["participant_id"], v["question_id"]) for v in values) if key not in rows_by_key]
+    errors = await explain_rejections(db, quiz_id, rejected) if rejected else {}
+    results = []
+    for answer_values in values:
+        key = (answer_values["participant_id"], answer_values["question_id"])
+        row = rows_by_key.get(key)
+        if row is None:
+            results.append(errors[key])
+            continue
+        _record_answer(answer_values, row.is_last)
+        results.append(row)
+    return results
+
+
+def _record_answer(values: dict, is_last: bool):
+    """Feed a stored answer to the in-memory live statistics or text tally."""
+    if is_last:
+        live_statistics.record(
+            values["quiz_id"], values["question_id"], values["participant_id"], values["selected_options"]
+        )
+    else:
+        answer_tally.record(
+            values["quiz_id"], values["participant_id"], values["question_id"],
+            values["text_answer"], values["answered_at"]
+        )
+
+
+async def check_answer_target(db: AsyncSession, quiz_id: UUID, participant_id: UUID, question_id: UUID) -> bool:
+    """Check in one query that participant and question belong to the quiz.
+
+    Returns whether the question is the quiz's last one; raises
+    AnswerSubmissionError otherwise.
+    """
+    result = await db.execute(select(
+        select(Team.quiz_id)
+        .join(Participant, Participant.team_id == Team.id)
+        .where(Participant.id == participant_id)
+        .scalar_subquery().label("participant_quiz_id"),
+        select(Question.quiz_id).where(Question.id == question_id).scalar_subquery().label("question_quiz_id"),
+        select(Question.is_last).where(Question.id == question_id).scalar_subquery().label("is_last"),
+    ))
+    row = result.one()
+    error = _target_error(quiz_id, row.participant_quiz_id, row.question_quiz_id)
+    if error is not None:
+        raise error
+    return row.is_last
+
+
+async def explain_rejections(db: AsyncSession, quiz_id: UUID, keys: list[tuple]) -> dict:
+    """Find out in one query why answers left out by the upsert were rejected.
+
+    Takes (participant_id, question_id) pairs and maps each to the
+    AnswerSubmissionError that ``check_answer_target`` would raise for it.
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    rejected = values_clause(
+        column("participant_id", PG_UUID(as_uuid=True)),
+        column("question_id", PG_UUID(as_uuid=True)),
+        name="rejected"
+    ).data(unique_keys)
+    result = await db.execute(
+        select(
+            rejected.c.participant_id,
+            rejected.c.question_id,
+            Team.quiz_id.label("participant_quiz_id"),
+            Question.quiz_id.label("question_quiz_id"),
+        )
+        .select_from(rejected)
+        .outerjoin(Participant, Participant.id == rejected.c.participant_id)
+        .outerjoin(Team, Team.id == Participant.team_id)
+        .outerjoin(Question, Question.id == rejected.c.question_id)
+    )
+    return {
+        (row.participant_id, row.question_id): (
+            _target_error(quiz_id, row.participant_quiz_id, row.question_quiz_id)
+            # Valid target, so the write itself failed
+            or AnswerSubmissionError("Answer could not be stored")
+        )
+        for row in result
+    }
+
+
+def _target_error(quiz_id: UUID, participant_quiz_id: Optional[UUID],
+                  question_quiz_id: Optional[UUID]) -> Optional[AnswerSubmissionError]:
+    if participant_quiz_id is None:
+        return AnswerSubmissionError("Participant not found", status_code=404)
+    if participant_quiz_id != quiz_id:
+        return AnswerSubmissionError("Participant does not belong to this quiz", status_code=403)
+    if question_quiz_id != quiz_id:
+        return AnswerSubmissionError("Question not found")
+    return None
+
+
+def build_answer_values(quiz_id: UUID, participant_id: UUID, answer_data: AnswerCreate) -> dict:
+    """Build the column values for an answer upsert (plus the quiz it must belong to)."""
     # Convert UUID objects to strings for JSON serialization
     selected_options_json = None
     if answer_data.selected_options:
         selected_options_json = [str(option_id) for option_id in answer_data.selected_options]
     
-    # Check if answer already exists
-    existing_answer = db.query(Answer).filter(
-        Answer.participant_id == participant_id,
-        Answer.question_id == answer_data.question_id
-    ).first()
-    
-    if existing_answer:
-        # Update existing answer
-        existing_answer.text_answer = answer_data.text_answer
-        existing_answer.selected_options = selected_options_json
-        db.commit()
-        db.refresh(existing_answer)
-        return existing_answer
-    
-    # Create new answer
-    answer = Answer(
-        participant_id=participant_id,
-        question_id=answer_data.question_id,
-        text_answer=answer_data.text_answer,
-        selected_options=selected_options_json
+    return {
+        "id": uuid.uuid4(),
+        "quiz_id": quiz_id,
+        "participant_id": participant_id,
+        "question_id": answer_data.question_id,
+        "text_answer": answer_data.text_answer,
+        "selected_options": selected_options_json,
+        "answered_at": datetime.utcnow(),
+    }
+
+
+# Columns of the submitted answers, as sent in the upsert's VALUES list
+SUBMITTED_COLUMNS = [
+    column("id", PG_UUID(as_uuid=True)),
+    column("quiz_id", PG_UUID(as_uuid=True)),
+    column("participant_id", PG_UUID(as_uuid=True)),
+    column("question_id", PG_UUID(as_uuid=True)),
+    column("text_answer", String),
+    column("selected_options", JSON),
+    column("answered_at", DateTime),
+]
+ANSWER_COLUMNS = ["id", "participant_id", "question_id", "text_answer", "selected_options", "answered_at"]
+
+
+async def upsert_answers(db: AsyncSession, values: list[dict]) -> list[Row]:
+    """Insert or update answers with a single multi-row INSERT ... SELECT ... ON CONFLICT.
+
+    Only answers whose participant's team and question both belong to the
+    given quiz are written; the others are silently left out, so callers
+    check which keys came back. The caller commits. Returns the stored rows
+    with the question's is_last flag; on conflict the existing id and
+    answered_at are kept and only the answer content is replaced.
+    """
+    # A statement may not touch the same row twice, so the latest value per key wins
+    unique_values = {(v["participant_id"], v["question_id"]): v for v in values}
+    submitted = values_clause(*SUBMITTED_COLUMNS, name="submitted").data([
+        tuple(v[c.name] for c in SUBMITTED_COLUMNS) for v in unique_values.values()
+    ])
+    valid = (
+        select(*(submitted.c[name] for name in ANSWER_COLUMNS))
+        .join(Participant, Participant.id == submitted.c.participant_id)
+        .join(Team, and_(Team.id == Participant.team_id, Team.quiz_id == submitted.c.quiz_id))
+        .join(Question, and_(Question.id == submitted.c.question_id, Question.quiz_id == submitted.c.quiz_id))
     )
-    db.add(answer)
-    db.commit()
-    db.refresh(answer)
-    return answer
+    stmt = pg_insert(Answer).from_select(ANSWER_COLUMNS, valid)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Answer.participant_id, Answer.question_id],
+        set_={
+            "text_answer": stmt.excluded.text_answer,
+            "selected_options": stmt.excluded.selected_options,
+        }
+    ).returning(*(Answer.__table__.c[name] for name in ANSWER_COLUMNS))
+    stored = stmt.cte("stored")
+    result = await db.execute(
+        select(stored, Question.is_last).join(Question, Question.id == stored.c.question_id)
+    )
+    return list(result.all())
 
 
-def get_answers_by_question(db: Session, question_id: UUID) -> list[Answer]:
+async def get_answer_progress(db: AsyncSession, quiz_id: UUID, question_ids) -> list[dict]:
+    """Count answered/total participants per team for each of the given questions, in one query."""
+    question_ids = list(question_ids)
+    result = await db.execute(
+        select(
+            Question.id.label("question_id"),
+            Team.id.label("team_id"),
+            func.count(Participant.id).label("total"),
+            func.count(Answer.id).label("answered")
+        )
+        .select_from(Team)
+        .join(Participant, Participant.team_id == Team.id)
+        .join(Question, and_(Question.quiz_id == Team.quiz_id, Question.id.in_(question_ids)))
+        .outerjoin(Answer, and_(
+            Answer.participant_id == Participant.id,
+            Answer.question_id == Question.id
+        ))
+        .where(Team.quiz_id == quiz_id)
+        .group_by(Question.id, Team.id)
+    )
+    teams_by_question: dict = {}
+    for row in result:
+        teams_by_question.setdefault(row.question_id, []).append(
+            {"team_id": str(row.team_id), "answered": row.answered, "total": row.total}
+        )
+    progress = []
+    for question_id in question_ids:
+        teams = teams_by_question.get(UUID(str(question_id)), [])
+        progress.append({
+            "question_id": str(question_id),
+            "answered": sum(team["answered"] for team in teams),
+            "total": sum(team["total"] for team in teams),
+            "teams": teams,
+        })
+    return progress
+
+
+async def get_answers_by_question(db: AsyncSession, question_id: UUID) -> list[Answer]:
     """Get all answers for a question."""
-    return db.query(Answer).filter(Answer.question_id == question_id).all()
+    result = await db.execute(select(Answer).where(Answer.question_id == question_id))
+    return list(result.scalars().all())
 
 
-def get_participant_answers(db: Session, participant_id: UUID) -> list[Answer]:
+async def get_participant_answers(db: AsyncSession, participant_id: UUID) -> list[Answer]:
     """Get all answers for a participant."""
-    return db.query(Answer).filter(Answer.participant_id == participant_id).all()
+    result = await db.execute(select(Answer).where(Answer.participant_id == participant_id))
+    return list(result.scalars().all())
+
+
+def _forget_answer(values: dict):
+    """Drop in-memory state that counted an answer which failed to persist."""
+    # Buffered answers are recorded when accepted, before they are written
+    answer_tally.invalidate(values["quiz_id"])
+    live_statistics.invalidate(values["quiz_id"])
+
 
+# Global ingestor instance; started and stopped with the application
+answer_ingestor = AnswerIngestor(
+    upsert_answers,
+    mode=IngestMode(os.getenv("ANSWER_INGEST_MODE", IngestMode.FLUSH.value)),
+    flush_interval=float(os.getenv("ANSWER_FLUSH_INTERVAL_MS", "50")) / 1000,
+    max_batch_size=int(os.getenv("ANSWER_BATCH_SIZE", "500")),
+    on_failure=_forget_answer,
+)
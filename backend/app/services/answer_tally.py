@@ -0,0 +1,206 @@
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Answer, Question
+
+logger = logging.getLogger(__name__)
+
+# Characters stripped from text answers, like str.strip() for common input
+WHITESPACE = " \t\r\n"
+
+
+class QuizAnswerTally:
+    """Counts of one quiz's distinct trimmed text answers.
+
+    An exact tally remembers each participant's current text per question,
+    so that an edited answer moves its count instead of adding a new one.
+    A tally of grouped counts (``from_counts``) can't apply edits and is
+    only read once.
+    """
+
+    def __init__(self, exact: bool = True):
+        self.answers: Optional[Dict[Tuple[UUID, UUID], str]] = {} if exact else None
+        self.counts: Counter = Counter()
+        # When each distinct text was first given; breaks ties between equal counts
+        self.first_seen: Dict[str, datetime] = {}
+        self.touched_at = time.monotonic()
+        self._candidates: Optional[List[Tuple[str, int]]] = None
+
+    @classmethod
+    def from_counts(cls, rows: Iterable[Tuple[str, int, datetime]]) -> "QuizAnswerTally":
+        """A tally of (text, count, first answered at) rows."""
+        tally = cls(exact=False)
+        for text, count, first_seen in rows:
+            tally.counts[text] = count
+            tally.first_seen[text] = first_seen
+        return tally
+
+    @property
+    def exact(self) -> bool:
+        return self.answers is not None
+
+    def apply(self, participant_id: UUID, question_id: UUID, text_answer: Optional[str], answered_at: datetime):
+        """Record a participant's (new or changed) text answer; the tally must be exact."""
+        text = (text_answer or "").strip(WHITESPACE)
+        key = (participant_id, question_id)
+        previous = self.answers.get(key)
+        if previous == (text or None):
+            return
+        if previous is not None:
+            del self.answers[key]
+            self.counts[previous] -= 1
+            if self.counts[previous] <= 0:
+                del self.counts[previous]
+                del self.first_seen[previous]
+        if text:
+            self.answers[key] = text
+            self.counts[text] += 1
+            if text not in self.first_seen or answered_at < self.first_seen[text]:
+                self.first_seen[text] = answered_at
+        self.touched_at = time.monotonic()
+        self._candidates = None
+
+    def candidates(self) -> List[Tuple[str, int]]:
+        """Distinct texts with their counts, most common first, sorted at most once per change."""
+        if self._candidates is None:
+            self._candidates = sorted(
+                self.counts.items(),
+                key=lambda item: (-item[1], self.first_seen[item[0]])
+            )
+        return self._candidates
+
+
+class AnswerTallyRegistry:
+    """Text answer tallies of quizzes whose last question hasn't been generated yet.
+
+    A tally is only trusted while this process sees every write of the
+    quiz's answers: with a single worker (``exclusive``), every text answer
+    it upserts is passed to ``record``, and a buffered answer that fails to
+    persist drops the tally through ``invalidate``. Reading candidates then
+    costs no query. A quiz without a tally, e.g. after a restart, is
+    reloaded from its participants' answers into an exact tally, applying
+    answers recorded during the load. Without ``exclusive`` (a distributed
+    backend, where other workers write too) nothing is kept and every read
+    runs one grouped query. Tallies unused for ``idle_timeout`` seconds are
+    dropped.
+    """
+
+    def __init__(self, idle_timeout: float = 3600.0):
+        self.idle_timeout = idle_timeout
+        # Whether this process writes all answers; cleared at startup with a distributed backend
+        self.exclusive = True
+        self._quizzes: Dict[UUID, QuizAnswerTally] = {}
+        # Answers recorded during each load in progress, per quiz
+        self._loading: Dict[UUID, List[list]] = {}
+        self.hits = 0
+        self.reloads = 0
+
+    def begin(self, quiz_id: UUID):
+        """Start an exact tally for a quiz that is being started, before it accepts answers."""
+        if self.exclusive:
+            self._evict_idle()
+            self._quizzes[quiz_id] = QuizAnswerTally()
+
+    def record(self, quiz_id: UUID, participant_id: UUID, question_id: UUID,
+               text_answer: Optional[str], answered_at: datetime):
+        """Apply an upserted text answer."""
+        tally = self._quizzes.get(quiz_id)
+        if tally is not None:
+            tally.apply(participant_id, question_id, text_answer, answered_at)
+        for recorded in self._loading.get(quiz_id, ()):
+            recorded.append((participant_id, question_id, text_answer, answered_at))
+
+    def invalidate(self, quiz_id: UUID):
+        """Drop a quiz's tally, e.g. once its last question exists or an answer failed to persist."""
+        self._quizzes.pop(quiz_id, None)
+        # Loads in progress may have recorded that answer too
+        self._loading.pop(quiz_id, None)
+
+    async def candidates(self, db: AsyncSession, quiz_id: UUID) -> List[Tuple[str, int]]:
+        """Distinct trimmed text answers of a quiz with their counts, most common first."""
+        tally = self._quizzes.get(quiz_id)
+        if tally is not None:
+            self.hits += 1
+        else:
+            self.reloads += 1
+            if self.exclusive:
+                tally = await self._reload(db, quiz_id)
+            else:
+                tally = QuizAnswerTally.from_counts(await self._load_counts(db, quiz_id))
+        tally.touched_at = time.monotonic()
+        return tally.candidates()
+
+    def stats(self) -> dict:
+        return {
+            "tallied_quizzes": len(self._quizzes),
+            "hits": self.hits,
+            "reloads": self.reloads,
+        }
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        for quiz_id, tally in list(self._quizzes.items()):
+            if now - tally.touched_at > self.idle_timeout:
+                del self._quizzes[quiz_id]
+
+    async def _reload(self, db: AsyncSession, quiz_id: UUID) -> QuizAnswerTally:
+        """Load an exact tally of the quiz and track it, unless it was invalidated meanwhile."""
+        recorded = []
+        self._loading.setdefault(quiz_id, []).append(recorded)
+        try:
+            tally = QuizAnswerTally()
+            for participant_id, question_id, text_answer, answered_at in await self._load_answers(db, quiz_id):
+                tally.apply(participant_id, question_id, text_answer, answered_at)
+        finally:
+            loads = self._loading.get(quiz_id, [])
+            invalidated = not any(load is recorded for load in loads)
+            loads[:] = [load for load in loads if load is not recorded]
+            if not loads:
+                self._loading.pop(quiz_id, None)
+        if invalidated:
+            return tally
+        for answer in recorded:
+            tally.apply(*answer)
+        # Keep a tally another load has tracked first; it has seen the same answers
+        return self._quizzes.setdefault(quiz_id, tally)
+
+    @staticmethod
+    async def _load_answers(db: AsyncSession, quiz_id: UUID) -> List[Tuple[UUID, UUID, str, datetime]]:
+        result = await db.execute(
+            select(Answer.participant_id, Answer.question_id, Answer.text_answer, Answer.answered_at)
+            .join(Question, Question.id == Answer.question_id)
+            .where(
+                Question.quiz_id == quiz_id,
+                Question.is_last == False,
+                Answer.text_answer.isnot(None)
+            )
+        )
+        return [(row[0], row[1], row[2], row[3]) for row in result]
+
+    @staticmethod
+    async def _load_counts(db: AsyncSession, quiz_id: UUID) -> List[Tuple[str, int, datetime]]:
+        # Trimming, grouping and counting happen in the database, so only the distinct strings leave it
+        text = func.btrim(Answer.text_answer, WHITESPACE)
+        result = await db.execute(
+            select(text, func.count(), func.min(Answer.answered_at))
+            .join(Question, Question.id == Answer.question_id)
+            .where(
+                Question.quiz_id == quiz_id,
+                Question.is_last == False,
+                Answer.text_answer.isnot(None),
+                text != ""
+            )
+            .group_by(text)
+        )
+        return [(row[0], row[1], row[2]) for row in result]
+
+
+# Global registry instance
+answer_tally = AnswerTallyRegistry()
@@ -0,0 +1,193 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List
+from uuid import UUID
+from sqlalchemy import select
+from app.database import AsyncSessionLocal
+from app.models import Answer, Participant, Question, QuestionOption, Team
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+
+# Columns of every export format, in order
+EXPORT_COLUMNS = [
+    "team_id",
+    "team_name",
+    "participant_id",
+    "first_name",
+    "last_name",
+    "profession",
+    "contact_info",
+    "question_order",
+    "question_text",
+    "question_type",
+    "text_answer",
+    "selected_options",
+    "answered_at",
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def parquet_available() -> bool:
+    return pyarrow is not None
+
+
+async def stream_answer_rows(quiz_id: UUID, batch_size: int = 1000) -> AsyncIterator[List[dict]]:
+    """Yield the quiz's answers joined with participant, team and question, in batches.
+
+    Rows come from a server-side cursor ``batch_size`` at a time, so memory
+    use doesn't depend on the number of answers. Selected option ids are
+    replaced with the option texts. Opens its own session, since streaming
+    outlives the request's dependencies.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(QuestionOption.id, QuestionOption.text)
+            .join(Question, Question.id == QuestionOption.question_id)
+            .where(Question.quiz_id == quiz_id)
+        )
+        option_texts: Dict[str, str] = {str(option_id): text for option_id, text in result}
+
+        result = await db.stream(
+            select(
+                Team.id.label("team_id"),
+                Team.name.label("team_name"),
+                Participant.id.label("participant_id"),
+                Participant.first_name,
+                Participant.last_name,
+                Participant.profession,
+                Participant.contact_info,
+                Question.order.label("question_order"),
+                Question.text.label("question_text"),
+                Question.type.label("question_type"),
+                Answer.text_answer,
+                Answer.selected_options,
+                Answer.answered_at,
+            )
+            .join(Participant, Participant.id == Answer.participant_id)
+            .join(Team, Team.id == Participant.team_id)
+            .join(Question, Question.id == Answer.question_id)
+            .where(Question.quiz_id == quiz_id)
+            .order_by(Question.order, Team.joined_at, Team.id, Participant.last_name, Participant.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for partition in result.mappings().partitions():
+            rows = []
+            for row in partition:
+                row = dict(row)
+                if row["selected_options"] is not None:
+                    row["selected_options"] = [
+                        option_texts.get(str(option_id), str(option_id)) for option_id in row["selected_options"]
+                    ]
+                rows.append(row)
+            yield rows
+
+
+def _csv_text(rows: List[list]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+async def export_csv(quiz_id: UUID, batch_size: int = 1000) -> AsyncIterator[str]:
+    # BOM so spreadsheet applications detect UTF-8; the header goes out before the query runs
+    yield "\ufeff" + _csv_text([EXPORT_COLUMNS])
+    async for rows in stream_answer_rows(quiz_id, batch_size):
+        yield _csv_text([
+            [
+                str(row["team_id"]),
+                row["team_name"],
+                str(row["participant_id"]),
+                row["first_name"],
+                row["last_name"],
+                row["profession"] or "",
+                json.dumps(row["contact_info"], ensure_ascii=False) if row["contact_info"] else "",
+                row["question_order"],
+                row["question_text"],
+                row["question_type"],
+                row["text_answer"] or "",
+                "; ".join(row["selected_options"] or []),
+                row["answered_at"].isoformat(),
+            ]
+            for row in rows
+        ])
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def export_ndjson(quiz_id: UUID, batch_size: int = 1000) -> AsyncIterator[str]:
+    async for rows in stream_answer_rows(quiz_id, batch_size):
+        yield "".join(
+            json.dumps({column: row[column] for column in EXPORT_COLUMNS}, ensure_ascii=False, default=_json_default) + "\n"
+            for row in rows
+        )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting what the Parquet writer produces until it is taken."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def export_parquet(quiz_id: UUID, batch_size: int = 1000) -> AsyncIterator[bytes]:
+    """Stream a Parquet file with one row group per batch; requires pyarrow."""
+    schema = pyarrow.schema([
+        ("team_id", pyarrow.string()),
+        ("team_name", pyarrow.string()),
+        ("participant_id", pyarrow.string()),
+        ("first_name", pyarrow.string()),
+        ("last_name", pyarrow.string()),
+        ("profession", pyarrow.string()),
+        ("contact_info", pyarrow.string()),
+        ("question_order", pyarrow.int32()),
+        ("question_text", pyarrow.string()),
+        ("question_type", pyarrow.string()),
+        ("text_answer", pyarrow.string()),
+        ("selected_options", pyarrow.list_(pyarrow.string())),
+        ("answered_at", pyarrow.timestamp("us")),
+    ])
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    try:
+        async for rows in stream_answer_rows(quiz_id, batch_size):
+            for row in rows:
+                row["team_id"] = str(row["team_id"])
+                row["participant_id"] = str(row["participant_id"])
+                row["contact_info"] = json.dumps(row["contact_info"], ensure_ascii=False) if row["contact_info"] else None
+            writer.write_table(pyarrow.Table.from_pylist(rows, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
@@ -1,48 +1,51 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from uuid import UUID
+import os
 import uuid
-from collections import Counter
-from app.models import Quiz, Question, QuestionOption, Answer
+from app.models import Quiz, Question, QuestionOption
 from app.schemas.quiz import QuestionResponse
 from app.schemas.question import QuestionOptionResponse
+from app.services.answer_tally import answer_tally
+from app.services.live_statistics import live_statistics
+from app.services.text_clustering import cluster_answers
 
+# Trigram similarity at which two answers count as the same option
+SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_SIMILARITY_THRESHOLD", "0.6"))
 
-def generate_last_question_from_answers(db: Session, quiz_id: UUID) -> QuestionResponse:
+
+async def generate_last_question_from_answers(db: AsyncSession, quiz_id: UUID) -> QuestionResponse:
     """Generate the last question (multiple choice) from participants' text answers."""
-    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    quiz = await db.get(Quiz, quiz_id)
     if not quiz:
         raise ValueError("Quiz not found")
     
-    # Get all text questions (all questions except the last one)
-    text_questions = db.query(Question).filter(
-        Question.quiz_id == quiz_id
-    ).order_by(Question.order).all()
+    # Number of text questions (all questions except the last one)
+    question_count = await db.scalar(
+        select(func.count())
+        .select_from(Question)
+        .where(
+            Question.quiz_id == quiz_id,
+            Question.is_last == False
+        )
+    )
     
-    if not text_questions:
+    if not question_count:
         raise ValueError("No questions found")
     
-    # Collect all unique text answers from all text questions
-    all_answers = []
-    for question in text_questions:
-        answers = db.query(Answer).filter(
-            Answer.question_id == question.id,
-            Answer.text_answer.isnot(None)
-        ).all()
-        for answer in answers:
-            if answer.text_answer and answer.text_answer.strip():
-                all_answers.append(answer.text_answer.strip())
+    # Limit to reasonable number of options (e.g., top 10-15 unique answers)
+    max_options = 15
+    # Kept up to date as answers arrive; reloaded from the database when it isn't tracked
+    candidates = await answer_tally.candidates(db, quiz_id)
     
-    if not all_answers:
+    if not candidates:
         raise ValueError("No answers found to generate options")
     
-    # Count occurrences and get unique answers
-    answer_counter = Counter(all_answers)
-    # Get unique answers, sorted by frequency (most common first)
-    unique_answers = [answer for answer, _ in answer_counter.most_common()]
-    
-    # Limit to reasonable number of options (e.g., top 10-15 unique answers)
-    max_options = 15
-    unique_answers = unique_answers[:max_options]
+    # Near-duplicates ("Python", "python!", "Питон") become one option
+    clusters = cluster_answers(candidates, threshold=SIMILARITY_THRESHOLD)
+    # Most given first; each option keeps how many answers it stands for
+    top_clusters = sorted(clusters, key=lambda cluster: -cluster.count)[:max_options]
     
     # Create a virtual question response with options
     # We don't save it to DB, just return as response
@@ -51,15 +54,16 @@ def generate_last_question_from_answers(db: Session, quiz_id: UUID) -> QuestionR
     options = [
         QuestionOptionResponse(
             id=uuid.uuid4(),  # Generate unique UUIDs
-            text=answer,
-            order=i
+            text=cluster.representative,
+            order=i,
+            answer_count=cluster.count
         )
-        for i, answer in enumerate(unique_answers)
+        for i, cluster in enumerate(top_clusters)
     ]
     
     return QuestionResponse(
         id=question_id,
-        order=len(text_questions) + 1,  # Order after all text questions
+        order=question_count + 1,  # Order after all text questions
         text="Выберите наиболее интересные/важные варианты из предложенных ответов участников:",
         type="multiple_choice",
         is_last=True,
@@ -67,13 +71,18 @@ def generate_last_question_from_answers(db: Session, quiz_id: UUID) -> QuestionR
     )
 
 
-def get_or_create_last_question(db: Session, quiz_id: UUID) -> QuestionResponse:
+async def get_or_create_last_question(db: AsyncSession, quiz_id: UUID) -> QuestionResponse:
     """Get the last question, creating it dynamically if needed."""
     # Check if last question already exists in DB
-    last_question = db.query(Question).filter(
-        Question.quiz_id == quiz_id,
-        Question.is_last == True
-    ).first()
+    result = await db.execute(
+        select(Question)
+        .where(
+            Question.quiz_id == quiz_id,
+            Question.is_last == True
+        )
+        .options(selectinload(Question.options))
+    )
+    last_question = result.scalars().first()
     
     if last_question:
         # Return existing question
@@ -81,7 +90,8 @@ def get_or_create_last_question(db: Session, quiz_id: UUID) -> QuestionResponse:
             QuestionOptionResponse(
                 id=opt.id,
                 text=opt.text,
-                order=opt.order
+                order=opt.order,
+                answer_count=opt.answer_count
             )
             for opt in last_question.options
         ]
@@ -95,20 +105,23 @@ def get_or_create_last_question(db: Session, quiz_id: UUID) -> QuestionResponse:
         )
     
     # Generate dynamically
-    return generate_last_question_from_answers(db, quiz_id)
+    return await generate_last_question_from_answers(db, quiz_id)
 
 
-def create_last_question_in_db(db: Session, quiz_id: UUID) -> Question:
+async def create_last_question_in_db(db: AsyncSession, quiz_id: UUID) -> Question:
     """Create and save the last question in database."""
     # Generate question data
-    question_response = generate_last_question_from_answers(db, quiz_id)
+    question_response = await generate_last_question_from_answers(db, quiz_id)
     
     # Get max order
-    max_order = db.query(Question.order).filter(
-        Question.quiz_id == quiz_id
-    ).order_by(Question.order.desc()).first()
+    max_order = await db.scalar(
+        select(Question.order)
+        .where(Question.quiz_id == quiz_id)
+        .order_by(Question.order.desc())
+        .limit(1)
+    )
     
-    order = (max_order[0] if max_order else 0) + 1
+    order = (max_order or 0) + 1
     
     # Create question
     question = Question(
@@ -119,18 +132,24 @@ def create_last_question_in_db(db: Session, quiz_id: UUID) -> Question:
         is_last=True
     )
     db.add(question)
-    db.flush()
+    await db.flush()
     
     # Create options
+    options = []
     for i, option_response in enumerate(question_response.options):
         option = QuestionOption(
             question_id=question.id,
             text=option_response.text,
-            order=i
+            order=i,
+            answer_count=option_response.answer_count
         )
         db.add(option)
+        options.append(option)
     
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    await db.refresh(question)
+    # Votes on the last question are counted live from here on
+    live_statistics.track(quiz_id, question, options)
+    answer_tally.invalidate(quiz_id)
     return question
 
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.database import AsyncSessionLocal
+from app.models import Answer, Question, QuestionOption
+from app.schemas.statistics import StatisticsResponse, OptionStatistics
+from app.services import statistics_service
+
+logger = logging.getLogger(__name__)
+
+
+class LiveQuestionStatistics:
+    """Per-option vote counters for one multiple-choice question, updated per answer.
+
+    Each participant's current selection is remembered so that a changed
+    answer moves its votes instead of adding new ones. ``snapshot`` returns a
+    response built at most once per change.
+    """
+
+    def __init__(self, question_id: UUID, question_text: str, options: Iterable[Tuple[UUID, str]]):
+        self.question_id = question_id
+        self.question_text = question_text
+        self.options: List[Tuple[UUID, str]] = list(options)
+        self.selections: Dict[UUID, FrozenSet[str]] = {}
+        self.counts: Counter = Counter()
+        self.touched_at = time.monotonic()
+        self._snapshot: Optional[StatisticsResponse] = None
+
+    def apply(self, participant_id: UUID, selected_options: Optional[Iterable]):
+        """Record a participant's (new or changed) selection."""
+        selection = frozenset(str(option_id) for option_id in selected_options or ())
+        previous = self.selections.get(participant_id)
+        if previous == selection:
+            return
+        if previous:
+            self.counts.subtract(previous)
+        self.counts.update(selection)
+        self.selections[participant_id] = selection
+        self.touched_at = time.monotonic()
+        self._snapshot = None
+
+    @property
+    def total_answers(self) -> int:
+        return len(self.selections)
+
+    def option_counts(self) -> Dict[str, int]:
+        return {option_id: count for option_id, count in self.counts.items() if count > 0}
+
+    def snapshot(self) -> StatisticsResponse:
+        if self._snapshot is None:
+            total = self.total_answers
+            self._snapshot = StatisticsResponse(
+                question_id=self.question_id,
+                question_text=self.question_text,
+                total_answers=total,
+                options=[
+                    OptionStatistics(
+                        option_id=option_id,
+                        option_text=option_text,
+                        count=self.counts[str(option_id)],
+                        percentage=round(self.counts[str(option_id)] / total * 100, 2) if total > 0 else 0.0
+                    )
+                    for option_id, option_text in self.options
+                ]
+            )
+        return self._snapshot
+
+
+class LiveStatisticsRegistry:
+    """Live statistics of each quiz's last question, keyed by quiz id.
+
+    Counters are per process: answers written by other workers are only
+    picked up by ``reconcile``, which compares each recently used counter
+    with a recompute from the database and reloads it on mismatch; a
+    buffered answer that fails to persist drops the counter through
+    ``invalidate``. Answers recorded while a counter is loaded are applied
+    to the loaded one before it is tracked, so none are lost to the swap.
+    Counters unused for ``idle_timeout`` seconds are dropped and reloaded
+    on next access.
+    """
+
+    def __init__(self, reconcile_interval: float = 10.0, idle_timeout: float = 900.0):
+        self.reconcile_interval = reconcile_interval
+        self.idle_timeout = idle_timeout
+        self._quizzes: Dict[UUID, LiveQuestionStatistics] = {}
+        # Answers recorded during each load in progress, per quiz
+        self._loading: Dict[UUID, List[List[Tuple[UUID, UUID, Optional[list]]]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.reconciliations = 0
+        self.mismatches = 0
+
+    def track(self, quiz_id: UUID, question: Question, options: Iterable[QuestionOption]):
+        """Start counting votes for a newly created last question."""
+        self._quizzes[quiz_id] = LiveQuestionStatistics(
+            question.id, question.text, [(option.id, option.text) for option in options]
+        )
+
+    def record(self, quiz_id: UUID, question_id: UUID, participant_id: UUID, selected_options: Optional[list]):
+        """Apply an upserted answer if its question is being counted."""
+        statistics = self._quizzes.get(quiz_id)
+        if statistics is not None and statistics.question_id == question_id:
+            statistics.apply(participant_id, selected_options)
+        for recorded in self._loading.get(quiz_id, ()):
+            recorded.append((question_id, participant_id, selected_options))
+
+    def invalidate(self, quiz_id: UUID):
+        """Drop a quiz's counter, e.g. after a counted answer failed to persist; it is reloaded on next access."""
+        self._quizzes.pop(quiz_id, None)
+        # Loads in progress may have recorded that answer too
+        self._loading.pop(quiz_id, None)
+
+    async def get(self, db: AsyncSession, quiz_id: UUID) -> Optional[LiveQuestionStatistics]:
+        """Return the quiz's live statistics, loading them from the database if not tracked yet."""
+        statistics = self._quizzes.get(quiz_id)
+        if statistics is None:
+            statistics = await self._reload(db, quiz_id, None)
+        else:
+            statistics.touched_at = time.monotonic()
+        return statistics
+
+    async def reconcile(self, db: AsyncSession) -> int:
+        """Check recently used counters against the database; return the number of mismatches."""
+        mismatches = 0
+        now = time.monotonic()
+        for quiz_id, statistics in list(self._quizzes.items()):
+            if now - statistics.touched_at > self.idle_timeout:
+                del self._quizzes[quiz_id]
+                continue
+            total = await db.scalar(
+                select(func.count()).select_from(Answer).where(Answer.question_id == statistics.question_id)
+            )
+            counts = await statistics_service.count_option_selections(db, statistics.question_id)
+            if total == statistics.total_answers and counts == statistics.option_counts():
+                continue
+
+            mismatches += 1
+            logger.warning(f"Live statistics for quiz {quiz_id} drifted from the database, reloading")
+            reloaded = await self._reload(db, quiz_id, statistics)
+            if reloaded is not None:
+                reloaded.touched_at = statistics.touched_at
+        self.reconciliations += 1
+        self.mismatches += mismatches
+        return mismatches
+
+    async def start(self):
+        if self._task is None and self.reconcile_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "tracked_questions": len(self._quizzes),
+            "reconciliations": self.reconciliations,
+            "mismatches": self.mismatches,
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.reconcile(db)
+            except Exception as e:
+                logger.error(f"Error reconciling live statistics: {e}")
+
+    async def _reload(self, db: AsyncSession, quiz_id: UUID,
+                      current: Optional[LiveQuestionStatistics]) -> Optional[LiveQuestionStatistics]:
+        """Load a quiz's counter from the database and track it in place of ``current``.
+
+        Answers recorded during the load are applied to it first. If the
+        tracked counter was replaced (``track``, another load) or dropped
+        (``invalidate``) meanwhile, the loaded one isn't tracked.
+        """
+        recorded = []
+        self._loading.setdefault(quiz_id, []).append(recorded)
+        try:
+            statistics = await self._load(db, quiz_id)
+        finally:
+            loads = self._loading.get(quiz_id, [])
+            invalidated = not any(load is recorded for load in loads)
+            loads[:] = [load for load in loads if load is not recorded]
+            if not loads:
+                self._loading.pop(quiz_id, None)
+        if statistics is None or invalidated:
+            return statistics
+        for question_id, participant_id, selected_options in recorded:
+            if question_id == statistics.question_id:
+                statistics.apply(participant_id, selected_options)
+        tracked = self._quizzes.get(quiz_id)
+        if tracked is not current:
+            return tracked or statistics
+        self._quizzes[quiz_id] = statistics
+        return statistics
+
+    @staticmethod
+    async def _load(db: AsyncSession, quiz_id: UUID) -> Optional[LiveQuestionStatistics]:
+        result = await db.execute(
+            select(Question)
+            .where(
+                Question.quiz_id == quiz_id,
+                Question.is_last == True
+            )
+            .options(selectinload(Question.options))
+        )
+        question = result.scalars().first()
+        if question is None:
+            return None
+
+        statistics = LiveQuestionStatistics(
+            question.id, question.text, [(option.id, option.text) for option in question.options]
+        )
+        result = await db.execute(
+            select(Answer.participant_id, Answer.selected_options).where(Answer.question_id == question.id)
+        )
+        for participant_id, selected_options in result:
+            statistics.apply(participant_id, selected_options)
+        return statistics
+
+
+# Global registry instance
+live_statistics = LiveStatisticsRegistry(
+    reconcile_interval=float(os.getenv("LIVE_STATS_RECONCILE_SECONDS", "10"))
+)
@@ -0,0 +1,114 @@
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.schemas.quiz import QuestionResponse
+
+
+@dataclass(frozen=True)
+class RenderedQuestion:
+    """A question serialized once, with a strong ETag of its exact bytes."""
+    body: bytes
+    etag: str
+    # False for the generated, not yet stored last question
+    cacheable: bool = True
+
+    @classmethod
+    def render(cls, question: QuestionResponse, cacheable: bool = True) -> "RenderedQuestion":
+        return cls.from_body(question.model_dump_json().encode(), cacheable)
+
+    @classmethod
+    def from_body(cls, body: bytes, cacheable: bool = True) -> "RenderedQuestion":
+        return cls(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"', cacheable=cacheable)
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header value covers this representation (weak comparison)."""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+
+class RenderedQuestionCache:
+    """In-process LRU cache of rendered current questions, per quiz by invite code and then by order.
+
+    A quiz's questions are dropped together by ``invalidate`` whenever its
+    current question changes. As in QuizStateCache, a loader passes the
+    version it read before querying to ``set``, so a render that raced an
+    invalidation is not cached; versions are kept in the per-quiz entries,
+    of which there are at most ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # invite_code -> (version, rendered questions by order)
+        self._entries: "OrderedDict[str, Tuple[int, Dict[int, RenderedQuestion]]]" = OrderedDict()
+        # Last version handed out, and the version of quizzes without an entry
+        self._clock = 0
+        self._evicted_version = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, invite_code: str, order: int) -> Optional[RenderedQuestion]:
+        entry = self._entries.get(invite_code)
+        rendered = entry[1].get(order) if entry is not None else None
+        if rendered is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(invite_code)
+        self.hits += 1
+        return rendered
+
+    def version(self, invite_code: str) -> int:
+        entry = self._entries.get(invite_code)
+        return entry[0] if entry is not None else self._evicted_version
+
+    def set(self, invite_code: str, order: int, rendered: RenderedQuestion, version: int) -> None:
+        if self.version(invite_code) != version:
+            return
+        entry = self._entries.get(invite_code)
+        questions = entry[1] if entry is not None else {}
+        questions[order] = rendered
+        self._store(invite_code, (version, questions))
+
+    def prime(self, invite_code: str, order: int, rendered: RenderedQuestion) -> None:
+        """Store a question rendered elsewhere (e.g. received in a broadcast) as current."""
+        self.set(invite_code, order, rendered, self.version(invite_code))
+
+    def invalidate(self, invite_code: str) -> None:
+        """Drop every rendered question of a quiz."""
+        self._clock += 1
+        self._store(invite_code, (self._clock, {}))
+
+    def clear(self) -> None:
+        """Drop everything, including what loaders in flight would cache."""
+        self._entries.clear()
+        self._clock += 1
+        self._evicted_version = self._clock
+
+    def _store(self, invite_code: str, entry: Tuple[int, Dict[int, RenderedQuestion]]) -> None:
+        self._entries[invite_code] = entry
+        self._entries.move_to_end(invite_code)
+        while len(self._entries) > self.max_entries:
+            _, (version, _) = self._entries.popitem(last=False)
+            self._evicted_version = max(self._evicted_version, version)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+
+
+# Global cache instance
+question_cache = RenderedQuestionCache(
+    max_entries=int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", "1024"))
+)
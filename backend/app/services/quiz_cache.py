@@ -0,0 +1,107 @@
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from uuid import UUID
+
+from app.models.quiz import QuizStatus
+
+
+@dataclass(frozen=True)
+class QuizState:
+    """Immutable snapshot of the quiz fields read on hot paths."""
+    id: UUID
+    invite_code: str
+    status: QuizStatus
+    current_question_order: Optional[int]
+
+
+class QuizStateCache:
+    """In-process TTL/LRU cache of quiz state keyed by invite code.
+
+    Writers must call ``invalidate`` after committing a change to a quiz. Each
+    invalidation gives the key a new version; a loader that started before the
+    invalidation passes the version it saw to ``set`` and its (possibly stale)
+    result is dropped instead of cached.
+
+    Versions live in the entries, so they are bounded by ``max_entries``: an
+    invalidated quiz keeps an empty entry with its version until evicted.
+    Keys without an entry share the version of the newest evicted one, so a
+    loader that raced an evicted invalidation is still dropped (as are, to
+    be safe, other loaders of uncached keys in flight at that moment).
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # invite_code -> (version, expires_at, state); state is None once invalidated
+        self._entries: "OrderedDict[str, Tuple[int, float, Optional[QuizState]]]" = OrderedDict()
+        # Last version handed out, and the version of keys without an entry
+        self._clock = 0
+        self._evicted_version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, invite_code: str) -> Optional[QuizState]:
+        """Return cached state or None on miss/expiry."""
+        entry = self._entries.get(invite_code)
+        if entry is not None:
+            _, expires_at, state = entry
+            if state is not None and expires_at > time.monotonic():
+                self._entries.move_to_end(invite_code)
+                self.hits += 1
+                return state
+        self.misses += 1
+        return None
+
+    def version(self, invite_code: str) -> int:
+        """Current version of a key; pass it back to ``set`` after loading."""
+        entry = self._entries.get(invite_code)
+        return entry[0] if entry is not None else self._evicted_version
+
+    def set(self, state: QuizState, version: int) -> None:
+        """Cache state unless the key was invalidated since ``version`` was read."""
+        if self.version(state.invite_code) != version:
+            return
+        self._store(state.invite_code, (version, time.monotonic() + self.ttl_seconds, state))
+
+    def invalidate(self, invite_code: str) -> None:
+        """Drop a quiz from the cache after its status or current question changed."""
+        self._clock += 1
+        self._store(invite_code, (self._clock, 0.0, None))
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop everything, including what loaders in flight would cache."""
+        self._entries.clear()
+        self._clock += 1
+        self._evicted_version = self._clock
+
+    def _store(self, invite_code: str, entry: Tuple[int, float, Optional[QuizState]]) -> None:
+        self._entries[invite_code] = entry
+        self._entries.move_to_end(invite_code)
+        while len(self._entries) > self.max_entries:
+            _, (version, _, _) = self._entries.popitem(last=False)
+            self._evicted_version = max(self._evicted_version, version)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global cache instance
+quiz_cache = QuizStateCache(
+    ttl_seconds=float(os.getenv("QUIZ_CACHE_TTL_SECONDS", "5")),
+    max_entries=int(os.getenv("QUIZ_CACHE_MAX_ENTRIES", "1024")),
+)
@@ -1,8 +1,13 @@
 import secrets
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app.models import Quiz, Question, QuestionOption
-from app.schemas.quiz import QuizCreate, QuizResponse, QuestionCreate
+from app.schemas.quiz import QuizCreate, QuizResponse, QuestionCreate, QuestionResponse
 from app.models.quiz import QuizStatus
+from app.services.quiz_cache import QuizState, quiz_cache
+from app.services.question_cache import RenderedQuestion, question_cache
+from app.services.last_question_service import get_or_create_last_question
 
 
 def generate_invite_code() -> str:
@@ -10,12 +15,12 @@ def generate_invite_code() -> str:
     return secrets.token_urlsafe(6)[:6].upper()
 
 
-def create_quiz(db: Session, quiz_data: QuizCreate) -> Quiz:
+async def create_quiz(db: AsyncSession, quiz_data: QuizCreate) -> Quiz:
     """Create a new quiz with questions. All questions must be text_input."""
     invite_code = generate_invite_code()
     
     # Ensure invite code is unique
-    while db.query(Quiz).filter(Quiz.invite_code == invite_code).first():
+    while await db.scalar(select(Quiz.id).where(Quiz.invite_code == invite_code)):
         invite_code = generate_invite_code()
     
     quiz = Quiz(
@@ -24,7 +29,7 @@ def create_quiz(db: Session, quiz_data: QuizCreate) -> Quiz:
         status=QuizStatus.DRAFT
     )
     db.add(quiz)
-    db.flush()
+    await db.flush()
     
     # Create questions - all must be text_input
     for question_data in quiz_data.questions:
@@ -38,32 +43,109 @@ def create_quiz(db: Session, quiz_data: QuizCreate) -> Quiz:
         )
         db.add(question)
     
-    db.commit()
-    db.refresh(quiz)
-    return quiz
+    await db.commit()
+    return await get_quiz_with_questions(db, invite_code)
 
 
-def get_quiz_by_invite_code(db: Session, invite_code: str) -> Quiz | None:
+async def get_quiz_by_invite_code(db: AsyncSession, invite_code: str) -> Quiz | None:
     """Get quiz by invite code."""
-    return db.query(Quiz).filter(Quiz.invite_code == invite_code).first()
+    result = await db.execute(select(Quiz).where(Quiz.invite_code == invite_code))
+    return result.scalars().first()
+
+
+async def get_quiz_state(db: AsyncSession, invite_code: str) -> QuizState | None:
+    """Get the cached status/current question of a quiz, loading it on a miss."""
+    state = quiz_cache.get(invite_code)
+    if state is not None:
+        return state
+    
+    version = quiz_cache.version(invite_code)
+    result = await db.execute(
+        select(Quiz.id, Quiz.invite_code, Quiz.status, Quiz.current_question_order)
+        .where(Quiz.invite_code == invite_code)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    
+    state = QuizState(
+        id=row.id,
+        invite_code=row.invite_code,
+        status=row.status,
+        current_question_order=row.current_question_order
+    )
+    quiz_cache.set(state, version)
+    return state
+
+
+async def get_rendered_question(db: AsyncSession, quiz: QuizState) -> RenderedQuestion | None:
+    """Get the quiz's current question serialized, from the question cache when possible."""
+    order = quiz.current_question_order
+    rendered = question_cache.get(quiz.invite_code, order)
+    if rendered is not None:
+        return rendered
+    
+    version = question_cache.version(quiz.invite_code)
+    # Get max order of existing questions
+    max_order = await db.scalar(
+        select(Question.order)
+        .where(Question.quiz_id == quiz.id)
+        .order_by(Question.order.desc())
+        .limit(1)
+    )
+    
+    # If current question order is greater than max, it's the last (dynamic) question
+    if order > (max_order or 0):
+        # Generated on the fly and not stored, so it isn't cached either
+        return RenderedQuestion.render(await get_or_create_last_question(db, quiz.id), cacheable=False)
+    
+    # Regular question from DB
+    result = await db.execute(
+        select(Question)
+        .where(
+            Question.quiz_id == quiz.id,
+            Question.order == order
+        )
+        .options(selectinload(Question.options))
+    )
+    question = result.scalars().first()
+    if question is None:
+        return None
+    
+    rendered = RenderedQuestion.render(QuestionResponse.model_validate(question))
+    question_cache.set(quiz.invite_code, order, rendered, version)
+    return rendered
+
 
+async def get_quiz_with_questions(db: AsyncSession, invite_code: str) -> Quiz | None:
+    """Get quiz by invite code with questions and their options eagerly loaded."""
+    result = await db.execute(
+        select(Quiz)
+        .where(Quiz.invite_code == invite_code)
+        .options(selectinload(Quiz.questions).selectinload(Question.options))
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
 
-def update_quiz_status(db: Session, quiz_id, status: QuizStatus) -> Quiz | None:
+
+async def update_quiz_status(db: AsyncSession, quiz_id, status: QuizStatus) -> Quiz | None:
     """Update quiz status."""
-    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    quiz = await db.get(Quiz, quiz_id)
     if quiz:
         quiz.status = status
-        db.commit()
-        db.refresh(quiz)
+        await db.commit()
+        await db.refresh(quiz)
+        quiz_cache.invalidate(quiz.invite_code)
     return quiz
 
 
-def set_current_question(db: Session, quiz_id, question_order: int) -> Quiz | None:
+async def set_current_question(db: AsyncSession, quiz_id, question_order: int) -> Quiz | None:
     """Set current question for quiz."""
-    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    quiz = await db.get(Quiz, quiz_id)
     if quiz:
         quiz.current_question_order = question_order
-        db.commit()
-        db.refresh(quiz)
+        await db.commit()
+        await db.refresh(quiz)
+        quiz_cache.invalidate(quiz.invite_code)
+        question_cache.invalidate(quiz.invite_code)
     return quiz
-
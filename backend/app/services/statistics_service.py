@@ -1,34 +1,37 @@
-from sqlalchemy.orm import Session
+from collections import Counter
+from sqlalchemy import case, distinct, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from app.models import Answer, Question, QuestionOption
 from app.schemas.statistics import StatisticsResponse, OptionStatistics
 
 
-def get_statistics_for_question(db: Session, question_id: UUID) -> StatisticsResponse:
+async def get_statistics_for_question(db: AsyncSession, question_id: UUID) -> StatisticsResponse:
     """Get statistics for a question (only for multiple choice questions)."""
-    question = db.query(Question).filter(Question.id == question_id).first()
+    question = await db.get(Question, question_id)
     if not question:
         raise ValueError("Question not found")
     
     if question.type != "multiple_choice":
         raise ValueError("Statistics only available for multiple choice questions")
     
-    # Get all answers for this question
-    answers = db.query(Answer).filter(Answer.question_id == question_id).all()
-    total_answers = len(answers)
+    total_answers = await db.scalar(
+        select(func.count()).select_from(Answer).where(Answer.question_id == question_id)
+    )
+    selection_counts = await count_option_selections(db, question_id)
     
     # Get all options for this question
-    options = db.query(QuestionOption).filter(
-        QuestionOption.question_id == question_id
-    ).order_by(QuestionOption.order).all()
+    result = await db.execute(
+        select(QuestionOption)
+        .where(QuestionOption.question_id == question_id)
+        .order_by(QuestionOption.order)
+    )
+    options = result.scalars().all()
     
     # Count selections for each option
     option_stats = []
     for option in options:
-        count = 0
-        for answer in answers:
-            if answer.selected_options and str(option.id) in [str(opt_id) for opt_id in answer.selected_options]:
-                count += 1
+        count = selection_counts.get(str(option.id), 0)
         
         percentage = (count / total_answers * 100) if total_answers > 0 else 0.0
         
@@ -47,16 +50,52 @@ def get_statistics_for_question(db: Session, question_id: UUID) -> StatisticsRes
     )
 
 
-def get_statistics_for_last_question(db: Session, quiz_id: UUID) -> StatisticsResponse | None:
+async def count_option_selections(db: AsyncSession, question_id: UUID) -> dict[str, int]:
+    """Count answers selecting each option, keyed by option id string."""
+    if db.get_bind().dialect.name == "postgresql":
+        return await _count_option_selections_sql(db, question_id)
+    return await _count_option_selections_python(db, question_id)
+
+
+async def _count_option_selections_sql(db: AsyncSession, question_id: UUID) -> dict[str, int]:
+    # Answers without a selection store JSON null, which json_array_elements_text rejects
+    selected = case(
+        (func.json_typeof(Answer.selected_options) == "array", Answer.selected_options),
+        else_=func.json_build_array()
+    )
+    option_ids = func.json_array_elements_text(selected).table_valued("value").alias("option_ids")
+    result = await db.execute(
+        select(option_ids.c.value, func.count(distinct(Answer.id)))
+        .select_from(Answer)
+        .join(option_ids, true())
+        .where(Answer.question_id == question_id)
+        .group_by(option_ids.c.value)
+    )
+    return {option_id: count for option_id, count in result}
+
+
+async def _count_option_selections_python(db: AsyncSession, question_id: UUID) -> dict[str, int]:
+    # Single pass over the selections for databases without JSON set-returning functions
+    counts = Counter()
+    result = await db.execute(select(Answer.selected_options).where(Answer.question_id == question_id))
+    for selected_options in result.scalars():
+        if selected_options:
+            counts.update({str(option_id) for option_id in selected_options})
+    return dict(counts)
+
+
+async def get_statistics_for_last_question(db: AsyncSession, quiz_id: UUID) -> StatisticsResponse | None:
     """Get statistics for the last question of a quiz."""
     # Find the last question
-    last_question = db.query(Question).filter(
-        Question.quiz_id == quiz_id,
-        Question.is_last == True
-    ).first()
+    result = await db.execute(
+        select(Question).where(
+            Question.quiz_id == quiz_id,
+            Question.is_last == True
+        )
+    )
+    last_question = result.scalars().first()
     
     if not last_question:
         return None
     
-    return get_statistics_for_question(db, last_question.id)
-
+    return await get_statistics_for_question(db, last_question.id)
@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Participant, Quiz, Team
+from app.models.quiz import QuizStatus
+from app.schemas.team import ParticipantCreate, TeamCreate, TeamImportError, TeamImportResult
+from app.services.quiz_cache import quiz_cache
+
+# CSV columns with a fixed meaning; any other non-empty column goes into contact_info
+CSV_TEAM_COLUMN = "team"
+CSV_PARTICIPANT_COLUMNS = ("first_name", "last_name", "profession")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" if item["loc"] else item["msg"]
+        for item in error.errors()
+    )
+
+
+def parse_csv(data: str) -> Tuple[List[TeamCreate], List[TeamImportError]]:
+    """Parse one participant per row; rows with the same ``team`` form one team, in file order.
+    
+    The delimiter (comma, semicolon or tab) is detected from the header line,
+    so spreadsheets exported with a regional list separator work as is.
+    """
+    header = data.split("\n", 1)[0]
+    try:
+        dialect = csv.Sniffer().sniff(header, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(data), dialect=dialect)
+    fieldnames = [name.strip() for name in reader.fieldnames or []]
+    missing = [column for column in (CSV_TEAM_COLUMN, "first_name", "last_name") if column not in fieldnames]
+    if missing:
+        return [], [TeamImportError(row=1, error=f"Missing columns: {', '.join(missing)}")]
+    reader.fieldnames = fieldnames
+
+    teams: Dict[str, TeamCreate] = {}
+    errors = []
+    for row in reader:
+        values = {key: (value or "").strip() for key, value in row.items() if key is not None}
+        team_name = values.pop(CSV_TEAM_COLUMN)
+        if not team_name:
+            errors.append(TeamImportError(row=reader.line_num, error=f"{CSV_TEAM_COLUMN}: Field required"))
+            continue
+        fields = {column: values.pop(column) for column in CSV_PARTICIPANT_COLUMNS if column in values}
+        fields = {column: value for column, value in fields.items() if value}
+        contact_info = {key: value for key, value in values.items() if value}
+        try:
+            participant = ParticipantCreate(**fields, contact_info=contact_info or None)
+        except ValidationError as e:
+            errors.append(TeamImportError(row=reader.line_num, error=_validation_message(e)))
+            continue
+        teams.setdefault(team_name, TeamCreate(name=team_name, participants=[])).participants.append(participant)
+    return list(teams.values()), errors
+
+
+def parse_ndjson(data: str) -> Tuple[List[TeamCreate], List[TeamImportError]]:
+    """Parse one team per line, each a JSON object shaped like the create-team request."""
+    teams = []
+    errors = []
+    for line_number, line in enumerate(data.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            teams.append(TeamCreate.model_validate(json.loads(line)))
+        except json.JSONDecodeError as e:
+            errors.append(TeamImportError(row=line_number, error=f"Invalid JSON: {e.msg}"))
+        except ValidationError as e:
+            errors.append(TeamImportError(row=line_number, error=_validation_message(e)))
+    return teams, errors
+
+
+async def import_teams(db: AsyncSession, quiz: Quiz, teams: List[TeamCreate]) -> Tuple[int, int]:
+    """Insert teams and their participants with two multi-row INSERTs in one transaction.
+    
+    Returns the number of teams and participants inserted.
+    """
+    if not teams:
+        return 0, 0
+    
+    status_changed = quiz.status == QuizStatus.DRAFT
+    if status_changed:
+        quiz.status = QuizStatus.WAITING
+    
+    joined_at = datetime.utcnow()
+    team_rows = []
+    participant_rows = []
+    for i, team_data in enumerate(teams):
+        team_id = uuid.uuid4()
+        team_rows.append({
+            "id": team_id,
+            "quiz_id": quiz.id,
+            "name": team_data.name,
+            # Distinct join times keep the roster order equal to the file order
+            "joined_at": joined_at + timedelta(microseconds=i),
+        })
+        participant_rows.extend(
+            {
+                "id": uuid.uuid4(),
+                "team_id": team_id,
+                "first_name": participant.first_name,
+                "last_name": participant.last_name,
+                "contact_info": participant.contact_info,
+                "profession": participant.profession,
+            }
+            for participant in team_data.participants
+        )
+    
+    await db.execute(insert(Team), team_rows)
+    if participant_rows:
+        await db.execute(insert(Participant), participant_rows)
+    await db.commit()
+    if status_changed:
+        quiz_cache.invalidate(quiz.invite_code)
+    return len(team_rows), len(participant_rows)
+
+
+async def import_teams_from_file(db: AsyncSession, quiz: Quiz, data: str, file_format: str) -> TeamImportResult:
+    """Parse a CSV or NDJSON upload and import its valid rows; invalid rows are reported, not imported."""
+    parse = parse_csv if file_format == "csv" else parse_ndjson
+    teams, errors = parse(data)
+    imported_teams, imported_participants = await import_teams(db, quiz, teams)
+    return TeamImportResult(
+        imported_teams=imported_teams,
+        imported_participants=imported_participants,
+        errors=errors
+    )
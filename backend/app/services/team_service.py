@@ -1,18 +1,25 @@
-from sqlalchemy.orm import Session
+import base64
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app.models import Team, Participant, Quiz
 from app.schemas.team import TeamCreate, ParticipantCreate
 from app.models.quiz import QuizStatus
+from app.services.quiz_cache import quiz_cache
 
 
-def create_team(db: Session, quiz_id, team_data: TeamCreate) -> Team:
+async def create_team(db: AsyncSession, quiz_id, team_data: TeamCreate) -> Team:
     """Create a new team with participants."""
     # Check if quiz exists and is in waiting status
-    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    quiz = await db.get(Quiz, quiz_id)
     if not quiz:
         raise ValueError("Quiz not found")
     
     # Update quiz status to waiting if it's draft
-    if quiz.status == QuizStatus.DRAFT:
+    status_changed = quiz.status == QuizStatus.DRAFT
+    if status_changed:
         quiz.status = QuizStatus.WAITING
     
     team = Team(
@@ -20,7 +27,7 @@ def create_team(db: Session, quiz_id, team_data: TeamCreate) -> Team:
         name=team_data.name
     )
     db.add(team)
-    db.flush()
+    await db.flush()
     
     # Create participants
     for participant_data in team_data.participants:
@@ -33,17 +40,77 @@ def create_team(db: Session, quiz_id, team_data: TeamCreate) -> Team:
         )
         db.add(participant)
     
-    db.commit()
-    db.refresh(team)
+    await db.commit()
+    if status_changed:
+        quiz_cache.invalidate(quiz.invite_code)
+    await db.refresh(team, attribute_names=["participants"])
     return team
 
 
-def get_teams_by_quiz(db: Session, quiz_id) -> list[Team]:
-    """Get all teams for a quiz."""
-    return db.query(Team).filter(Team.quiz_id == quiz_id).all()
+async def get_teams_by_quiz(
+    db: AsyncSession,
+    quiz_id,
+    after: tuple[datetime, UUID] | None = None,
+    since: datetime | None = None,
+    limit: int | None = None
+) -> list[Team]:
+    """Get teams for a quiz in join order, with their participants.
+    
+    Keyset pagination on (joined_at, id): ``after`` is the position of the
+    last team already seen, ``since`` a time after which teams joined. Two
+    queries regardless of the number of teams.
+    
+    joined_at is set when a team is written, not when its transaction
+    commits, so a team can become visible behind a position already passed;
+    compare with ``count_teams`` to notice it.
+    """
+    query = (
+        select(Team)
+        .where(Team.quiz_id == quiz_id)
+        .order_by(Team.joined_at, Team.id)
+        .options(selectinload(Team.participants))
+    )
+    if after is not None:
+        query = query.where(tuple_(Team.joined_at, Team.id) > tuple_(*after))
+    if since is not None:
+        query = query.where(Team.joined_at > since)
+    if limit is not None:
+        query = query.limit(limit)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+def encode_roster_cursor(team: Team) -> str:
+    """Opaque cursor pointing just past a team in roster order."""
+    position = f"{team.joined_at.isoformat()}|{team.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
 
+def decode_roster_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Parse a cursor from ``encode_roster_cursor``; raises ValueError if malformed."""
+    try:
+        joined_at, team_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(joined_at), UUID(team_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
 
-def get_team_by_id(db: Session, team_id) -> Team | None:
+
+async def get_team_by_id(db: AsyncSession, team_id) -> Team | None:
     """Get team by ID."""
-    return db.query(Team).filter(Team.id == team_id).first()
+    return await db.get(Team, team_id)
+
+
+async def get_participant_team_id(db: AsyncSession, quiz_id, participant_id) -> UUID | None:
+    """Get the team of a participant, if the participant belongs to the quiz."""
+    result = await db.execute(
+        select(Team.id)
+        .join(Participant, Participant.team_id == Team.id)
+        .where(Participant.id == participant_id, Team.quiz_id == quiz_id)
+    )
+    return result.scalar()
+
 
+async def count_teams(db: AsyncSession, quiz_id) -> int:
+    """Count the teams registered for a quiz."""
+    result = await db.execute(select(func.count()).select_from(Team).where(Team.quiz_id == quiz_id))
+    return result.scalar_one()
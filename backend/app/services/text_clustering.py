@@ -0,0 +1,132 @@
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+# Russian -> Latin transliteration used only for similarity keys
+_TRANSLITERATION = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "h", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya",
+})
+# Spelling variants that transliteration tends to produce ("python" / "питон")
+_SPELLING_FOLDS = [("ph", "f"), ("th", "t"), ("ck", "k"), ("w", "v"), ("y", "i")]
+# Doubled letters are typos ("pythonn"); doubled digits and symbols change the answer ("100" / "10")
+_REPEATED_LETTERS = re.compile(r"([^\W\d_])\1+")
+_NUMBERS = re.compile(r"\d+")
+_WHITESPACE = re.compile(r"\s+")
+# Symbols that tell answers apart rather than decorate them ("C" / "C++" / "C#")
+_SIGNIFICANT_SYMBOLS = frozenset("+#")
+
+
+def normalize(text: str) -> str:
+    """Case-fold, drop punctuation/symbols and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = "".join(
+        " " if unicodedata.category(char)[0] in ("P", "S") and char not in _SIGNIFICANT_SYMBOLS else char
+        for char in text
+    )
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def similarity_key(text: str) -> str:
+    """Script- and spelling-insensitive key: normalized, transliterated and folded."""
+    key = normalize(text).translate(_TRANSLITERATION)
+    for source, target in _SPELLING_FOLDS:
+        key = key.replace(source, target)
+    return _REPEATED_LETTERS.sub(r"\1", key)
+
+
+def trigrams(key: str) -> FrozenSet[str]:
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    intersection = len(a & b)
+    return intersection / (len(a) + len(b) - intersection)
+
+
+@dataclass
+class AnswerCluster:
+    """A group of near-duplicate answers."""
+    representative: str  # most frequent original spelling in the cluster
+    count: int  # number of answers in the cluster
+    members: List[str] = field(default_factory=list)  # distinct original spellings
+
+
+def cluster_answers(answers: Iterable[Tuple[str, int]], threshold: float = 0.6) -> List[AnswerCluster]:
+    """Cluster (text, count) pairs around their most frequent answers.
+
+    Answers with identical similarity keys are merged first. The keys are
+    then taken most frequent first: each joins the existing cluster whose
+    leading key (its most frequent one) is most similar, with trigram
+    Jaccard >= threshold, or else leads a new cluster. Comparing against
+    the leader rather than any member keeps chains of near-duplicates
+    ("ab" ~ "abc" ~ "abcd" ...) from merging answers that aren't alike.
+    Leaders are found with a prefix-filtered inverted index over trigrams:
+    each key only probes the postings of its rarest trigrams and only
+    compares against leaders of compatible size, so the work grows with
+    the number of near-duplicates rather than with the square of the input.
+    Answers with different numbers ("10" / "100", "2001" / "201") are never
+    merged, however similar. Clusters are returned most frequent first;
+    earlier input wins ties.
+    """
+    # Merge answers that share a similarity key
+    keys: List[str] = []
+    key_index: Dict[str, int] = {}
+    spellings: List[Counter] = []
+    for text, count in answers:
+        key = similarity_key(text) or text.casefold()
+        index = key_index.get(key)
+        if index is None:
+            index = key_index[key] = len(keys)
+            keys.append(key)
+            spellings.append(Counter())
+        spellings[index][text] += count
+
+    grams = [trigrams(key) for key in keys]
+    numbers = [_NUMBERS.findall(key) for key in keys]
+    frequency = Counter(gram for gram_set in grams for gram in gram_set)
+    # Tokens ordered rarest first so prefixes hit short posting lists
+    ordered = [sorted(gram_set, key=lambda gram: (frequency[gram], gram)) for gram_set in grams]
+
+    # Leading key -> spellings of the cluster it leads
+    clusters: Dict[int, Counter] = {}
+    postings: Dict[str, List[int]] = defaultdict(list)
+    for index in sorted(range(len(keys)), key=lambda i: -sum(spellings[i].values())):
+        size = len(grams[index])
+        prefix = ordered[index][:size - math.ceil(threshold * size) + 1]
+        candidates = set()
+        for gram in prefix:
+            for leader in postings[gram]:
+                if threshold * size <= len(grams[leader]) <= size / threshold:
+                    candidates.add(leader)
+        best, best_similarity = None, 0.0
+        for leader in sorted(candidates):
+            if numbers[index] != numbers[leader]:
+                continue
+            similarity = jaccard(grams[index], grams[leader])
+            if similarity >= threshold and similarity > best_similarity:
+                best, best_similarity = leader, similarity
+        if best is not None:
+            clusters[best].update(spellings[index])
+            continue
+        clusters[index] = Counter(spellings[index])
+        for gram in prefix:
+            postings[gram].append(index)
+
+    result = [
+        AnswerCluster(
+            representative=forms.most_common(1)[0][0],
+            count=sum(forms.values()),
+            members=list(forms)
+        )
+        for _, forms in sorted(clusters.items())
+    ]
+    result.sort(key=lambda cluster: cluster.count, reverse=True)
+    return result
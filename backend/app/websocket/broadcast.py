@@ -0,0 +1,187 @@
+import abc
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+import asyncpg
+from sqlalchemy import text
+
+from app.database import DATABASE_URL, async_engine
+
+logger = logging.getLogger(__name__)
+
+# Handler a backend calls for every envelope published by any worker
+DeliverFunc = Callable[[dict], None]
+# Handler a backend calls when envelopes may have been lost, e.g. while it reconnected
+GapFunc = Callable[[], None]
+
+
+class BroadcastBackend(abc.ABC):
+    """Transport that delivers published envelopes to every worker's ConnectionManager."""
+
+    # Whether other processes may hold connections for the same quiz
+    distributed = False
+
+    def __init__(self):
+        self.on_message: Optional[DeliverFunc] = None
+        self.on_gap: Optional[GapFunc] = None
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abc.abstractmethod
+    async def publish(self, envelope: dict):
+        """Send an envelope to the ``on_message`` handler of every worker."""
+
+
+class MemoryBroadcast(BroadcastBackend):
+    """Single-process backend: publishing delivers straight to the local manager."""
+
+    async def publish(self, envelope: dict):
+        if self.on_message is not None:
+            self.on_message(envelope)
+
+
+class PostgresBroadcast(BroadcastBackend):
+    """Cross-process backend using Postgres LISTEN/NOTIFY on the application database.
+
+    Every worker listens on ``channel`` through a dedicated asyncpg connection
+    and publishes with ``pg_notify`` through the regular engine, so a worker
+    receives its own envelopes the same way as everyone else's. Envelopes
+    larger than a NOTIFY payload are split into chunks sent in one transaction
+    (and therefore delivered contiguously) and reassembled on receipt.
+
+    Notifications sent while the listener is disconnected are lost; once it
+    has reconnected, ``on_gap`` is called so the manager can resync its
+    clients, and partly received envelopes are discarded. A partial envelope
+    whose remaining chunks haven't arrived within ``chunk_timeout`` seconds
+    is discarded too.
+    """
+
+    distributed = True
+    # NOTIFY payloads must be shorter than 8000 bytes; leave room for the chunk wrapper
+    max_chunk_size = 7000
+
+    def __init__(self, dsn: str, engine, channel: str = "quiz_events", reconnect_delay: float = 1.0,
+                 chunk_timeout: float = 30.0):
+        super().__init__()
+        self.dsn = dsn
+        self.engine = engine
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.chunk_timeout = chunk_timeout
+        self._connection = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # chunk id -> (when its first chunk arrived, chunks received so far)
+        self._chunks: Dict[str, Tuple[float, List[Optional[str]]]] = {}
+
+    async def start(self):
+        self._stopping = False
+        await self._listen()
+
+    async def stop(self):
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+    async def publish(self, envelope: dict):
+        # ASCII-only so that string length equals the payload's byte length
+        data = json.dumps(envelope, separators=(",", ":"))
+        if len(data) <= self.max_chunk_size:
+            notifications = [data]
+        else:
+            chunk_id = uuid.uuid4().hex
+            parts = [data[i:i + self.max_chunk_size] for i in range(0, len(data), self.max_chunk_size)]
+            notifications = [
+                json.dumps({"chunk": chunk_id, "index": i, "count": len(parts), "data": part}, separators=(",", ":"))
+                for i, part in enumerate(parts)
+            ]
+
+        async with self.engine.connect() as conn:
+            for notification in notifications:
+                await conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": self.channel, "payload": notification}
+                )
+            await conn.commit()
+
+    async def _listen(self):
+        self._connection = await asyncpg.connect(self.dsn)
+        self._connection.add_termination_listener(self._on_terminated)
+        await self._connection.add_listener(self.channel, self._on_notify)
+        logger.info(f"Listening for broadcasts on Postgres channel {self.channel}")
+
+    def _on_terminated(self, connection):
+        if self._stopping:
+            return
+        logger.warning("Broadcast listener connection lost, reconnecting")
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        while not self._stopping:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await self._listen()
+            except Exception as e:
+                logger.error(f"Error reconnecting broadcast listener: {e}")
+                continue
+            # The rest of envelopes cut off by the disconnect will never arrive
+            self._chunks.clear()
+            if self.on_gap is not None:
+                self.on_gap()
+            return
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        try:
+            envelope = json.loads(payload)
+            if "chunk" in envelope:
+                envelope = self._reassemble(envelope)
+                if envelope is None:
+                    return
+            if self.on_message is not None:
+                self.on_message(envelope)
+        except Exception as e:
+            logger.error(f"Error handling broadcast notification: {e}")
+
+    def _reassemble(self, chunk: dict) -> Optional[dict]:
+        entry = self._chunks.get(chunk["chunk"])
+        if entry is None:
+            self._expire_chunks()
+            entry = self._chunks[chunk["chunk"]] = (time.monotonic(), [None] * chunk["count"])
+        parts = entry[1]
+        parts[chunk["index"]] = chunk["data"]
+        if any(part is None for part in parts):
+            return None
+        del self._chunks[chunk["chunk"]]
+        return json.loads("".join(parts))
+
+    def _expire_chunks(self):
+        deadline = time.monotonic() - self.chunk_timeout
+        for chunk_id in [chunk_id for chunk_id, (started, _) in self._chunks.items() if started < deadline]:
+            logger.warning(f"Discarding incomplete broadcast {chunk_id}")
+            del self._chunks[chunk_id]
+
+
+def create_backend() -> BroadcastBackend:
+    """Build the backend selected by BROADCAST_BACKEND ("memory" or "postgres")."""
+    name = os.getenv("BROADCAST_BACKEND", "memory")
+    if name == "memory":
+        return MemoryBroadcast()
+    if name == "postgres":
+        return PostgresBroadcast(
+            DATABASE_URL,
+            async_engine,
+            channel=os.getenv("BROADCAST_CHANNEL", "quiz_events")
+        )
+    raise ValueError(f"Unknown broadcast backend: {name}")
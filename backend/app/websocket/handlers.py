@@ -1,26 +1,299 @@
+import asyncio
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from uuid import UUID
 from fastapi import WebSocket, WebSocketDisconnect
-from app.websocket.manager import manager
+from pydantic import ValidationError
+from app.database import AsyncSessionLocal
+from app.models.quiz import QuizStatus
+from app.schemas.answer import AnswerResponse, AnswerSubmitMessage
+from app.services import answer_service, quiz_service, team_service
+from app.websocket.manager import ROLES, manager
+from app.websocket.replay import format_event_id, parse_event_id
+from app.websocket.sse import EventStreamChannel
+from app.websocket.progress import AnswerProgressAggregator
 
+logger = logging.getLogger(__name__)
 
-async def websocket_endpoint(websocket: WebSocket, invite_code: str):
-    """WebSocket endpoint for quiz synchronization."""
-    await manager.connect(websocket, invite_code)
+WS_MAX_INFLIGHT_REQUESTS = int(os.getenv("WS_MAX_INFLIGHT_REQUESTS", "16"))
+
+# Running socket requests and resyncs; referenced so they aren't garbage collected mid-flight
+_request_tasks: Set[asyncio.Task] = set()
+_resync_tasks: Set[asyncio.Task] = set()
+
+
+async def websocket_endpoint(websocket: WebSocket, invite_code: str, role: str = "participant",
+                             full_payload: bool = False, participant_id: Optional[UUID] = None,
+                             last_seq: Optional[int] = None, epoch: Optional[str] = None):
+    """WebSocket endpoint for quiz synchronization.
+    
+    A client reconnecting with the epoch and last seq it received gets the
+    broadcasts it missed; otherwise, or if they are no longer buffered, it
+    gets a snapshot of the quiz state.
+    
+    A participant's client may pass its participant_id, which registers the
+    socket for messages to the participant and its team; a socket bound to
+    a participant only submits answers for it. An id that isn't a
+    participant of the quiz is refused.
+    
+    Clients may send ``submit_answer`` requests (see AnswerSubmitMessage);
+    each is answered with an ``answer_ack`` or ``error`` frame carrying its
+    request_id. Requests are processed concurrently, up to
+    WS_MAX_INFLIGHT_REQUESTS per connection, so replies may come out of
+    order. A ``pong`` answers the server's heartbeat pings and gets no
+    reply; any other message is answered with a pong.
+    """
+    if role not in ROLES:
+        role = "participant"
+    team_id = None
+    if participant_id is not None:
+        team_id = await get_participant_team_id(invite_code, participant_id)
+        if team_id is None:
+            # Closing before the handshake refuses the connection
+            await websocket.close(code=1008)
+            return
+    if not await manager.connect(
+        websocket, invite_code, role, full_payload,
+        participant_id=str(participant_id) if participant_id else None,
+        team_id=str(team_id) if team_id else None
+    ):
+        return
+    # Must directly follow connect, see ConnectionManager.resume and hold
+    if last_seq is None or not manager.resume(websocket, epoch, last_seq):
+        manager.hold(websocket)
+        await send_snapshot(websocket, invite_code)
+    inflight = asyncio.Semaphore(WS_MAX_INFLIGHT_REQUESTS)
     try:
         while True:
-            # Keep connection alive and handle incoming messages
-            data = await websocket.receive_text()
-            # Echo back or handle specific messages if needed
-            await websocket.send_json({"type": "pong", "message": "Connection active"})
+            received = await manager.receive(websocket)
+            if isinstance(received, dict) and received.get("type") == "pong":
+                continue
+            message = _as_request(received)
+            if message is None:
+                await manager.send_personal_message({"type": "pong", "message": "Connection active"}, websocket)
+                continue
+            # Stop reading while the connection has too many requests in flight
+            await inflight.acquire()
+            task = asyncio.create_task(handle_submit_answer(websocket, invite_code, message))
+            _request_tasks.add(task)
+            task.add_done_callback(_request_tasks.discard)
+            task.add_done_callback(lambda _: inflight.release())
     except WebSocketDisconnect:
         manager.disconnect(websocket, invite_code)
 
 
+async def send_snapshot(websocket: WebSocket, invite_code: str):
+    """Send a newly connected client the quiz state in one message.
+    
+    Its seq is that of the latest broadcast before the state was read, so
+    the state is at least as new; the current question is embedded for
+    full-payload clients. Broadcasts held back for the connection (see
+    ConnectionManager.hold) are released after it.
+    """
+    await send_snapshots([websocket], invite_code)
+
+
+async def send_snapshots(websockets: List[WebSocket], invite_code: str):
+    """Send connections of a quiz a snapshot (see send_snapshot), reading the state once for all."""
+    epoch, seq = manager.stream_position(invite_code)
+    connections = [manager.get_connection(websocket) for websocket in websockets]
+    full_payload = any(connection is not None and connection.full_payload for connection in connections)
+    try:
+        try:
+            async with AsyncSessionLocal() as db:
+                quiz = await quiz_service.get_quiz_state(db, invite_code)
+                if quiz is None:
+                    return
+                team_count = await team_service.count_teams(db, quiz.id)
+                rendered = None
+                if (full_payload and quiz.status == QuizStatus.IN_PROGRESS
+                        and quiz.current_question_order is not None):
+                    rendered = await quiz_service.get_rendered_question(db, quiz)
+        except Exception as e:
+            # Clients fall back to fetching the state
+            logger.error(f"Error building snapshot of quiz {invite_code}: {e}")
+            return
+        message = {
+            "type": "snapshot",
+            "epoch": epoch,
+            "seq": seq,
+            "status": quiz.status.value,
+            "current_question_order": quiz.current_question_order,
+            "team_count": team_count,
+        }
+        embed = {"question": rendered.body.decode()} if rendered and rendered.cacheable else None
+        for websocket, connection in zip(websockets, connections):
+            await manager.send_personal_message(
+                message, websocket,
+                embed=embed if connection is not None and connection.full_payload else None,
+                event_id=format_event_id(epoch, seq)
+            )
+    finally:
+        for websocket in websockets:
+            manager.release(websocket)
+
+
+async def resync_connections():
+    """Send every connection on this worker a new snapshot after broadcasts may have been lost.
+    
+    Quizzes are resynced one after another, each holding its connections'
+    broadcasts only while its own snapshot is built. Connections waiting
+    for their first snapshot already get a current one.
+    """
+    for invite_code in list(manager.active_connections):
+        websockets = [
+            connection.websocket
+            for connection in manager.active_connections.get(invite_code, ())
+            if connection.held is None
+        ]
+        for websocket in websockets:
+            manager.hold(websocket)
+        await send_snapshots(websockets, invite_code)
+
+
+def start_resync():
+    """Run resync_connections in the background."""
+    task = asyncio.create_task(resync_connections())
+    _resync_tasks.add(task)
+    task.add_done_callback(_resync_tasks.discard)
+
+
+# Sent first on every event stream: how long EventSource waits before reconnecting
+EVENT_STREAM_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+
+
+def open_event_stream(invite_code: str, full_payload: bool = False,
+                      last_event_id: Optional[str] = None) -> Optional[AsyncIterator[str]]:
+    """Subscribe a Server-Sent Events client to the quiz's broadcasts.
+    
+    Returns the stream's chunks, or None if a connection limit is reached.
+    Like a WebSocket client, a client resuming from a Last-Event-ID gets
+    the broadcasts it missed, otherwise a snapshot first.
+    """
+    channel = EventStreamChannel()
+    if not manager.subscribe(channel, invite_code, full_payload):
+        return None
+    position = parse_event_id(last_event_id)
+    resumed = position is not None and manager.resume(channel, *position)
+    if not resumed:
+        # Until the snapshot is sent from the stream below
+        manager.hold(channel)
+    
+    async def stream():
+        try:
+            yield f"retry: {EVENT_STREAM_RETRY_MS}\n\n"
+            if not resumed:
+                await send_snapshot(channel, invite_code)
+            async for chunk in channel.chunks():
+                yield chunk
+        finally:
+            manager.disconnect(channel, invite_code)
+            await channel.close()
+    
+    return stream()
+
+
+async def get_participant_team_id(invite_code: str, participant_id: UUID) -> Optional[UUID]:
+    """The participant's team, if the participant belongs to the quiz."""
+    async with AsyncSessionLocal() as db:
+        quiz = await quiz_service.get_quiz_state(db, invite_code)
+        if quiz is None:
+            return None
+        return await team_service.get_participant_team_id(db, quiz.id, participant_id)
+
+
+def _as_request(message: Any) -> Optional[dict]:
+    """The decoded frame if it is a submit_answer request, otherwise None."""
+    if isinstance(message, dict) and message.get("type") == "submit_answer":
+        return message
+    return None
+
+
+async def handle_submit_answer(websocket: WebSocket, invite_code: str, message: dict):
+    """Store an answer sent over the socket, with the same checks as the REST endpoint."""
+    request_id = message.get("request_id")
+    try:
+        submission = AnswerSubmitMessage.model_validate(message)
+    except ValidationError as e:
+        await manager.send_personal_message({
+            "type": "error",
+            "request_id": request_id,
+            "status_code": 422,
+            "detail": e.errors(include_url=False, include_context=False, include_input=False)
+        }, websocket)
+        return
+    
+    connection = manager.get_connection(websocket)
+    refusal = None
+    if connection is not None and connection.role == "spectator":
+        refusal = "Spectators can't submit answers"
+    elif connection is not None and connection.participant_id not in (None, str(submission.participant_id)):
+        refusal = "This connection belongs to another participant"
+    if refusal:
+        await manager.send_personal_message({
+            "type": "error",
+            "request_id": request_id,
+            "status_code": 403,
+            "detail": refusal
+        }, websocket)
+        return
+    
+    try:
+        async with AsyncSessionLocal() as db:
+            quiz = await answer_service.get_quiz_accepting_answers(db, invite_code)
+            answer = await answer_service.create_answer(db, quiz.id, submission.participant_id, submission)
+    except answer_service.AnswerSubmissionError as e:
+        await manager.send_personal_message({
+            "type": "error",
+            "request_id": request_id,
+            "status_code": e.status_code,
+            "detail": str(e)
+        }, websocket)
+        return
+    except Exception as e:
+        logger.error(f"Error storing answer sent over WebSocket for quiz {invite_code}: {e}")
+        await manager.send_personal_message({
+            "type": "error",
+            "request_id": request_id,
+            "status_code": 500,
+            "detail": "Answer could not be stored"
+        }, websocket)
+        return
+    
+    notify_answer_submitted(invite_code, quiz.id, submission.question_id)
+    await manager.send_personal_message({
+        "type": "answer_ack",
+        "request_id": request_id,
+        "answer": AnswerResponse.model_validate(answer).model_dump(mode="json")
+    }, websocket)
+
+
+async def embed_current_question(invite_code: str) -> Optional[Dict[str, str]]:
+    """Render the quiz's current question once for full-payload clients, if there are any."""
+    if not manager.wants_full_payload(invite_code):
+        return None
+    try:
+        async with AsyncSessionLocal() as db:
+            quiz = await quiz_service.get_quiz_state(db, invite_code)
+            if quiz is None or quiz.current_question_order is None:
+                return None
+            rendered = await quiz_service.get_rendered_question(db, quiz)
+    except Exception as e:
+        # Clients fall back to fetching the question
+        logger.error(f"Error rendering current question of quiz {invite_code}: {e}")
+        return None
+    if rendered is None or not rendered.cacheable:
+        return None
+    return {"question": rendered.body.decode()}
+
+
 async def broadcast_quiz_started(invite_code: str):
     """Broadcast quiz started event."""
     await manager.broadcast_to_quiz({
         "type": "quiz_started",
         "message": "Quiz has started"
-    }, invite_code)
+    }, invite_code, embed=await embed_current_question(invite_code))
 
 
 async def broadcast_question_changed(invite_code: str, question_order: int):
@@ -29,7 +302,7 @@ async def broadcast_question_changed(invite_code: str, question_order: int):
         "type": "question_changed",
         "question_order": question_order,
         "message": "Question changed"
-    }, invite_code)
+    }, invite_code, embed=await embed_current_question(invite_code))
 
 
 async def broadcast_team_joined(invite_code: str, team_name: str):
@@ -41,12 +314,30 @@ async def broadcast_team_joined(invite_code: str, team_name: str):
     }, invite_code)
 
 
-async def broadcast_answer_submitted(invite_code: str, participant_id: str):
-    """Broadcast answer submitted event."""
+async def broadcast_teams_imported(invite_code: str, team_count: int):
+    """Broadcast one roster update for a bulk import instead of a team_joined per team."""
     await manager.broadcast_to_quiz({
-        "type": "answer_submitted",
-        "participant_id": participant_id,
-        "message": "Answer submitted"
+        "type": "teams_imported",
+        "team_count": team_count,
+        "message": f"{team_count} teams joined"
+    }, invite_code)
+
+
+def notify_answer_submitted(invite_code: str, quiz_id: UUID, question_id: UUID):
+    """Record a submitted answer for the next coalesced answers_progress event."""
+    progress_aggregator.record(invite_code, quiz_id, question_id)
+
+
+async def broadcast_answers_progress(invite_code: str, quiz_id: UUID, question_ids: Set[UUID]):
+    """Send answered/total counts for the given questions to the quiz hosts."""
+    # Only hosts display progress; skip the counting query when none is connected
+    if not manager.has_hosts(invite_code):
+        return
+    async with AsyncSessionLocal() as db:
+        progress = await answer_service.get_answer_progress(db, quiz_id, question_ids)
+    await manager.send_to_hosts({
+        "type": "answers_progress",
+        "questions": progress
     }, invite_code)
 
 
@@ -57,3 +348,9 @@ async def broadcast_quiz_completed(invite_code: str):
         "message": "Quiz has been completed"
     }, invite_code)
 
+
+# Global aggregator instance
+progress_aggregator = AnswerProgressAggregator(
+    broadcast_answers_progress,
+    window=float(os.getenv("ANSWER_PROGRESS_WINDOW_MS", "500")) / 1000
+)
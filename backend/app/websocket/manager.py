@@ -1,48 +1,649 @@
-from typing import Dict, Set
-from fastapi import WebSocket
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from fastapi import WebSocket, WebSocketDisconnect
+import asyncio
 import json
+import logging
+import os
+import time
+from app.websocket.broadcast import BroadcastBackend, MemoryBroadcast, create_backend
+from app.websocket.protocol import DEFAULT_PROTOCOL, EVENT_STREAM_PROTOCOL, Frame, FrameProtocol, negotiate
+from app.websocket.replay import EventLog, LoggedEvent, format_event_id
+
+logger = logging.getLogger(__name__)
+
+
+class FanoutMetrics:
+    """Counters and recent latencies of outbound fan-out."""
+
+    def __init__(self, window: int = 1024):
+        self.broadcasts = 0
+        self.frames_sent = 0
+        # WebSocket frames written; lower than frames_sent when batching protocols combine messages
+        self.socket_frames = 0
+        self.frames_dropped = 0
+        self.slow_consumers_dropped = 0
+        # Seconds from broadcast start until the last recipient's frame was written
+        self.latencies = deque(maxlen=window)
+
+    def stats(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3)
+
+        return {
+            "broadcasts": self.broadcasts,
+            "frames_sent": self.frames_sent,
+            "socket_frames": self.socket_frames,
+            "frames_dropped": self.frames_dropped,
+            "slow_consumers_dropped": self.slow_consumers_dropped,
+            "fanout_latency_ms": {
+                "p50": percentile(0.5),
+                "p99": percentile(0.99),
+                "max": percentile(1.0),
+            },
+        }
+
+
+class _Delivery:
+    """Tracks one broadcast until every recipient has written (or dropped) it."""
+    __slots__ = ("started", "pending", "metrics")
+
+    def __init__(self, pending: int, metrics: FanoutMetrics):
+        self.started = time.perf_counter()
+        self.pending = pending
+        self.metrics = metrics
+
+    def done(self):
+        self.pending -= 1
+        if self.pending == 0:
+            self.metrics.latencies.append(time.perf_counter() - self.started)
+
+
+# Connection roles; spectators receive quiz broadcasts but can't answer
+ROLES = ("host", "participant", "spectator")
+
+
+class Connection:
+    """A WebSocket with its bounded outbound queue drained by a dedicated writer task."""
+    __slots__ = ("websocket", "invite_code", "role", "participant_id", "team_id", "full_payload", "protocol",
+                 "queue", "writer", "lagging", "last_seen", "held")
+
+    def __init__(self, websocket: WebSocket, invite_code: str, role: str, max_queue_size: int,
+                 full_payload: bool = False, protocol: FrameProtocol = DEFAULT_PROTOCOL,
+                 participant_id: Optional[str] = None, team_id: Optional[str] = None):
+        self.websocket = websocket
+        self.invite_code = invite_code
+        self.role = role
+        # Participant the socket belongs to, if the client identified itself
+        self.participant_id = participant_id
+        self.team_id = team_id
+        # Frame encoding negotiated through the WebSocket subprotocol
+        self.protocol = protocol
+        # Whether the client opted into frames with embedded data (e.g. the full question)
+        self.full_payload = full_payload
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.lagging = False
+        # When a frame was last received from the client
+        self.last_seen = time.monotonic()
+        # Broadcasts kept back while the client's snapshot is built (see ConnectionManager.hold)
+        self.held: Optional[List[Tuple[Frame, Optional[_Delivery]]]] = None
 
 
 class ConnectionManager:
-    """Manages WebSocket connections for quiz synchronization."""
-    
-    def __init__(self):
-        # Map of invite_code -> set of WebSocket connections
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
-    
-    async def connect(self, websocket: WebSocket, invite_code: str):
-        """Accept a WebSocket connection."""
-        await websocket.accept()
-        if invite_code not in self.active_connections:
-            self.active_connections[invite_code] = set()
-        self.active_connections[invite_code].add(websocket)
-    
+    """Manages WebSocket connections for quiz synchronization.
+
+    Outbound messages are serialized once per broadcast and put on each
+    connection's bounded queue; per-connection writer tasks send them in
+    parallel, so one slow client doesn't hold up the others. A client whose
+    queue overflows or whose frames wait longer than ``max_lag`` seconds is a
+    slow consumer: with the "disconnect" policy it is closed, with "mark" its
+    stale frames are discarded and it is flagged as lagging.
+
+    Connections are indexed by quiz, and within a quiz by role (hosts), team
+    and participant, so messages for one of those groups reach only its
+    sockets without scanning the quiz's connections.
+
+    Every delivered broadcast gets the quiz's next sequence number (``seq``
+    in the frame) and is kept in a bounded per-quiz EventLog, so a client
+    that reconnects with the last epoch and seq it saw can be sent just the
+    broadcasts it missed (``resume``). Host-only messages are frequent and
+    superseded by the next one, so they are sent without a seq and not
+    logged, leaving the buffer to the broadcasts every client needs. A client that gets a snapshot
+    instead has the broadcasts delivered while it is built held back until
+    it is queued (``hold``/``release``).
+
+    Read-only Server-Sent Events streams are registered with ``subscribe``
+    as spectator connections whose "socket" is an EventStreamChannel, so
+    they share the fan-out, queues and slow-consumer handling.
+
+    Broadcasts are published through a BroadcastBackend and delivered to local
+    connections when the backend hands them back, so with a distributed
+    backend every worker's clients receive them. If the backend reports
+    that broadcasts may have been lost, the event logs start new epochs
+    and the gap listeners are called to resync clients and caches.
+
+    A broadcast may carry an ``embed`` of already-serialized JSON values; they
+    are spliced into the frame once per delivery and sent only to connections
+    that opted into full payloads, the rest get the lean frame.
+
+    Clients may negotiate a compact frame protocol as a WebSocket
+    subprotocol (see app.websocket.protocol); a message is converted once
+    per protocol and delivery. Batching protocols send everything queued
+    for a connection by the time its writer runs, up to ``max_batch_size``
+    messages, as one frame.
+
+    A heartbeat sends every connection a ``ping`` message each
+    ``ping_interval`` seconds; clients answer with any frame (normally a
+    ``pong``). A connection that sends nothing for ``idle_timeout`` seconds
+    is half-open or dead and is closed (event streams, which can't answer,
+    are exempt), as is one whose send fails. New
+    connections beyond ``max_connections`` per process, or beyond
+    ``max_connections_per_quiz`` connections of any role to one quiz, are
+    closed right after the handshake with code 1013 (0 means no limit).
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 64,
+        max_lag: float = 5.0,
+        slow_consumer_policy: str = "disconnect",
+        backend: Optional[BroadcastBackend] = None,
+        max_batch_size: int = 32,
+        ping_interval: float = 20.0,
+        idle_timeout: float = 60.0,
+        max_connections: int = 0,
+        max_connections_per_quiz: int = 0,
+        replay_buffer_size: int = 256,
+        replay_max_quizzes: int = 1024,
+    ):
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.max_connections_per_quiz = max_connections_per_quiz
+        self.max_lag = max_lag
+        self.slow_consumer_policy = slow_consumer_policy
+        # Map of invite_code -> set of connections
+        self.active_connections: Dict[str, Set[Connection]] = {}
+        # Subsets of active_connections opened by the quiz host, by team and by participant
+        self.host_connections: Dict[str, Set[Connection]] = {}
+        self.team_connections: Dict[Tuple[str, str], Set[Connection]] = {}
+        self.participant_connections: Dict[Tuple[str, str], Set[Connection]] = {}
+        self._connections: Dict[WebSocket, Connection] = {}
+        self.metrics = FanoutMetrics()
+        self.backend = backend or MemoryBroadcast()
+        self.backend.on_message = self._deliver
+        self.backend.on_gap = self._on_gap
+        # Called with the envelope of every delivered broadcast
+        self._delivery_listeners: List[Callable[[dict], None]] = []
+        # Called when broadcasts may have been lost
+        self._gap_listeners: List[Callable[[], None]] = []
+        self._heartbeat: Optional[asyncio.Task] = None
+        self.events = EventLog(replay_buffer_size, replay_max_quizzes)
+        # Connections closed by the server, by reason
+        self.evicted = {"idle": 0, "send_failed": 0}
+        self.rejected = 0
+
+    async def start(self):
+        """Start the broadcast backend and the heartbeat."""
+        await self.backend.start()
+        if self._heartbeat is None and self.ping_interval > 0:
+            self._heartbeat = asyncio.create_task(self._run_heartbeat())
+
+    async def stop(self):
+        """Stop the heartbeat and the broadcast backend."""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        await self.backend.stop()
+
+    def add_delivery_listener(self, listener: Callable[[dict], None]):
+        """Register a callback invoked on this worker for every broadcast it receives."""
+        self._delivery_listeners.append(listener)
+
+    def add_gap_listener(self, listener: Callable[[], None]):
+        """Register a callback invoked when broadcasts to this worker may have been lost."""
+        self._gap_listeners.append(listener)
+
+    async def connect(self, websocket: WebSocket, invite_code: str, role: str = "participant",
+                      full_payload: bool = False, participant_id: Optional[str] = None,
+                      team_id: Optional[str] = None) -> bool:
+        """Accept a WebSocket connection, agreeing on the first supported subprotocol it offers.
+
+        Returns False if the connection was closed again because a
+        connection limit is reached.
+        """
+        protocol = negotiate(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=protocol.name if protocol else None)
+        if self._over_limit(invite_code):
+            self.rejected += 1
+            logger.warning(f"Rejecting WebSocket connection to quiz {invite_code}: connection limit reached")
+            await self._close(websocket)
+            return False
+        self._register(Connection(
+            websocket, invite_code, role, self.max_queue_size, full_payload, protocol or DEFAULT_PROTOCOL,
+            participant_id, team_id
+        ))
+        return True
+
+    def subscribe(self, channel, invite_code: str, full_payload: bool = False) -> bool:
+        """Register a read-only event stream as a spectator connection of the quiz.
+
+        Returns False if a connection limit is reached.
+        """
+        if self._over_limit(invite_code):
+            self.rejected += 1
+            logger.warning(f"Rejecting event stream of quiz {invite_code}: connection limit reached")
+            return False
+        self._register(Connection(
+            channel, invite_code, "spectator", self.max_queue_size, full_payload, EVENT_STREAM_PROTOCOL
+        ))
+        return True
+
+    def _register(self, connection: Connection):
+        connection.writer = asyncio.create_task(self._writer(connection))
+        self._connections[connection.websocket] = connection
+        for index, key in self._index_keys(connection):
+            index.setdefault(key, set()).add(connection)
+
+    def _index_keys(self, connection: Connection):
+        """The indexes a connection is registered in, with its key in each."""
+        yield self.active_connections, connection.invite_code
+        if connection.role == "host":
+            yield self.host_connections, connection.invite_code
+        if connection.team_id is not None:
+            yield self.team_connections, (connection.invite_code, connection.team_id)
+        if connection.participant_id is not None:
+            yield self.participant_connections, (connection.invite_code, connection.participant_id)
+
+    def _over_limit(self, invite_code: str) -> bool:
+        if self.max_connections and len(self._connections) >= self.max_connections:
+            return True
+        # Applies to hosts too: the role is whatever the client claims, so exempting it would lift the cap for anyone
+        if not self.max_connections_per_quiz:
+            return False
+        return len(self.active_connections.get(invite_code, ())) >= self.max_connections_per_quiz
+
     def disconnect(self, websocket: WebSocket, invite_code: str):
         """Remove a WebSocket connection."""
-        if invite_code in self.active_connections:
-            self.active_connections[invite_code].discard(websocket)
-            if not self.active_connections[invite_code]:
-                del self.active_connections[invite_code]
-    
-    async def send_personal_message(self, message: dict, websocket: WebSocket):
-        """Send a message to a specific connection."""
-        await websocket.send_json(message)
-    
-    async def broadcast_to_quiz(self, message: dict, invite_code: str):
-        """Broadcast a message to all connections for a quiz."""
-        if invite_code in self.active_connections:
-            disconnected = set()
-            for connection in self.active_connections[invite_code]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    disconnected.add(connection)
-            
-            # Remove disconnected connections
-            for connection in disconnected:
-                self.active_connections[invite_code].discard(connection)
+        connection = self._connections.pop(websocket, None)
+        if connection is None:
+            return
+        for index, key in self._index_keys(connection):
+            if key in index:
+                index[key].discard(connection)
+                if not index[key]:
+                    del index[key]
 
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+        # Settle frames that will never be written so their broadcasts still report latency
+        while not connection.queue.empty():
+            _, _, delivery = connection.queue.get_nowait()
+            if delivery is not None:
+                delivery.done()
+        for _, delivery in connection.held or ():
+            if delivery is not None:
+                delivery.done()
+        connection.held = None
 
-# Global manager instance
-manager = ConnectionManager()
+    def has_hosts(self, invite_code: str) -> bool:
+        """Whether a host may be connected to the quiz.
 
+        Always true with a distributed backend, where the host may be
+        connected to another worker.
+        """
+        return self.backend.distributed or bool(self.host_connections.get(invite_code))
+
+    def wants_full_payload(self, invite_code: str) -> bool:
+        """Whether any client of the quiz, possibly on another worker, opted into full payloads."""
+        if self.backend.distributed:
+            return True
+        return any(connection.full_payload for connection in self.active_connections.get(invite_code, ()))
+
+    def get_connection(self, websocket: WebSocket) -> Optional[Connection]:
+        return self._connections.get(websocket)
+
+    async def receive(self, websocket: WebSocket) -> Any:
+        """Receive and decode the next frame in the connection's protocol.
+
+        Returns None for a frame that can't be decoded; raises
+        WebSocketDisconnect when the client goes away.
+        """
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        connection = self._connections.get(websocket)
+        if connection is not None:
+            connection.last_seen = time.monotonic()
+        protocol = connection.protocol if connection is not None else DEFAULT_PROTOCOL
+        data = message.get("text") if message.get("text") is not None else message.get("bytes")
+        try:
+            return protocol.decode(data)
+        except (ValueError, TypeError):
+            return None
+
+    async def send_personal_message(self, message: dict, websocket: WebSocket,
+                                    embed: Optional[Dict[str, str]] = None, event_id: Optional[str] = None):
+        """Send a message to a specific connection, with ``embed`` spliced in as in broadcasts.
+
+        ``event_id`` marks a message (such as a snapshot) as a position in
+        the quiz's broadcast stream for event stream clients.
+        """
+        connection = self._connections.get(websocket)
+        if connection is not None:
+            payload = self._serialize(message)
+            if embed:
+                payload = self._embed(payload, embed)
+            self._enqueue(connection, connection.protocol.from_json(payload, event_id), None)
+
+    def hold(self, websocket: WebSocket):
+        """Keep broadcasts to the connection back until ``release``.
+
+        A snapshot carries the stream position read before its state, so
+        broadcasts delivered while the state is read must reach the client
+        after the snapshot, or it would roll back to the older state. Call
+        right after ``connect`` (or a failed ``resume``), before anything
+        else is awaited.
+        """
+        connection = self._connections.get(websocket)
+        if connection is not None and connection.held is None:
+            connection.held = []
+
+    def release(self, websocket: WebSocket):
+        """Queue the broadcasts held back since ``hold``, after anything queued meanwhile."""
+        connection = self._connections.get(websocket)
+        if connection is None or connection.held is None:
+            return
+        held, connection.held = connection.held, None
+        for frame, delivery in held:
+            self._enqueue(connection, frame, delivery)
+
+    def stream_position(self, invite_code: str) -> Tuple[str, int]:
+        """Epoch and sequence number of the quiz's latest broadcast on this worker."""
+        return self.events.position(invite_code)
+
+    def resume(self, websocket: WebSocket, epoch: Optional[str], last_seq: int) -> bool:
+        """Queue the broadcasts a reconnecting client missed since ``last_seq``.
+
+        Call right after ``connect`` returns, before anything else is
+        awaited, so no broadcast falls between the replay and live delivery.
+        Sends a ``resumed`` message first. Returns False, sending nothing,
+        if the missed broadcasts are no longer all buffered.
+        """
+        connection = self._connections.get(websocket)
+        if connection is None:
+            return False
+        events = self.events.since(connection.invite_code, epoch, last_seq)
+        if events is None:
+            return False
+        _, seq = self.events.position(connection.invite_code)
+        self._enqueue(connection, connection.protocol.from_json(self._serialize({
+            "type": "resumed",
+            "epoch": epoch,
+            "seq": seq,
+        })), None)
+        for event in events:
+            if self._receives(connection, event.target, event.target_id):
+                full = event.full_payload is not None and connection.full_payload
+                self._enqueue(connection, connection.protocol.from_json(
+                    event.full_payload if full else event.payload, format_event_id(epoch, event.seq)
+                ), None)
+        return True
+
+    @staticmethod
+    def _receives(connection: Connection, target: str, target_id: Optional[str]) -> bool:
+        if target == "team":
+            return connection.team_id == target_id
+        if target == "participant":
+            return connection.participant_id == target_id
+        return True
+
+    async def broadcast_to_quiz(self, message: dict, invite_code: str, embed: Optional[Dict[str, str]] = None):
+        """Broadcast a message to all connections for a quiz.
+
+        ``embed`` maps extra keys to serialized JSON values added to the frame
+        for connections that opted into full payloads.
+        """
+        await self._publish(message, invite_code, "all", embed)
+
+    async def send_to_hosts(self, message: dict, invite_code: str):
+        """Send a message only to the host connections of a quiz, unnumbered and not kept for resume."""
+        await self._publish(message, invite_code, "hosts")
+
+    async def send_to_team(self, message: dict, invite_code: str, team_id):
+        """Send a message only to the connections of a team's participants."""
+        await self._publish(message, invite_code, "team", target_id=str(team_id))
+
+    async def send_to_participant(self, message: dict, invite_code: str, participant_id):
+        """Send a message only to the connections of one participant."""
+        await self._publish(message, invite_code, "participant", target_id=str(participant_id))
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self._connections),
+            "quizzes": len(self.active_connections),
+            "lagging": sum(1 for connection in self._connections.values() if connection.lagging),
+            "roles": self._role_counts(),
+            "protocols": self._protocol_counts(),
+            "evicted": {**self.evicted, "slow_consumer": self.metrics.slow_consumers_dropped},
+            "rejected_over_limit": self.rejected,
+            "event_log": self.events.stats(),
+            **self.metrics.stats(),
+        }
+
+    def _role_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for connection in self._connections.values():
+            counts[connection.role] = counts.get(connection.role, 0) + 1
+        return counts
+
+    def _protocol_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for connection in self._connections.values():
+            counts[connection.protocol.name] = counts.get(connection.protocol.name, 0) + 1
+        return counts
+
+    @staticmethod
+    def _serialize(message: dict) -> str:
+        # Same encoding as WebSocket.send_json, done once per message instead of per socket
+        return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+    @staticmethod
+    def _embed(payload: str, embed: Dict[str, str]) -> str:
+        # Splice pre-serialized values into the serialized object instead of re-encoding them
+        return payload[:-1] + "".join(f",{json.dumps(key)}:{value}" for key, value in embed.items()) + "}"
+
+    async def _publish(self, message: dict, invite_code: str, target: str, embed: Optional[Dict[str, str]] = None,
+                       target_id: Optional[str] = None):
+        envelope = {
+            "invite_code": invite_code,
+            "target": target,
+            "type": message.get("type"),
+            "payload": self._serialize(message),
+        }
+        if target_id is not None:
+            envelope["target_id"] = target_id
+        if embed:
+            envelope["embed"] = embed
+        await self.backend.publish(envelope)
+
+    def _deliver(self, envelope: dict):
+        invite_code = envelope["invite_code"]
+        for listener in self._delivery_listeners:
+            try:
+                listener(envelope)
+            except Exception as e:
+                logger.error(f"Error in broadcast delivery listener: {e}")
+
+        target = envelope["target"]
+        if target == "hosts":
+            self._fan_out(envelope["payload"], self.host_connections.get(invite_code, ()))
+            return
+        if target == "team":
+            connections = self.team_connections.get((invite_code, envelope["target_id"]), ())
+        elif target == "participant":
+            connections = self.participant_connections.get((invite_code, envelope["target_id"]), ())
+        else:
+            connections = self.active_connections.get(invite_code, ())
+        epoch, seq = self.events.next_seq(invite_code)
+        payload = self._embed(envelope["payload"], {"seq": str(seq)})
+        full_payload = self._embed(payload, envelope["embed"]) if envelope.get("embed") else None
+        self.events.record(invite_code, LoggedEvent(seq, target, envelope.get("target_id"), payload, full_payload))
+        self._fan_out(payload, connections, full_payload, format_event_id(epoch, seq))
+
+    def _on_gap(self):
+        logger.warning("Broadcasts may have been lost, resyncing clients")
+        # Missed broadcasts can't be replayed, so resuming clients must get a snapshot
+        self.events.reset()
+        for listener in self._gap_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Error in broadcast gap listener: {e}")
+
+    def _fan_out(self, payload: str, connections: Iterable[Connection], full_payload: Optional[str] = None,
+                 event_id: Optional[str] = None):
+        connections = list(connections)
+        if not connections:
+            return
+        self.metrics.broadcasts += 1
+        delivery = _Delivery(len(connections), self.metrics)
+        # Each variant is converted once per protocol in use
+        frames: Dict[Tuple[str, bool], Frame] = {}
+        for connection in connections:
+            full = full_payload is not None and connection.full_payload
+            key = (connection.protocol.name, full)
+            frame = frames.get(key)
+            if frame is None:
+                frame = frames[key] = connection.protocol.from_json(full_payload if full else payload, event_id)
+            if connection.held is not None:
+                self._hold(connection, frame, delivery)
+            else:
+                self._enqueue(connection, frame, delivery)
+
+    def _hold(self, connection: Connection, payload: Frame, delivery: Optional[_Delivery]):
+        # Bounded like the queue the frames will go to
+        if len(connection.held) >= self.max_queue_size:
+            if delivery is not None:
+                delivery.done()
+            self._slow_consumer(connection)
+            return
+        connection.held.append((payload, delivery))
+
+    def _enqueue(self, connection: Connection, payload: Frame, delivery: Optional[_Delivery]):
+        try:
+            connection.queue.put_nowait((time.monotonic(), payload, delivery))
+        except asyncio.QueueFull:
+            if delivery is not None:
+                delivery.done()
+            self._slow_consumer(connection)
+
+    async def _writer(self, connection: Connection):
+        protocol = connection.protocol
+        while True:
+            batch = [await connection.queue.get()]
+            if protocol.batched:
+                while len(batch) < self.max_batch_size and not connection.queue.empty():
+                    batch.append(connection.queue.get_nowait())
+            try:
+                fresh = []
+                for enqueued_at, payload, _ in batch:
+                    if time.monotonic() - enqueued_at > self.max_lag:
+                        self._slow_consumer(connection)
+                        if connection.websocket not in self._connections:
+                            return
+                    else:
+                        fresh.append(payload)
+                if not fresh:
+                    continue
+                frames = protocol.join(fresh)
+                for frame in frames:
+                    if protocol.binary:
+                        await connection.websocket.send_bytes(frame)
+                    else:
+                        await connection.websocket.send_text(frame)
+                self.metrics.frames_sent += len(fresh)
+                self.metrics.socket_frames += len(frames)
+                if connection.queue.empty():
+                    connection.lagging = False
+            except Exception:
+                if connection.websocket in self._connections:
+                    self.evicted["send_failed"] += 1
+                    self.disconnect(connection.websocket, connection.invite_code)
+                    # Close explicitly so the endpoint's receive loop ends too
+                    asyncio.create_task(self._close(connection.websocket, code=1011))
+                return
+            finally:
+                for _, _, delivery in batch:
+                    if delivery is not None:
+                        delivery.done()
+
+    def _slow_consumer(self, connection: Connection):
+        self.metrics.frames_dropped += 1
+        if self.slow_consumer_policy == "mark":
+            connection.lagging = True
+            return
+        if connection.websocket not in self._connections:
+            return
+        logger.warning(f"Dropping slow WebSocket consumer in quiz {connection.invite_code}")
+        self.metrics.slow_consumers_dropped += 1
+        self.disconnect(connection.websocket, connection.invite_code)
+        asyncio.create_task(self._close(connection.websocket))
+
+    async def _run_heartbeat(self):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            try:
+                self._heartbeat_tick()
+            except Exception as e:
+                logger.error(f"Error in WebSocket heartbeat: {e}")
+
+    def _heartbeat_tick(self):
+        """Close connections idle for longer than idle_timeout and ping the rest."""
+        now = time.monotonic()
+        ping = self._serialize({"type": "ping"})
+        frames: Dict[str, Frame] = {}
+        for connection in list(self._connections.values()):
+            idle = now - connection.last_seen
+            if connection.protocol.interactive and self.idle_timeout and idle > self.idle_timeout:
+                logger.info(f"Closing idle WebSocket connection in quiz {connection.invite_code}")
+                self.evicted["idle"] += 1
+                self.disconnect(connection.websocket, connection.invite_code)
+                # 1001: going away
+                asyncio.create_task(self._close(connection.websocket, code=1001))
+                continue
+            frame = frames.get(connection.protocol.name)
+            if frame is None:
+                frame = frames[connection.protocol.name] = connection.protocol.ping(ping)
+            self._enqueue(connection, frame, None)
+
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int = 1013):
+        try:
+            # 1013 (default): try again later
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+
+# Global manager instance
+manager = ConnectionManager(
+    max_queue_size=int(os.getenv("WS_SEND_QUEUE_SIZE", "64")),
+    max_lag=float(os.getenv("WS_MAX_LAG_MS", "5000")) / 1000,
+    slow_consumer_policy=os.getenv("WS_SLOW_CONSUMER_POLICY", "disconnect"),
+    backend=create_backend(),
+    max_batch_size=int(os.getenv("WS_MAX_BATCH_FRAMES", "32")),
+    ping_interval=float(os.getenv("WS_PING_INTERVAL_MS", "20000")) / 1000,
+    idle_timeout=float(os.getenv("WS_IDLE_TIMEOUT_MS", "60000")) / 1000,
+    max_connections=int(os.getenv("WS_MAX_CONNECTIONS", "10000")),
+    max_connections_per_quiz=int(os.getenv("WS_MAX_CONNECTIONS_PER_QUIZ", "1000")),
+    replay_buffer_size=int(os.getenv("WS_REPLAY_BUFFER_SIZE", "256")),
+    replay_max_quizzes=int(os.getenv("WS_REPLAY_MAX_QUIZZES", "1024")),
+)
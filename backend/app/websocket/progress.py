@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Set, Tuple
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+EmitFunc = Callable[[str, UUID, Set[UUID]], Awaitable[None]]
+
+
+class AnswerProgressAggregator:
+    """Coalesces answer submissions into at most one progress emit per quiz per window.
+
+    ``record`` is cheap and synchronous: it marks the question as changed and,
+    if no emit is scheduled for the quiz yet, schedules one ``window`` seconds
+    later. Everything recorded in between is covered by that single emit.
+    """
+
+    def __init__(self, emit: EmitFunc, window: float = 0.5):
+        self._emit = emit
+        self.window = window
+        # invite_code -> (quiz_id, question ids answered since the last emit)
+        self._dirty: Dict[str, Tuple[UUID, Set[UUID]]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.recorded = 0
+        self.emitted = 0
+
+    def record(self, invite_code: str, quiz_id: UUID, question_id: UUID):
+        """Note an answer; the next progress frame for the quiz will include it."""
+        self.recorded += 1
+        _, question_ids = self._dirty.setdefault(invite_code, (quiz_id, set()))
+        question_ids.add(question_id)
+        if invite_code not in self._tasks:
+            self._tasks[invite_code] = asyncio.create_task(self._emit_later(invite_code))
+
+    async def _emit_later(self, invite_code: str):
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            self._tasks.pop(invite_code, None)
+        quiz_id, question_ids = self._dirty.pop(invite_code, (None, set()))
+        if not question_ids:
+            return
+        try:
+            await self._emit(invite_code, quiz_id, question_ids)
+            self.emitted += 1
+        except Exception as e:
+            logger.error(f"Error emitting answer progress for quiz {invite_code}: {e}")
+
+    async def stop(self):
+        """Cancel pending emits."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dirty.clear()
+
+    def stats(self) -> dict:
+        return {
+            "recorded": self.recorded,
+            "emitted": self.emitted,
+            "pending": len(self._tasks),
+        }
@@ -0,0 +1,130 @@
+import json
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import msgpack
+except ImportError:  # The msgpack protocol is optional
+    msgpack = None
+
+Frame = Union[str, bytes]
+
+# Human-readable fields that compact protocols leave out
+VERBOSE_FIELDS = ("message",)
+
+
+class FrameProtocol:
+    """JSON text frames, one message per frame; the default for clients that negotiate nothing.
+
+    Messages are handed over already serialized as JSON (see
+    ConnectionManager._serialize), so this protocol sends them unchanged.
+    """
+    name = "quiz.json"
+    binary = False
+    # Whether messages queued together are sent as one frame
+    batched = False
+    # Whether the client sends frames (and so can answer heartbeat pings)
+    interactive = True
+
+    def from_json(self, payload: str, event_id: Optional[str] = None) -> Frame:
+        """Convert a serialized message; ``event_id`` identifies a logged broadcast."""
+        return payload
+
+    def ping(self, payload: str) -> Frame:
+        """The heartbeat frame, given the serialized ping message."""
+        return self.from_json(payload)
+
+    def join(self, frames: List[Frame]) -> List[Frame]:
+        """The socket frames carrying the given messages, in order; here one per message."""
+        return frames
+
+    def decode(self, data: Frame) -> Any:
+        """Parse a received frame; raises ValueError if it isn't valid."""
+        return json.loads(data)
+
+
+class CompactJsonProtocol(FrameProtocol):
+    """JSON text without verbose fields; every frame is an array of the messages queued together."""
+    name = "quiz.compact.v2"
+    batched = True
+
+    def from_json(self, payload: str, event_id: Optional[str] = None) -> Frame:
+        return json.dumps(_compact(json.loads(payload)), separators=(",", ":"), ensure_ascii=False)
+
+    def join(self, frames: List[Frame]) -> List[Frame]:
+        return ["[" + ",".join(frames) + "]"]
+
+
+class MsgpackProtocol(FrameProtocol):
+    """Binary MessagePack without verbose fields; every frame is an array of the messages queued together."""
+    name = "quiz.msgpack.v2"
+    binary = True
+    batched = True
+
+    def from_json(self, payload: str, event_id: Optional[str] = None) -> Frame:
+        return msgpack.packb(_compact(json.loads(payload)))
+
+    def join(self, frames: List[Frame]) -> List[Frame]:
+        # Already packed messages concatenated after an array header form a packed array
+        return [msgpack.Packer().pack_array_header(len(frames)) + b"".join(frames)]
+
+    def decode(self, data: Frame) -> Any:
+        if isinstance(data, str):
+            return json.loads(data)
+        try:
+            return msgpack.unpackb(data)
+        except Exception as e:
+            raise ValueError(f"Invalid MessagePack frame: {e}")
+
+
+class EventStreamProtocol(FrameProtocol):
+    """Server-Sent Events for read-only HTTP clients; not offered as a WebSocket subprotocol.
+
+    Each message is an SSE event whose data is the JSON message; logged
+    broadcasts carry their event id, so EventSource sends it back as
+    Last-Event-ID when it reconnects.
+    """
+    name = "sse"
+    batched = True
+    interactive = False
+
+    def from_json(self, payload: str, event_id: Optional[str] = None) -> Frame:
+        # Serialized messages are single-line JSON, so one data field holds them
+        if event_id is None:
+            return f"data: {payload}\n\n"
+        return f"id: {event_id}\ndata: {payload}\n\n"
+
+    def join(self, frames: List[Frame]) -> List[Frame]:
+        return ["".join(frames)]
+
+    def ping(self, payload: str) -> Frame:
+        # A comment keeps proxies from timing out the idle stream without waking the client
+        return ": ping\n\n"
+
+    def decode(self, data: Frame) -> Any:
+        raise ValueError("Event streams are read-only")
+
+
+def _compact(message: Any) -> Any:
+    if isinstance(message, dict):
+        for field in VERBOSE_FIELDS:
+            message.pop(field, None)
+    return message
+
+
+DEFAULT_PROTOCOL = FrameProtocol()
+EVENT_STREAM_PROTOCOL = EventStreamProtocol()
+
+# Subprotocols the server accepts, by Sec-WebSocket-Protocol name
+PROTOCOLS: Dict[str, FrameProtocol] = {
+    protocol.name: protocol
+    for protocol in (DEFAULT_PROTOCOL, CompactJsonProtocol(), MsgpackProtocol())
+    if not protocol.binary or msgpack is not None
+}
+
+
+def negotiate(offered: List[str]) -> Optional[FrameProtocol]:
+    """The first subprotocol offered by the client that the server supports, if any."""
+    for name in offered:
+        if name in PROTOCOLS:
+            return PROTOCOLS[name]
+    return None
@@ -0,0 +1,112 @@
+import uuid
+from collections import OrderedDict, deque
+from typing import List, Optional, Tuple
+
+
+class LoggedEvent:
+    """A delivered broadcast as sent, with its sequence number spliced in."""
+    __slots__ = ("seq", "target", "target_id", "payload", "full_payload")
+
+    def __init__(self, seq: int, target: str, target_id: Optional[str], payload: str,
+                 full_payload: Optional[str]):
+        self.seq = seq
+        self.target = target
+        self.target_id = target_id
+        self.payload = payload
+        self.full_payload = full_payload
+
+
+class _QuizLog:
+    __slots__ = ("epoch", "seq", "events")
+
+    def __init__(self, max_events: int):
+        # Identifies this numbering; a log created again (after eviction or a restart) starts a new one
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.events: deque = deque(maxlen=max_events)
+
+
+class EventLog:
+    """Per-quiz sequence numbers and a bounded buffer of the latest broadcasts.
+
+    Numbering is local to the process: with a distributed backend each
+    worker numbers the broadcasts it delivers, and a client that reconnects
+    to another worker sees a different epoch and gets a snapshot instead.
+    Logs of the least recently active quizzes are dropped beyond
+    ``max_quizzes``.
+    """
+
+    def __init__(self, max_events: int, max_quizzes: int):
+        self.max_events = max_events
+        self.max_quizzes = max_quizzes
+        self._logs: "OrderedDict[str, _QuizLog]" = OrderedDict()
+        self.replays = 0
+        self.replayed_events = 0
+        self.resume_misses = 0
+
+    def next_seq(self, invite_code: str) -> Tuple[str, int]:
+        """Allocate the sequence number of the quiz's next broadcast; returns it with the epoch."""
+        log = self._log(invite_code)
+        log.seq += 1
+        return log.epoch, log.seq
+
+    def record(self, invite_code: str, event: LoggedEvent) -> None:
+        log = self._logs.get(invite_code)
+        if log is not None:
+            log.events.append(event)
+
+    def reset(self) -> None:
+        """Drop every log, so each quiz starts a new epoch and no earlier position can be resumed."""
+        self._logs.clear()
+
+    def position(self, invite_code: str) -> Tuple[str, int]:
+        """The quiz's epoch and last sequence number (0 before its first broadcast)."""
+        log = self._log(invite_code)
+        return log.epoch, log.seq
+
+    def since(self, invite_code: str, epoch: Optional[str], last_seq: int) -> Optional[List[LoggedEvent]]:
+        """The events after ``last_seq``, or None if they can't all be replayed."""
+        log = self._logs.get(invite_code)
+        if log is None or epoch != log.epoch or last_seq > log.seq:
+            self.resume_misses += 1
+            return None
+        if last_seq < log.seq and (not log.events or log.events[0].seq > last_seq + 1):
+            # Fell out of the buffer
+            self.resume_misses += 1
+            return None
+        events = [event for event in log.events if event.seq > last_seq]
+        self.replays += 1
+        self.replayed_events += len(events)
+        return events
+
+    def _log(self, invite_code: str) -> _QuizLog:
+        log = self._logs.get(invite_code)
+        if log is None:
+            log = self._logs[invite_code] = _QuizLog(self.max_events)
+            while len(self._logs) > self.max_quizzes:
+                self._logs.popitem(last=False)
+        self._logs.move_to_end(invite_code)
+        return log
+
+    def stats(self) -> dict:
+        return {
+            "quizzes": len(self._logs),
+            "replays": self.replays,
+            "replayed_events": self.replayed_events,
+            "resume_misses": self.resume_misses,
+        }
+
+
+def format_event_id(epoch: str, seq: int) -> str:
+    """Event id of a logged broadcast, as sent in SSE ``id`` fields."""
+    return f"{epoch}-{seq}"
+
+
+def parse_event_id(event_id: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Epoch and seq from an event id (e.g. a Last-Event-ID header), or None if it isn't one."""
+    if not event_id:
+        return None
+    epoch, _, seq = event_id.strip().rpartition("-")
+    if not epoch or not seq.isdigit():
+        return None
+    return epoch, int(seq)
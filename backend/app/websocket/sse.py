@@ -0,0 +1,36 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+
+class EventStreamChannel:
+    """Stands in for a WebSocket so a Server-Sent Events response can be a ConnectionManager connection.
+
+    The connection's writer task hands each frame over with ``send_text``,
+    which waits until the response has taken the previous one, so a slow
+    reader backs up the connection queue like a slow WebSocket does.
+    """
+
+    def __init__(self):
+        self._chunks: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.closed = False
+
+    async def send_text(self, text: str):
+        if self.closed:
+            raise RuntimeError("Event stream is closed")
+        await self._chunks.put(text)
+
+    async def close(self, code: int = 1000):
+        """End the stream; queued chunks are discarded."""
+        if self.closed:
+            return
+        self.closed = True
+        while not self._chunks.empty():
+            self._chunks.get_nowait()
+        self._chunks.put_nowait(None)
+
+    async def chunks(self) -> AsyncIterator[str]:
+        while True:
+            chunk: Optional[str] = await self._chunks.get()
+            if chunk is None:
+                return
+            yield chunk
@@ -0,0 +1,111 @@
+"""Measure event-loop lag while many participants submit answers at once.
+
+Runs the FastAPI app in-process against the database from DATABASE_URL (use a
+scratch database migrated with `alembic upgrade head`, the benchmark creates
+its own quiz) and samples how late a periodic timer fires while the
+submissions are in flight. With a blocking DB layer the lag grows with every
+round-trip; with the async layer it stays near the timer resolution.
+
+    cd backend
+    alembic upgrade head
+    DATABASE_URL=postgresql://... python -m benchmarks.event_loop_lag --participants 300
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.main import app
+
+
+class LagMonitor:
+    """Samples the delay between when a sleep should end and when it actually does."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - started - self.interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+async def prepare_quiz(client: httpx.AsyncClient, participants: int, team_size: int):
+    response = await client.post("/api/quizzes", json={
+        "title": "Event loop lag benchmark",
+        "questions": [{"text": "Benchmark question", "order": 1, "type": "text_input"}],
+    })
+    response.raise_for_status()
+    invite_code = response.json()["invite_code"]
+
+    participant_ids = []
+    for team_index in range(0, participants, team_size):
+        size = min(team_size, participants - team_index)
+        response = await client.post(f"/api/quizzes/{invite_code}/teams", json={
+            "name": f"Team {team_index // team_size + 1}",
+            "participants": [
+                {"first_name": "Bench", "last_name": f"User {team_index + i}"}
+                for i in range(size)
+            ],
+        })
+        response.raise_for_status()
+        participant_ids.extend(p["id"] for p in response.json()["participants"])
+
+    (await client.post(f"/api/quizzes/{invite_code}/start")).raise_for_status()
+    response = await client.get(f"/api/quizzes/{invite_code}/current-question")
+    response.raise_for_status()
+    return invite_code, response.json()["id"], participant_ids
+
+
+async def main(participants: int, team_size: int):
+    # Run the app's startup/shutdown hooks; ASGITransport doesn't send lifespan events
+    await app.router.startup()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        invite_code, question_id, participant_ids = await prepare_quiz(client, participants, team_size)
+
+        monitor = LagMonitor()
+        monitor.start()
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post(
+                f"/api/quizzes/{invite_code}/answers",
+                params={"participant_id": participant_id},
+                json={"question_id": question_id, "text_answer": f"answer {i % 20}"},
+            )
+            for i, participant_id in enumerate(participant_ids)
+        ])
+        elapsed = time.perf_counter() - started
+        await monitor.stop()
+
+    await app.router.shutdown()
+
+    failed = sum(1 for r in responses if r.status_code >= 400)
+    lag_ms = sorted(sample * 1000 for sample in monitor.samples) or [0.0]
+    print(f"submissions:     {len(responses)} ({failed} failed) in {elapsed:.3f}s")
+    print(f"loop lag p50:    {statistics.median(lag_ms):.2f} ms")
+    print(f"loop lag p99:    {lag_ms[int(len(lag_ms) * 0.99) - 1]:.2f} ms")
+    print(f"loop lag max:    {lag_ms[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, default=300)
+    parser.add_argument("--team-size", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.participants, args.team_size))
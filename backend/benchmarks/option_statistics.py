@@ -0,0 +1,117 @@
+"""Compare option-statistics strategies on a quiz with many answers.
+
+Migrates the database from DATABASE_URL to the latest schema, seeds a
+completed quiz whose last question has ``--options`` options and
+``--answers`` multiple-choice answers, then times:
+
+* legacy  - load every Answer row, rescan all answers for each option
+* python  - single pass over selected_options (non-Postgres fallback)
+* sql     - one grouped json_array_elements_text query (Postgres path)
+
+    cd backend
+    DATABASE_URL=postgresql://... python -m benchmarks.option_statistics --answers 10000
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import insert, select
+
+from app.database import AsyncSessionLocal, async_engine
+from app.models import Answer, Participant, Question, QuestionOption, Quiz, Team
+from app.models.quiz import QuizStatus
+from app.services import statistics_service
+
+
+async def seed(answers: int, options: int, team_size: int = 5) -> uuid.UUID:
+    quiz_id, question_id = uuid.uuid4(), uuid.uuid4()
+    option_ids = [uuid.uuid4() for _ in range(options)]
+    team_ids = [uuid.uuid4() for _ in range(0, answers, team_size)]
+    participant_ids = [uuid.uuid4() for _ in range(answers)]
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Quiz).values(
+            id=quiz_id, title="Statistics benchmark",
+            invite_code=uuid.uuid4().hex[:6].upper(), status=QuizStatus.COMPLETED
+        ))
+        await db.execute(insert(Question).values(
+            id=question_id, quiz_id=quiz_id, order=1, text="Pick", type="multiple_choice", is_last=True
+        ))
+        await db.execute(insert(QuestionOption), [
+            {"id": option_id, "question_id": question_id, "text": f"Option {i}", "order": i}
+            for i, option_id in enumerate(option_ids)
+        ])
+        await db.execute(insert(Team), [
+            {"id": team_id, "quiz_id": quiz_id, "name": f"Team {i}"} for i, team_id in enumerate(team_ids)
+        ])
+        await db.execute(insert(Participant), [
+            {"id": participant_id, "team_id": team_ids[i // team_size], "first_name": "Bench", "last_name": str(i)}
+            for i, participant_id in enumerate(participant_ids)
+        ])
+        rows = []
+        for participant_id in participant_ids:
+            # Roughly one in twenty answers has no selection
+            picked = random.sample(option_ids, random.randint(0, 3)) if random.random() > 0.05 else []
+            rows.append({
+                "participant_id": participant_id,
+                "question_id": question_id,
+                "selected_options": [str(option_id) for option_id in picked] or None,
+            })
+        await db.execute(insert(Answer), rows)
+        await db.commit()
+    return question_id
+
+
+async def legacy_counts(db, question_id) -> dict[str, int]:
+    answers = (await db.execute(select(Answer).where(Answer.question_id == question_id))).scalars().all()
+    options = (await db.execute(
+        select(QuestionOption).where(QuestionOption.question_id == question_id)
+    )).scalars().all()
+    counts = {}
+    for option in options:
+        count = 0
+        for answer in answers:
+            if answer.selected_options and str(option.id) in [str(opt_id) for opt_id in answer.selected_options]:
+                count += 1
+        if count:
+            counts[str(option.id)] = count
+    return counts
+
+
+async def timed(name: str, func, question_id, repeat: int):
+    best, counts = float("inf"), None
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            counts = await func(db, question_id)
+            best = min(best, time.perf_counter() - started)
+    print(f"{name:<8} {best * 1000:9.2f} ms")
+    return counts
+
+
+async def main(answers: int, options: int, repeat: int):
+    # The schema is managed by Alembic only; its env.py runs synchronously, so not on the event loop
+    await asyncio.to_thread(command.upgrade, Config("alembic.ini"), "head")
+    question_id = await seed(answers, options)
+
+    print(f"{answers} answers, {options} options (best of {repeat})")
+    results = [
+        await timed("legacy", legacy_counts, question_id, repeat),
+        await timed("python", statistics_service._count_option_selections_python, question_id, repeat),
+        await timed("sql", statistics_service._count_option_selections_sql, question_id, repeat),
+    ]
+    assert all(result == results[0] for result in results), "strategies disagree"
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=10000)
+    parser.add_argument("--options", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.answers, args.options, args.repeat))
@@ -0,0 +1,86 @@
+"""Time near-duplicate clustering of free-text answers as the input grows.
+
+Generates distinct answers as noisy variants (case, punctuation, spacing,
+doubled letters, Cyrillic spelling) of a vocabulary of base answers, then
+times ``cluster_answers`` at each size. The indexed join should grow roughly
+linearly; ``--naive-limit`` also times an all-pairs comparison on the
+smaller inputs for reference.
+
+    cd backend
+    python -m benchmarks.text_clustering --sizes 1000 5000 10000 20000
+"""
+import argparse
+import random
+import string
+import time
+
+from app.services.text_clustering import cluster_answers, jaccard, similarity_key, trigrams
+
+CYRILLIC = str.maketrans({"a": "а", "e": "е", "o": "о", "p": "р", "c": "с", "k": "к", "m": "м", "t": "т"})
+
+
+def base_answers(count: int) -> list[str]:
+    words = ["".join(random.choices(string.ascii_lowercase, k=random.randint(4, 9))) for _ in range(count * 2)]
+    return [" ".join(random.sample(words, random.randint(1, 3))) for _ in range(count)]
+
+
+def variant(text: str) -> str:
+    choice = random.random()
+    if choice < 0.2:
+        text = text.upper()
+    elif choice < 0.4:
+        text = text.capitalize() + random.choice(["!", ".", "?", "..."])
+    elif choice < 0.6:
+        text = "  " + text.replace(" ", "   ") + " "
+    elif choice < 0.8:
+        i = random.randrange(len(text))
+        text = text[:i] + text[i] + text[i:]
+    else:
+        text = text.translate(CYRILLIC)
+    return text
+
+
+def generate(size: int) -> list[tuple[str, int]]:
+    bases = base_answers(max(1, size // 4))
+    answers = {}
+    while len(answers) < size:
+        text = variant(random.choice(bases))
+        answers[text] = answers.get(text, 0) + random.randint(1, 5)
+    return list(answers.items())
+
+
+def naive_pairs(answers: list[tuple[str, int]], threshold: float) -> int:
+    grams = [trigrams(similarity_key(text)) for text, _ in answers]
+    return sum(
+        1
+        for i in range(len(grams))
+        for j in range(i + 1, len(grams))
+        if jaccard(grams[i], grams[j]) >= threshold
+    )
+
+
+def main(sizes: list[int], threshold: float, naive_limit: int):
+    random.seed(0)
+    print(f"threshold {threshold}")
+    print(f"{'answers':>8} {'clusters':>9} {'indexed ms':>11} {'us/answer':>10} {'all-pairs ms':>13}")
+    for size in sizes:
+        answers = generate(size)
+        started = time.perf_counter()
+        clusters = cluster_answers(answers, threshold=threshold)
+        elapsed = time.perf_counter() - started
+
+        naive = ""
+        if size <= naive_limit:
+            started = time.perf_counter()
+            naive_pairs(answers, threshold)
+            naive = f"{(time.perf_counter() - started) * 1000:13.1f}"
+        print(f"{size:>8} {len(clusters):>9} {elapsed * 1000:11.1f} {elapsed / size * 1e6:10.1f} {naive}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000, 20000])
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--naive-limit", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.sizes, args.threshold, args.naive_limit)
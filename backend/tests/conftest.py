@@ -0,0 +1,40 @@
+"""Fixtures for tests that run against a database.
+
+Such tests write quizzes, so point DATABASE_URL at a scratch database
+migrated with `alembic upgrade head`. They are skipped when it can't be
+reached:
+
+    cd backend
+    alembic upgrade head
+    DATABASE_URL=postgresql://... pytest
+"""
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.database import DATABASE_URL, async_engine
+from app.main import app
+
+
+async def _ping():
+    async with async_engine.connect() as conn:
+        await conn.exec_driver_sql("SELECT 1")
+
+
+@pytest_asyncio.fixture
+async def client():
+    """HTTP client for the app running in-process with its startup/shutdown hooks."""
+    try:
+        await asyncio.wait_for(_ping(), timeout=5)
+    except Exception as e:
+        pytest.skip(f"Database at {DATABASE_URL} is unreachable: {e}")
+
+    # ASGITransport doesn't send lifespan events
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        await app.router.shutdown()
@@ -0,0 +1,129 @@
+"""Database round-trips of an answer submission stay within budget.
+
+With the quiz state cached, storing an answer (new or replaced) must take
+one statement and one commit; rejected answers (unknown participant,
+participant or question of another quiz) must still get their 404/403/400.
+A batch explains all of its rejected answers with one extra statement.
+"""
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.database import async_engine
+from app.services.answer_ingestion import IngestMode
+from app.services.answer_service import answer_ingestor
+
+STATEMENT_BUDGET = 1
+COMMIT_BUDGET = 1
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    def on_statement(self, *args):
+        self.statements += 1
+
+    def on_commit(self, *args):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+
+
+async def create_started_quiz(client: httpx.AsyncClient) -> tuple[str, str, str]:
+    """Return the invite code, a participant id and the current question id."""
+    response = await client.post("/api/quizzes", json={
+        "title": "Answer round-trip check",
+        "questions": [{"text": "Question", "order": 1, "type": "text_input"}],
+    })
+    response.raise_for_status()
+    invite_code = response.json()["invite_code"]
+    response = await client.post(f"/api/quizzes/{invite_code}/teams", json={
+        "name": "Team", "participants": [{"first_name": "Round", "last_name": "Trip"}],
+    })
+    response.raise_for_status()
+    participant_id = response.json()["participants"][0]["id"]
+    (await client.post(f"/api/quizzes/{invite_code}/start")).raise_for_status()
+    question = (await client.get(f"/api/quizzes/{invite_code}/current-question")).json()
+    return invite_code, participant_id, question["id"]
+
+
+@pytest.mark.asyncio
+async def test_answer_submission_round_trips(client: httpx.AsyncClient, monkeypatch):
+    # The budget is about the request's own round-trips, so write inline
+    monkeypatch.setattr(answer_ingestor, "mode", IngestMode.SYNC)
+    invite_code, participant_id, question_id = await create_started_quiz(client)
+    _, other_participant_id, other_question_id = await create_started_quiz(client)
+    counter = RoundTripCounter()
+
+    async def submit(participant, question, text="Answer"):
+        counter.reset()
+        response = await client.post(
+            f"/api/quizzes/{invite_code}/answers",
+            params={"participant_id": participant},
+            json={"question_id": question, "text_answer": text}
+        )
+        return response.status_code, counter.statements, counter.commits
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter.on_statement)
+    event.listen(async_engine.sync_engine, "commit", counter.on_commit)
+    try:
+        # Warm the quiz state cache without storing an answer
+        await submit(other_participant_id, question_id)
+        cases = [
+            ("new answer", 201, (participant_id, question_id, "First"), True),
+            ("replaced answer", 201, (participant_id, question_id, "Second"), True),
+            ("unknown participant", 404, (str(uuid.uuid4()), question_id), False),
+            ("participant of another quiz", 403, (other_participant_id, question_id), False),
+            ("question of another quiz", 400, (participant_id, other_question_id), False),
+        ]
+        failures = []
+        for name, expected_status, args, budgeted in cases:
+            status, statements, commits = await submit(*args)
+            over_budget = budgeted and (statements > STATEMENT_BUDGET or commits > COMMIT_BUDGET)
+            if status != expected_status or over_budget:
+                failures.append(f"{name}: HTTP {status}, {statements} statements, {commits} commits")
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", counter.on_statement)
+        event.remove(async_engine.sync_engine, "commit", counter.on_commit)
+
+    assert not failures, "\n".join(failures)
+
+
+@pytest.mark.asyncio
+async def test_rejected_batch_answers_are_explained_in_one_query(client: httpx.AsyncClient):
+    invite_code, participant_id, question_id = await create_started_quiz(client)
+    _, other_participant_id, other_question_id = await create_started_quiz(client)
+    # Warm the quiz state cache
+    (await client.post(f"/api/quizzes/{invite_code}/answers/batch", json={"answers": [
+        {"participant_id": participant_id, "question_id": question_id, "text_answer": "First"}
+    ]})).raise_for_status()
+    answers = [
+        (participant_id, question_id, 201),
+        (str(uuid.uuid4()), question_id, 404),
+        (str(uuid.uuid4()), question_id, 404),
+        (other_participant_id, question_id, 403),
+        (participant_id, other_question_id, 400),
+    ]
+    counter = RoundTripCounter()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter.on_statement)
+    event.listen(async_engine.sync_engine, "commit", counter.on_commit)
+    try:
+        response = await client.post(f"/api/quizzes/{invite_code}/answers/batch", json={"answers": [
+            {"participant_id": participant, "question_id": question, "text_answer": "Second"}
+            for participant, question, _ in answers
+        ]})
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", counter.on_statement)
+        event.remove(async_engine.sync_engine, "commit", counter.on_commit)
+
+    assert [result["status_code"] for result in response.json()["results"]] == [
+        status for _, _, status in answers
+    ]
+    # The upsert, then one query for the reasons of every rejection
+    assert (counter.statements, counter.commits) == (STATEMENT_BUDGET + 1, COMMIT_BUDGET)
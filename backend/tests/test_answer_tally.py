@@ -0,0 +1,97 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.answer_ingestion import AnswerIngestor, IngestMode
+from app.services.answer_tally import AnswerTallyRegistry
+
+QUIZ_ID = uuid.uuid4()
+QUESTION_ID = uuid.uuid4()
+STARTED = datetime(2026, 1, 1)
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+
+def stored_answers(registry, answers, release=None):
+    """Make the registry reload the given (participant_id, text) answers, once ``release`` is set."""
+    async def load(db, quiz_id):
+        if release is not None:
+            await release.wait()
+        return [
+            (participant_id, QUESTION_ID, text, STARTED + timedelta(seconds=i))
+            for i, (participant_id, text) in enumerate(answers)
+        ]
+    registry._load_answers = load
+
+
+@pytest.mark.asyncio
+async def test_reloaded_tally_is_exact():
+    registry = AnswerTallyRegistry()
+    alice, bob = uuid.uuid4(), uuid.uuid4()
+    stored_answers(registry, [(alice, " Python "), (bob, "Java")])
+    assert await registry.candidates(None, QUIZ_ID) == [("Python", 1), ("Java", 1)]
+
+    # An edit moves the count instead of dropping the tally
+    registry.record(QUIZ_ID, alice, QUESTION_ID, "Java", STARTED + timedelta(minutes=1))
+    assert await registry.candidates(None, QUIZ_ID) == [("Java", 2)]
+    assert registry.stats()["reloads"] == 1 and registry.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_answers_recorded_during_a_reload_are_kept():
+    registry = AnswerTallyRegistry()
+    release = asyncio.Event()
+    alice, bob = uuid.uuid4(), uuid.uuid4()
+    stored_answers(registry, [(alice, "Python")], release)
+
+    loading = asyncio.create_task(registry.candidates(None, QUIZ_ID))
+    await asyncio.sleep(0)
+    registry.record(QUIZ_ID, bob, QUESTION_ID, "Python", STARTED + timedelta(minutes=1))
+    release.set()
+    assert await loading == [("Python", 2)]
+
+
+@pytest.mark.asyncio
+async def test_grouped_counts_are_not_kept_without_exclusive_writes():
+    registry = AnswerTallyRegistry()
+    registry.exclusive = False
+
+    async def load_counts(db, quiz_id):
+        return [("Python", 3, STARTED)]
+    registry._load_counts = load_counts
+    assert await registry.candidates(None, QUIZ_ID) == [("Python", 3)]
+    assert registry.stats()["tallied_quizzes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_waits_for_the_batch_in_flight():
+    release = asyncio.Event()
+    written = []
+
+    async def upsert(db, values):
+        await release.wait()
+        written.extend(values)
+        return []
+
+    ingestor = AnswerIngestor(upsert, mode=IngestMode.BUFFERED, flush_interval=0.001)
+    await ingestor.start()
+    try:
+        await ingestor.submit(FakeSession(), {"participant_id": 1, "question_id": 1})
+        # Let the flusher take the answer off the queue and start writing it
+        while ingestor.stats()["queued"]:
+            await asyncio.sleep(0.001)
+
+        flushing = asyncio.create_task(ingestor.flush())
+        await asyncio.sleep(0.01)
+        assert not flushing.done()
+        release.set()
+        await flushing
+        assert len(written) == 1
+    finally:
+        release.set()
+        await ingestor.stop()
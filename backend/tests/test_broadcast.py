@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from app.websocket.broadcast import BroadcastBackend, MemoryBroadcast, PostgresBroadcast
+from app.websocket.manager import ConnectionManager
+
+
+def chunks(envelope: dict, size: int) -> list[dict]:
+    data = json.dumps(envelope)
+    parts = [data[i:i + size] for i in range(0, len(data), size)]
+    return [{"chunk": "c1", "index": i, "count": len(parts), "data": part} for i, part in enumerate(parts)]
+
+
+def test_backends_must_implement_publish():
+    class Incomplete(BroadcastBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    MemoryBroadcast()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_reports_a_gap_and_drops_partial_envelopes():
+    backend = PostgresBroadcast("postgresql://unused", None, reconnect_delay=0)
+    gaps = []
+    backend.on_gap = lambda: gaps.append(True)
+
+    async def listen():
+        pass
+    backend._listen = listen
+
+    first = chunks({"type": "question_changed", "text": "x" * 50}, 40)[0]
+    assert backend._reassemble(first) is None
+    await backend._reconnect()
+    assert gaps == [True]
+    assert backend._chunks == {}
+
+
+def test_stale_partial_envelopes_expire():
+    backend = PostgresBroadcast("postgresql://unused", None, chunk_timeout=0)
+    stale = chunks({"type": "question_changed", "text": "x" * 50}, 40)[0]
+    backend._reassemble(stale)
+
+    fresh = [dict(part, chunk="c2") for part in chunks({"type": "quiz_started"}, 20)]
+    for part in fresh[:-1]:
+        assert backend._reassemble(part) is None
+    assert backend._reassemble(fresh[-1]) == {"type": "quiz_started"}
+    assert "c1" not in backend._chunks
+
+
+def test_gap_starts_new_epochs_and_calls_listeners():
+    manager = ConnectionManager(ping_interval=0)
+    gaps = []
+    manager.add_gap_listener(lambda: gaps.append(True))
+    epoch, _ = manager.stream_position("QUIZ")
+
+    manager.backend.on_gap()
+    assert gaps == [True]
+    assert manager.stream_position("QUIZ")[0] != epoch
+    assert manager.events.since("QUIZ", epoch, 0) is None
@@ -0,0 +1,203 @@
+import asyncio
+import json
+
+import pytest
+
+from app.websocket.manager import ConnectionManager
+from app.websocket.protocol import PROTOCOLS
+from app.websocket.replay import EventLog, LoggedEvent, format_event_id, parse_event_id
+
+
+class FakeSocket:
+    """Records what the manager sends; offers the given subprotocols."""
+
+    def __init__(self, *subprotocols):
+        self.scope = {"subprotocols": list(subprotocols)}
+        self.sent = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+    async def close(self, code=1000):
+        pass
+
+    def messages(self):
+        return [json.loads(frame) for frame in self.sent]
+
+
+async def settle():
+    # Let the writer tasks drain their queues
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def broadcast(manager, *types, invite_code="QUIZ"):
+    for message_type in types:
+        await manager.broadcast_to_quiz({"type": message_type}, invite_code)
+
+
+def log_events(log, invite_code, count):
+    for _ in range(count):
+        _, seq = log.next_seq(invite_code)
+        log.record(invite_code, LoggedEvent(seq, "all", None, f'{{"seq":{seq}}}', None))
+
+
+def test_since_replays_events_after_last_seq():
+    log = EventLog(max_events=4, max_quizzes=8)
+    log_events(log, "QUIZ", 3)
+    epoch, _ = log.position("QUIZ")
+    assert [event.seq for event in log.since("QUIZ", epoch, 1)] == [2, 3]
+    assert log.since("QUIZ", epoch, 3) == []
+
+
+def test_since_misses_when_events_fell_out_of_the_buffer():
+    log = EventLog(max_events=4, max_quizzes=8)
+    log_events(log, "QUIZ", 6)
+    epoch, _ = log.position("QUIZ")
+    assert log.since("QUIZ", epoch, 1) is None
+    assert [event.seq for event in log.since("QUIZ", epoch, 2)] == [3, 4, 5, 6]
+
+
+def test_since_misses_for_another_epoch_or_a_future_seq():
+    log = EventLog(max_events=4, max_quizzes=8)
+    log_events(log, "QUIZ", 2)
+    epoch, _ = log.position("QUIZ")
+    assert log.since("QUIZ", "other", 1) is None
+    assert log.since("QUIZ", epoch, 3) is None
+    assert log.resume_misses == 2
+
+
+def test_evicted_log_starts_a_new_epoch():
+    log = EventLog(max_events=4, max_quizzes=1)
+    log_events(log, "QUIZ", 2)
+    epoch, _ = log.position("QUIZ")
+    log_events(log, "OTHER", 1)
+    assert log.since("QUIZ", epoch, 1) is None
+    new_epoch, seq = log.position("QUIZ")
+    assert new_epoch != epoch and seq == 0
+
+
+def test_event_ids_round_trip():
+    assert parse_event_id(format_event_id("abc-def", 7)) == ("abc-def", 7)
+    assert parse_event_id("no-seq") is None
+    assert parse_event_id(None) is None
+
+
+@pytest.mark.asyncio
+async def test_resume_sends_only_missed_broadcasts():
+    manager = ConnectionManager(ping_interval=0)
+    first = FakeSocket()
+    await manager.connect(first, "QUIZ")
+    await broadcast(manager, "quiz_started", "question_changed", "team_joined")
+    epoch, _ = manager.stream_position("QUIZ")
+
+    second = FakeSocket()
+    await manager.connect(second, "QUIZ")
+    assert manager.resume(second, epoch, 1)
+    await settle()
+    assert [(message["type"], message["seq"]) for message in second.messages()] == [
+        ("resumed", 3), ("question_changed", 2), ("team_joined", 3)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_resume_from_another_epoch_sends_nothing():
+    manager = ConnectionManager(ping_interval=0)
+    await broadcast(manager, "quiz_started")
+    socket = FakeSocket()
+    await manager.connect(socket, "QUIZ")
+    assert not manager.resume(socket, "stale", 1)
+    await settle()
+    assert socket.sent == []
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_messages_of_the_clients_team_only():
+    manager = ConnectionManager(ping_interval=0)
+    await manager.send_to_team({"type": "hint"}, "QUIZ", "red")
+    await manager.send_to_team({"type": "hint"}, "QUIZ", "blue")
+    epoch, _ = manager.stream_position("QUIZ")
+    socket = FakeSocket()
+    await manager.connect(socket, "QUIZ", team_id="blue")
+    assert manager.resume(socket, epoch, 0)
+    await settle()
+    assert [(message["type"], message.get("seq")) for message in socket.messages()] == [
+        ("resumed", 2), ("hint", 2)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_host_only_messages_are_not_numbered_or_logged():
+    manager = ConnectionManager(ping_interval=0, replay_buffer_size=2)
+    host, participant = FakeSocket(), FakeSocket()
+    await manager.connect(host, "QUIZ", role="host")
+    await manager.connect(participant, "QUIZ")
+    await broadcast(manager, "quiz_started")
+    for _ in range(5):
+        await manager.send_to_hosts({"type": "answers_progress"}, "QUIZ")
+    await broadcast(manager, "question_changed")
+    await settle()
+
+    assert [message["type"] for message in participant.messages()] == ["quiz_started", "question_changed"]
+    assert [message.get("seq") for message in host.messages()] == [1] + [None] * 5 + [2]
+    epoch, seq = manager.stream_position("QUIZ")
+    assert seq == 2
+    # Progress messages didn't push the participant's broadcasts out of the buffer
+    assert [event.seq for event in manager.events.since("QUIZ", epoch, 0)] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_held_broadcasts_follow_the_snapshot():
+    manager = ConnectionManager(ping_interval=0)
+    socket = FakeSocket()
+    await manager.connect(socket, "QUIZ")
+    manager.hold(socket)
+    epoch, seq = manager.stream_position("QUIZ")
+    # Delivered while the snapshot's state is being read
+    await broadcast(manager, "question_changed")
+    await settle()
+    assert socket.sent == []
+
+    await manager.send_personal_message({"type": "snapshot", "epoch": epoch, "seq": seq}, socket)
+    manager.release(socket)
+    await settle()
+    assert [message["type"] for message in socket.messages()] == ["snapshot", "question_changed"]
+
+
+@pytest.mark.asyncio
+async def test_default_protocol_sends_one_frame_per_message():
+    manager = ConnectionManager(ping_interval=0)
+    socket = FakeSocket()
+    await manager.connect(socket, "QUIZ")
+    await broadcast(manager, "quiz_started", "question_changed")
+    await settle()
+    assert [message["type"] for message in socket.messages()] == ["quiz_started", "question_changed"]
+    assert manager.metrics.socket_frames == 2
+
+
+@pytest.mark.asyncio
+async def test_compact_protocol_batches_queued_messages():
+    manager = ConnectionManager(ping_interval=0)
+    socket = FakeSocket("quiz.compact.v2")
+    await manager.connect(socket, "QUIZ")
+    await manager.broadcast_to_quiz({"type": "team_joined", "message": "Team joined"}, "QUIZ")
+    await manager.broadcast_to_quiz({"type": "quiz_started", "message": "Quiz has started"}, "QUIZ")
+    await settle()
+    assert socket.messages() == [[{"type": "team_joined", "seq": 1}, {"type": "quiz_started", "seq": 2}]]
+    assert manager.metrics.frames_sent == 2 and manager.metrics.socket_frames == 1
+
+
+@pytest.mark.skipif("quiz.msgpack.v2" not in PROTOCOLS, reason="msgpack is not installed")
+def test_msgpack_join_forms_a_packed_array():
+    import msgpack
+
+    protocol = PROTOCOLS["quiz.msgpack.v2"]
+    frames = [protocol.from_json('{"type":"a","message":"verbose"}'), protocol.from_json('{"type":"b"}')]
+    [frame] = protocol.join(frames)
+    assert msgpack.unpackb(frame) == [{"type": "a"}, {"type": "b"}]
@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.services.live_statistics import LiveQuestionStatistics, LiveStatisticsRegistry
+
+QUIZ_ID = uuid.uuid4()
+QUESTION_ID = uuid.uuid4()
+OPTION_A, OPTION_B = uuid.uuid4(), uuid.uuid4()
+
+
+def slow_load(registry, stored, release):
+    """Make the registry load ``stored`` (participant -> options) once ``release`` is set."""
+    async def load(db, quiz_id):
+        statistics = LiveQuestionStatistics(QUESTION_ID, "Last", [(OPTION_A, "A"), (OPTION_B, "B")])
+        for participant_id, selected_options in stored.items():
+            statistics.apply(participant_id, selected_options)
+        await release.wait()
+        return statistics
+    registry._load = load
+
+
+@pytest.mark.asyncio
+async def test_answers_recorded_during_a_load_are_kept():
+    registry = LiveStatisticsRegistry(reconcile_interval=0)
+    release = asyncio.Event()
+    first, second = uuid.uuid4(), uuid.uuid4()
+    slow_load(registry, {first: [OPTION_A]}, release)
+
+    loading = asyncio.create_task(registry.get(None, QUIZ_ID))
+    await asyncio.sleep(0)
+    registry.record(QUIZ_ID, QUESTION_ID, second, [str(OPTION_B)])
+    release.set()
+    statistics = await loading
+
+    assert statistics.option_counts() == {str(OPTION_A): 1, str(OPTION_B): 1}
+    assert (await registry.get(None, QUIZ_ID)) is statistics
+
+
+@pytest.mark.asyncio
+async def test_reconcile_swap_keeps_answers_recorded_meanwhile():
+    registry = LiveStatisticsRegistry(reconcile_interval=0)
+    release = asyncio.Event()
+    release.set()
+    first, second = uuid.uuid4(), uuid.uuid4()
+    slow_load(registry, {first: [OPTION_A]}, release)
+    drifted = await registry.get(None, QUIZ_ID)
+
+    release.clear()
+    reloading = asyncio.create_task(registry._reload(None, QUIZ_ID, drifted))
+    await asyncio.sleep(0)
+    registry.record(QUIZ_ID, QUESTION_ID, second, [str(OPTION_B)])
+    release.set()
+    reloaded = await reloading
+
+    assert reloaded is not drifted
+    assert (await registry.get(None, QUIZ_ID)) is reloaded
+    assert reloaded.option_counts() == {str(OPTION_A): 1, str(OPTION_B): 1}
+
+
+@pytest.mark.asyncio
+async def test_invalidate_during_a_load_leaves_the_quiz_untracked():
+    registry = LiveStatisticsRegistry(reconcile_interval=0)
+    release = asyncio.Event()
+    slow_load(registry, {}, release)
+
+    loading = asyncio.create_task(registry.get(None, QUIZ_ID))
+    await asyncio.sleep(0)
+    # A buffered answer that was recorded, then failed to persist
+    registry.record(QUIZ_ID, QUESTION_ID, uuid.uuid4(), [str(OPTION_A)])
+    registry.invalidate(QUIZ_ID)
+    release.set()
+
+    assert (await loading).total_answers == 0
+    assert registry.stats()["tracked_questions"] == 0
@@ -0,0 +1,189 @@
+"""Every query the services run is served by an index.
+
+Runs a whole quiz (create, join, start, answer, advance to the generated
+last question, vote, finish, statistics, export) through the app, together
+with the queries that run outside request handlers (answer progress, live
+statistics reconciliation, text answer tally, WebSocket connect), and
+records each SQL statement sent to the database. Every recorded
+SELECT/UPDATE/DELETE is then EXPLAINed with sequential scans and
+hash/merge joins disabled, which makes the planner look up every table
+through an index if it can, regardless of how small the test tables are.
+A plan that still contains a Seq Scan, or an index scan whose condition
+doesn't constrain the index's leading column (a full index walk), lacks a
+usable index.
+"""
+import json
+import re
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.database import AsyncSessionLocal, async_engine
+from app.services import answer_service, statistics_service, team_service
+from app.services.answer_tally import answer_tally
+from app.services.live_statistics import live_statistics
+from app.services.quiz_cache import quiz_cache
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+# Rows of other quizzes, added for the EXPLAINs and rolled back afterwards. On
+# the few rows of a scratch database, walking a whole index costs about as much
+# as a targeted lookup, so the plans would depend on what the database holds.
+FILLER = [
+    """INSERT INTO quizzes (id, title, invite_code, status, created_at, updated_at)
+    SELECT gen_random_uuid(), 'Filler', 'filler-' || i, 'COMPLETED', now(), now()
+    FROM generate_series(1, 500) i""",
+    """INSERT INTO questions (id, quiz_id, "order", text, type, is_last)
+    SELECT gen_random_uuid(), quizzes.id, n, 'Filler', 'text_input', false
+    FROM quizzes, generate_series(1, 5) n WHERE quizzes.title = 'Filler'""",
+    """INSERT INTO question_options (id, question_id, text, "order")
+    SELECT gen_random_uuid(), questions.id, 'Filler', n
+    FROM questions JOIN quizzes ON quizzes.id = questions.quiz_id, generate_series(1, 4) n
+    WHERE quizzes.title = 'Filler'""",
+    """INSERT INTO teams (id, quiz_id, name, joined_at)
+    SELECT gen_random_uuid(), quizzes.id, 'Filler ' || n, now()
+    FROM quizzes, generate_series(1, 4) n WHERE quizzes.title = 'Filler'""",
+    """INSERT INTO participants (id, team_id, first_name, last_name)
+    SELECT gen_random_uuid(), teams.id, 'Filler', n::text
+    FROM teams JOIN quizzes ON quizzes.id = teams.quiz_id, generate_series(1, 3) n
+    WHERE quizzes.title = 'Filler'""",
+    """INSERT INTO answers (id, participant_id, question_id, text_answer, answered_at)
+    SELECT gen_random_uuid(), participants.id, questions.id, 'Filler', now()
+    FROM participants
+    JOIN teams ON teams.id = participants.team_id
+    JOIN quizzes ON quizzes.id = teams.quiz_id
+    JOIN questions ON questions.quiz_id = quizzes.id
+    WHERE quizzes.title = 'Filler'""",
+]
+
+
+class StatementRecorder:
+    """Collects distinct statements (with the parameters of their first run) sent to the database."""
+
+    def __init__(self):
+        self.statements: dict[str, object] = {}
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE", "WITH"):
+            self.statements.setdefault(statement, parameters)
+
+
+async def run_quiz(client: httpx.AsyncClient):
+    response = await client.post("/api/quizzes", json={
+        "title": "Query plan check",
+        "questions": [
+            {"text": "First question", "order": 1, "type": "text_input"},
+            {"text": "Second question", "order": 2, "type": "text_input"},
+        ],
+    })
+    response.raise_for_status()
+    quiz = response.json()
+    invite_code = quiz["invite_code"]
+
+    response = await client.post(f"/api/quizzes/{invite_code}/teams", json={
+        "name": "Team",
+        "participants": [{"first_name": "Plan", "last_name": str(i)} for i in range(3)],
+    })
+    response.raise_for_status()
+    participant_ids = [participant["id"] for participant in response.json()["participants"]]
+    response = await client.get(f"/api/quizzes/{invite_code}/teams", params={"limit": 1})
+    response.raise_for_status()
+    (await client.get(
+        f"/api/quizzes/{invite_code}/teams", params={"after": response.headers["X-Next-Cursor"]}
+    )).raise_for_status()
+    (await client.get(f"/api/quizzes/{invite_code}")).raise_for_status()
+
+    (await client.post(f"/api/quizzes/{invite_code}/start")).raise_for_status()
+    for _ in range(2):
+        question = (await client.get(f"/api/quizzes/{invite_code}/current-question")).json()
+        for participant_id in participant_ids:
+            (await client.post(
+                f"/api/quizzes/{invite_code}/answers",
+                params={"participant_id": participant_id},
+                json={"question_id": question["id"], "text_answer": "Answer"}
+            )).raise_for_status()
+        (await client.post(f"/api/quizzes/{invite_code}/next-question")).raise_for_status()
+        # Drop cached state so the next request queries it again
+        quiz_cache.clear()
+
+    last_question = (await client.get(f"/api/quizzes/{invite_code}/current-question")).json()
+    for participant_id in participant_ids:
+        (await client.post(
+            f"/api/quizzes/{invite_code}/answers",
+            params={"participant_id": participant_id},
+            json={"question_id": last_question["id"], "selected_options": [last_question["options"][0]["id"]]}
+        )).raise_for_status()
+    (await client.get(f"/api/quizzes/{invite_code}/statistics/live")).raise_for_status()
+    (await client.post(f"/api/quizzes/{invite_code}/finish")).raise_for_status()
+    (await client.get(f"/api/quizzes/{invite_code}/statistics")).raise_for_status()
+    (await client.get(f"/api/quizzes/{invite_code}/export")).raise_for_status()
+
+    # Queries that run outside request handlers
+    async with AsyncSessionLocal() as db:
+        await answer_service.get_answer_progress(db, quiz["id"], [question["id"] for question in quiz["questions"]])
+        await live_statistics.reconcile(db)
+        await live_statistics._load(db, quiz["id"])
+        await answer_tally._load_answers(db, quiz["id"])
+        await answer_tally._load_counts(db, quiz["id"])
+        await statistics_service.get_statistics_for_question(db, last_question["id"])
+        # WebSocket connect: participant binding and snapshot
+        await team_service.get_participant_team_id(db, quiz["id"], participant_ids[0])
+        await team_service.count_teams(db, quiz["id"])
+
+
+def unindexed_scans(node: dict, leading_columns: dict[str, str]) -> list[str]:
+    """Scans in a JSON plan that don't look rows up through an index."""
+    scans = []
+    if node["Node Type"] == "Seq Scan":
+        scans.append(f"Seq Scan on {node['Relation Name']}")
+    elif node["Node Type"] in INDEX_SCANS:
+        column = leading_columns[node["Index Name"]]
+        if not re.search(rf'\b"?{column}"?\b', node.get("Index Cond", "")):
+            scans.append(f"{node['Node Type']} on {node['Index Name']} without a condition on {column}")
+    for child in node.get("Plans", ()):
+        scans.extend(unindexed_scans(child, leading_columns))
+    return scans
+
+
+async def explain(statements: dict[str, object]) -> list[tuple[str, list[str]]]:
+    failures = []
+    # Nothing is committed: the filler rows and statistics are rolled back on close
+    async with async_engine.connect() as conn:
+        for statement in FILLER:
+            await conn.exec_driver_sql(statement)
+        # Fresh statistics, so estimates reflect the rows just written
+        await conn.exec_driver_sql("ANALYZE")
+        for setting in ("enable_seqscan", "enable_hashjoin", "enable_mergejoin"):
+            # Scoped to this transaction, so the pooled connection is returned unchanged
+            await conn.exec_driver_sql(f"SET LOCAL {setting} = off")
+        result = await conn.exec_driver_sql(
+            "SELECT index.relname, attribute.attname FROM pg_index"
+            " JOIN pg_class index ON index.oid = pg_index.indexrelid"
+            " JOIN pg_attribute attribute ON attribute.attrelid = pg_index.indrelid"
+            " AND attribute.attnum = pg_index.indkey[0]"
+        )
+        leading_columns = dict(result.all())
+        for statement, parameters in statements.items():
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            scans = unindexed_scans(plan[0]["Plan"], leading_columns)
+            if scans:
+                failures.append((statement, scans))
+    return failures
+
+
+@pytest.mark.asyncio
+async def test_service_queries_use_indexes(client: httpx.AsyncClient):
+    recorder = StatementRecorder()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", recorder)
+    try:
+        await run_quiz(client)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", recorder)
+
+    failures = await explain(recorder.statements)
+    report = "\n\n".join(f"{'; '.join(sorted(set(scans)))}:\n{statement}" for statement, scans in failures)
+    assert not failures, f"{len(failures)} of {len(recorder.statements)} statements without an index:\n{report}"
@@ -0,0 +1,71 @@
+import uuid
+
+from app.models.quiz import QuizStatus
+from app.services.question_cache import RenderedQuestion, RenderedQuestionCache
+from app.services.quiz_cache import QuizState, QuizStateCache
+
+
+def quiz_state(invite_code: str, order: int = 1) -> QuizState:
+    return QuizState(uuid.uuid4(), invite_code, QuizStatus.IN_PROGRESS, order)
+
+
+def test_quiz_cache_drops_a_load_that_raced_an_invalidation():
+    cache = QuizStateCache(ttl_seconds=60, max_entries=8)
+    version = cache.version("QUIZ")
+    cache.invalidate("QUIZ")
+    cache.set(quiz_state("QUIZ"), version)
+    assert cache.get("QUIZ") is None
+
+    cache.set(quiz_state("QUIZ"), cache.version("QUIZ"))
+    assert cache.get("QUIZ") is not None
+
+
+def test_quiz_cache_versions_are_bounded_by_max_entries():
+    cache = QuizStateCache(ttl_seconds=60, max_entries=4)
+    for i in range(100):
+        cache.invalidate(f"QUIZ{i}")
+    assert cache.stats()["size"] == 4
+
+
+def test_quiz_cache_drops_a_load_whose_invalidation_was_evicted():
+    cache = QuizStateCache(ttl_seconds=60, max_entries=2)
+    version = cache.version("QUIZ")
+    cache.invalidate("QUIZ")
+    cache.invalidate("OTHER1")
+    cache.invalidate("OTHER2")
+    cache.set(quiz_state("QUIZ"), version)
+    assert cache.get("QUIZ") is None
+
+
+def test_quiz_cache_clear_drops_loads_in_flight():
+    cache = QuizStateCache(ttl_seconds=60, max_entries=8)
+    cache.set(quiz_state("QUIZ"), cache.version("QUIZ"))
+    version = cache.version("QUIZ")
+    cache.clear()
+    cache.set(quiz_state("QUIZ", order=2), version)
+    assert cache.get("QUIZ") is None
+
+
+def test_question_cache_invalidates_all_questions_of_a_quiz_only():
+    cache = RenderedQuestionCache(max_entries=8)
+    for invite_code in ("QUIZ", "OTHER"):
+        for order in (1, 2):
+            cache.prime(invite_code, order, RenderedQuestion.from_body(f"{invite_code}{order}".encode()))
+    cache.invalidate("QUIZ")
+    assert cache.get("QUIZ", 1) is None and cache.get("QUIZ", 2) is None
+    assert cache.get("OTHER", 2).body == b"OTHER2"
+
+
+def test_question_cache_drops_a_render_that_raced_an_invalidation():
+    cache = RenderedQuestionCache(max_entries=8)
+    version = cache.version("QUIZ")
+    cache.invalidate("QUIZ")
+    cache.set("QUIZ", 1, RenderedQuestion.from_body(b"stale"), version)
+    assert cache.get("QUIZ", 1) is None
+
+
+def test_question_cache_versions_are_bounded_by_max_entries():
+    cache = RenderedQuestionCache(max_entries=4)
+    for i in range(100):
+        cache.invalidate(f"QUIZ{i}")
+    assert cache.stats()["size"] == 4
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import httpx
+import pytest
+
+from app.database import AsyncSessionLocal
+from app.models import Team
+
+
+@pytest.mark.asyncio
+async def test_total_count_reveals_team_committed_behind_cursor(client: httpx.AsyncClient):
+    quiz = (await client.post("/api/quizzes", json={
+        "title": "Roster check",
+        "questions": [{"text": "Question", "order": 1, "type": "text_input"}],
+    })).json()
+    invite_code = quiz["invite_code"]
+    (await client.post(f"/api/quizzes/{invite_code}/teams", json={
+        "name": "First", "participants": [{"first_name": "A", "last_name": "B"}],
+    })).raise_for_status()
+    response = await client.get(f"/api/quizzes/{invite_code}/teams")
+    assert response.headers["X-Total-Count"] == "1"
+    cursor = response.headers["X-Next-Cursor"]
+
+    # A registration whose join time was set before the first team's but that committed after the poll
+    first = response.json()[0]
+    async with AsyncSessionLocal() as db:
+        joined_at = datetime.fromisoformat(first["joined_at"]) - timedelta(seconds=1)
+        db.add(Team(quiz_id=UUID(quiz["id"]), name="Late", joined_at=joined_at))
+        await db.commit()
+
+    response = await client.get(f"/api/quizzes/{invite_code}/teams", params={"after": cursor})
+    assert response.json() == []
+    assert response.headers["X-Total-Count"] == "2"
+
@@ -0,0 +1,44 @@
+from app.services.text_clustering import cluster_answers, similarity_key
+
+
+def clusters(answers):
+    return sorted(sorted(cluster.members) for cluster in cluster_answers(answers))
+
+
+def test_numeric_answers_are_not_merged():
+    assert clusters([("10", 3), ("100", 2), ("1000", 1), ("2001", 1), ("201", 1)]) == [
+        ["10"], ["100"], ["1000"], ["2001"], ["201"]
+    ]
+
+
+def test_repeated_digits_and_symbols_are_kept():
+    assert similarity_key("100") != similarity_key("10")
+    assert similarity_key("C++") != similarity_key("C+")
+    assert similarity_key("Pythonn") == similarity_key("python")
+
+
+def test_numbers_must_match_within_text():
+    assert clusters([("Python 3", 2), ("Python 2", 1), ("python 3", 1)]) == [
+        ["Python 2"], ["Python 3", "python 3"]
+    ]
+
+
+def test_short_answers_stay_apart():
+    assert clusters([("C", 2), ("C++", 1), ("C#", 1), ("Go", 1), ("JS", 1)]) == [
+        ["C"], ["C#"], ["C++"], ["Go"], ["JS"]
+    ]
+
+
+def test_near_duplicates_are_merged():
+    result = cluster_answers([("Python", 3), ("питон", 1), ("Pyton", 1), ("Java", 2)])
+    assert [(cluster.representative, cluster.count) for cluster in result] == [("Python", 5), ("Java", 2)]
+
+
+def test_answers_are_compared_with_the_cluster_leader_not_chained():
+    # Each answer is close to the next one, but the last two are far from the first
+    answers = [("abcdefgh", 3), ("abcdefghij", 2), ("abcdefghijkl", 1), ("abcdefghijklmn", 1)]
+    result = cluster_answers(answers)
+    assert [sorted(cluster.members) for cluster in result] == [
+        ["abcdefgh", "abcdefghij"], ["abcdefghijkl", "abcdefghijklmn"]
+    ]
+    assert [cluster.count for cluster in result] == [5, 2]
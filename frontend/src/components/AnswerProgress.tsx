@@ -0,0 +1,59 @@
+import React from 'react';
+import { QuestionResponse, TeamResponse } from '../services/api';
+import { QuestionProgress } from '../services/websocket';
+import './AnswerProgress.css';
+
+interface AnswerProgressProps {
+  questions: QuestionResponse[];
+  teams: TeamResponse[];
+  progress: Record<string, QuestionProgress>;
+  currentQuestionId: string | null;
+}
+
+const AnswerProgress: React.FC<AnswerProgressProps> = ({ questions, teams, progress, currentQuestionId }) => {
+  const answered = questions.filter((question) => progress[question.id]);
+  const current = currentQuestionId ? progress[currentQuestionId] : undefined;
+
+  if (answered.length === 0) {
+    return (
+      <div className="answer-progress empty-progress">
+        <p>Ответов пока нет</p>
+      </div>
+    );
+  }
+
+  const teamNames = new Map(teams.map((team) => [team.id, team.name]));
+
+  return (
+    <div className="answer-progress">
+      <div className="progress-questions">
+        {answered.map((question) => (
+          <div
+            key={question.id}
+            className={`progress-row${question.id === currentQuestionId ? ' progress-row-current' : ''}`}
+          >
+            <span>Вопрос {question.order}</span>
+            <span className="progress-count">
+              {progress[question.id].answered}/{progress[question.id].total}
+            </span>
+          </div>
+        ))}
+      </div>
+      {current && (
+        <div className="progress-teams">
+          <h3>По командам</h3>
+          {current.teams.map((team) => (
+            <div key={team.team_id} className="progress-row">
+              <span>{teamNames.get(team.team_id) ?? 'Команда'}</span>
+              <span className="progress-count">
+                {team.answered}/{team.total}
+              </span>
+            </div>
+          ))}
+        </div>
+      )}
+    </div>
+  );
+};
+
+export default AnswerProgress;
@@ -1,9 +1,10 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { quizApi, QuizResponse, TeamResponse, QuestionResponse } from '../services/api';
-import { WebSocketClient } from '../services/websocket';
+import { QuestionProgress, WebSocketClient } from '../services/websocket';
 import TeamList from '../components/TeamList';
 import QuestionCard from '../components/QuestionCard';
+import AnswerProgress from '../components/AnswerProgress';
 import './HostDashboard.css';
 
 const HostDashboard: React.FC = () => {
@@ -15,17 +16,47 @@ const HostDashboard: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [wsClient, setWsClient] = useState<WebSocketClient | null>(null);
   const [actionLoading, setActionLoading] = useState(false);
+  // Answered/total counts by question id, from answers_progress events
+  const [progress, setProgress] = useState<Record<string, QuestionProgress>>({});
+  // Roster position after the last team loaded; only newer teams are fetched
+  const teamsCursor = useRef<string | null>(null);
+  // Ids of the teams in the list
+  const knownTeamIds = useRef<Set<string>>(new Set());
+
+  const loadNewTeams = async () => {
+    if (!inviteCode) return;
+    const { teams: newTeams, cursor, total } = await quizApi.getNewTeams(inviteCode, teamsCursor.current);
+    teamsCursor.current = cursor;
+    // The poll and a team_joined event may fetch the same teams concurrently
+    const added = newTeams.filter((team) => !knownTeamIds.current.has(team.id));
+    added.forEach((team) => knownTeamIds.current.add(team.id));
+    if (added.length > 0) {
+      setTeams((current) => [...current, ...added]);
+    }
+
+    // A team whose registration committed late sorts behind the cursor; reload the roster to pick it up
+    if (teamsCursor.current !== null && total !== null && knownTeamIds.current.size < total) {
+      const roster = await quizApi.getNewTeams(inviteCode, null);
+      teamsCursor.current = roster.cursor;
+      knownTeamIds.current = new Set(roster.teams.map((team) => team.id));
+      setTeams(roster.teams);
+    }
+  };
 
   useEffect(() => {
+    teamsCursor.current = null;
+    knownTeamIds.current = new Set();
+    setTeams([]);
+    setProgress({});
+
     const loadData = async () => {
       if (!inviteCode) return;
       try {
-        const [quizData, teamsData] = await Promise.all([
+        const [quizData] = await Promise.all([
           quizApi.getQuiz(inviteCode),
-          quizApi.getTeams(inviteCode),
+          loadNewTeams(),
         ]);
         setQuiz(quizData);
-        setTeams(teamsData);
 
         if (quizData.status === 'in_progress') {
           try {
@@ -51,14 +82,23 @@ const HostDashboard: React.FC = () => {
   useEffect(() => {
     if (!inviteCode) return;
 
-    const client = new WebSocketClient(inviteCode);
+    const client = new WebSocketClient(inviteCode, 'host');
     client.onMessage((message) => {
-      if (message.type === 'team_joined') {
-        // Reload teams
-        quizApi.getTeams(inviteCode).then(setTeams);
+      if (message.type === 'team_joined' || message.type === 'teams_imported' || message.type === 'snapshot') {
+        // Load newly joined teams
+        loadNewTeams();
       } else if (message.type === 'question_changed') {
         // Reload current question
         quizApi.getCurrentQuestion(inviteCode).then(setCurrentQuestion);
+      } else if (message.type === 'answers_progress') {
+        // Each event carries the full counts of the questions it lists
+        setProgress((current) => {
+          const next = { ...current };
+          message.questions.forEach((question) => {
+            next[question.question_id] = question;
+          });
+          return next;
+        });
       }
     });
 
@@ -176,6 +216,14 @@ const HostDashboard: React.FC = () => {
                 questionNumber={questionIndex + 1}
                 totalQuestions={totalQuestions}
               />
+              <AnswerProgress
+                questions={quiz.questions.some((q) => q.id === currentQuestion.id)
+                  ? quiz.questions
+                  : [...quiz.questions, currentQuestion]}
+                teams={teams}
+                progress={progress}
+                currentQuestionId={currentQuestion.id}
+              />
               <button
                 className="btn btn-primary"
                 onClick={handleNextQuestion}
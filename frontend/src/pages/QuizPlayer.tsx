@@ -22,24 +22,28 @@ const QuizPlayer: React.FC = () => {
   const [statistics, setStatistics] = useState<StatisticsResponse | null>(null);
   const [loadingStatistics, setLoadingStatistics] = useState(false);
 
+  const showQuestion = (question: QuestionResponse, quizData?: any) => {
+    setCurrentQuestion(question);
+    
+    // Clear statistics if not the last question
+    if (!question.is_last) {
+      setStatistics(null);
+      setLoadingStatistics(false);
+    }
+    
+    // Find question index
+    const quizToUse = quizData || quiz;
+    if (quizToUse) {
+      const index = quizToUse.questions.findIndex((q: QuestionResponse) => q.id === question.id);
+      setQuestionIndex(index);
+    }
+  };
+
   const loadCurrentQuestion = async (quizData?: any) => {
     if (!inviteCode) return;
     try {
       const question = await quizApi.getCurrentQuestion(inviteCode);
-      setCurrentQuestion(question);
-      
-      // Clear statistics if not the last question
-      if (!question.is_last) {
-        setStatistics(null);
-        setLoadingStatistics(false);
-      }
-      
-      // Find question index
-      const quizToUse = quizData || quiz;
-      if (quizToUse) {
-        const index = quizToUse.questions.findIndex((q: QuestionResponse) => q.id === question.id);
-        setQuestionIndex(index);
-      }
+      showQuestion(question, quizData);
     } catch (error) {
       console.error('Error loading current question:', error);
     }
@@ -69,18 +73,39 @@ const QuizPlayer: React.FC = () => {
   useEffect(() => {
     if (!inviteCode) return;
 
-    const client = new WebSocketClient(inviteCode);
+    // Frames carry the current question, so there's no need to fetch it
+    const client = new WebSocketClient(inviteCode, 'participant', 'full', participantId);
     client.onMessage((message) => {
-      if (message.type === 'quiz_started') {
+      if (message.type === 'snapshot') {
+        // Sent on (re)connect when missed events can't be replayed
+        setQuizStatus(message.status);
+        if (message.status === 'in_progress') {
+          if (message.question) {
+            showQuestion(message.question);
+          } else {
+            loadCurrentQuestion();
+          }
+        } else if (message.status === 'completed') {
+          navigate(`/statistics/${inviteCode}`);
+        }
+      } else if (message.type === 'quiz_started') {
         setQuizStatus('in_progress');
-        loadCurrentQuestion();
+        if (message.question) {
+          showQuestion(message.question);
+        } else {
+          loadCurrentQuestion();
+        }
       } else if (message.type === 'question_changed') {
         setSubmitted(false);
         setTextAnswer('');
         setSelectedOptions([]);
         setStatistics(null);
         setLoadingStatistics(false);
-        loadCurrentQuestion();
+        if (message.question) {
+          showQuestion(message.question);
+        } else {
+          loadCurrentQuestion();
+        }
       } else if (message.type === 'quiz_completed') {
         setQuizStatus('completed');
         navigate(`/statistics/${inviteCode}`);
@@ -96,7 +121,7 @@ const QuizPlayer: React.FC = () => {
     return () => {
       client.disconnect();
     };
-  }, [inviteCode]);
+  }, [inviteCode, participantId]);
 
   const handleSubmitAnswer = async () => {
     if (!inviteCode || !participantId || !currentQuestion) return;
@@ -112,7 +137,12 @@ const QuizPlayer: React.FC = () => {
     }
 
     try {
-      await quizApi.submitAnswer(inviteCode, participantId, answerData);
+      if (wsClient && wsClient.isOpen()) {
+        // Skips a separate HTTP request; the server replies on the socket
+        await wsClient.submitAnswer(participantId, answerData);
+      } else {
+        await quizApi.submitAnswer(inviteCode, participantId, answerData);
+      }
       setSubmitted(true);
 
       // If this is the last question, load statistics
@@ -94,6 +94,23 @@ export interface AnswerResponse {
   answered_at: string;
 }
 
+export interface AnswerBatchItem extends AnswerCreate {
+  participant_id: string;
+}
+
+export interface AnswerBatchItemResult {
+  participant_id: string;
+  question_id: string;
+  status_code: number;
+  answer?: AnswerResponse;
+  error?: string;
+}
+
+export interface AnswerBatchResult {
+  stored: number;
+  results: AnswerBatchItemResult[];
+}
+
 export interface StatisticsResponse {
   question_id: string;
   question_text: string;
@@ -129,6 +146,23 @@ export const quizApi = {
     return response.data;
   },
 
+  // Teams that joined after `after` (a cursor from a previous call), in join order,
+  // and the number of teams in the whole roster
+  getNewTeams: async (
+    inviteCode: string,
+    after: string | null
+  ): Promise<{ teams: TeamResponse[]; cursor: string | null; total: number | null }> => {
+    const response = await api.get<TeamResponse[]>(`/api/quizzes/${inviteCode}/teams`, {
+      params: after ? { after } : {},
+    });
+    const total = response.headers['x-total-count'];
+    return {
+      teams: response.data,
+      cursor: response.headers['x-next-cursor'] ?? after,
+      total: total !== undefined ? Number(total) : null,
+    };
+  },
+
   startQuiz: async (inviteCode: string): Promise<void> => {
     await api.post(`/api/quizzes/${inviteCode}/start`);
   },
@@ -150,6 +184,14 @@ export const quizApi = {
     return response.data;
   },
 
+  submitAnswers: async (inviteCode: string, answers: AnswerBatchItem[]): Promise<AnswerBatchResult> => {
+    const response = await api.post<AnswerBatchResult>(
+      `/api/quizzes/${inviteCode}/answers/batch`,
+      { answers }
+    );
+    return response.data;
+  },
+
   getStatistics: async (inviteCode: string): Promise<StatisticsResponse> => {
     const response = await api.get<StatisticsResponse>(`/api/quizzes/${inviteCode}/statistics`);
     return response.data;
@@ -1,27 +1,106 @@
+import { AnswerCreate, AnswerResponse, QuestionResponse } from './api';
+
+export interface QuizSnapshot {
+  type: 'snapshot';
+  epoch: string;
+  seq: number;
+  status: string;
+  current_question_order: number | null;
+  team_count: number;
+  question?: QuestionResponse;
+}
+
 export type WebSocketMessage = 
-  | { type: 'quiz_started'; message: string }
-  | { type: 'question_changed'; question_order: number; message: string }
-  | { type: 'team_joined'; team_name: string; message: string }
-  | { type: 'answer_submitted'; participant_id: string; message: string }
-  | { type: 'quiz_completed'; message: string }
-  | { type: 'pong'; message: string };
+  | QuizSnapshot
+  | { type: 'resumed'; epoch: string; seq: number }
+  | { type: 'quiz_started'; message?: string; question?: QuestionResponse }
+  | { type: 'question_changed'; question_order: number; message?: string; question?: QuestionResponse }
+  | { type: 'team_joined'; team_name: string; message?: string }
+  | { type: 'teams_imported'; team_count: number; message?: string }
+  | { type: 'answers_progress'; questions: QuestionProgress[] }
+  | { type: 'quiz_completed'; message?: string }
+  | { type: 'answer_ack'; request_id: string; answer: AnswerResponse }
+  | { type: 'error'; request_id?: string; status_code: number; detail: unknown }
+  | { type: 'ping' }
+  | { type: 'pong'; message?: string };
+
+export interface TeamProgress {
+  team_id: string;
+  answered: number;
+  total: number;
+}
+
+export interface QuestionProgress {
+  question_id: string;
+  answered: number;
+  total: number;
+  teams: TeamProgress[];
+}
+
+// Spectators receive quiz events but can't submit answers
+export type ConnectionRole = 'host' | 'participant' | 'spectator';
+
+// 'full' embeds the current question in quiz_started/question_changed frames
+export type PayloadMode = 'lean' | 'full';
+
+// Offered as a WebSocket subprotocol: frames are arrays of messages without the `message` texts.
+// A server that doesn't support it accepts without a subprotocol and sends plain JSON frames.
+const COMPACT_PROTOCOL = 'quiz.compact.v2';
+
+export class SocketRequestError extends Error {
+  statusCode: number;
+
+  constructor(statusCode: number, detail: unknown) {
+    super(typeof detail === 'string' ? detail : JSON.stringify(detail));
+    this.statusCode = statusCode;
+  }
+}
+
+interface PendingRequest {
+  resolve: (answer: AnswerResponse) => void;
+  reject: (error: Error) => void;
+}
 
 export class WebSocketClient {
   private ws: WebSocket | null = null;
   private inviteCode: string;
+  private role: ConnectionRole;
+  private payload: PayloadMode;
+  private participantId?: string;
   private onMessageCallback: ((message: WebSocketMessage) => void) | null = null;
   private reconnectAttempts = 0;
   private maxReconnectAttempts = 5;
+  private nextRequestId = 0;
+  private pendingRequests = new Map<string, PendingRequest>();
+  // Position in the quiz's broadcast stream, sent on reconnect to get only the missed events
+  private epoch: string | null = null;
+  private lastSeq: number | null = null;
 
-  constructor(inviteCode: string) {
+  constructor(
+    inviteCode: string,
+    role: ConnectionRole = 'participant',
+    payload: PayloadMode = 'lean',
+    participantId?: string
+  ) {
     this.inviteCode = inviteCode;
+    this.role = role;
+    this.payload = payload;
+    this.participantId = participantId;
   }
 
   connect(): Promise<void> {
     return new Promise((resolve, reject) => {
       const apiUrl = process.env.REACT_APP_API_URL || 'http://localhost:8000';
       const wsUrl = apiUrl.replace('http://', 'ws://').replace('https://', 'wss://');
-      this.ws = new WebSocket(`${wsUrl}/ws/${this.inviteCode}`);
+      // Identifies the socket as the participant's, so it receives messages meant for them or their team
+      const participant = this.participantId ? `&participant_id=${this.participantId}` : '';
+      const resume = this.epoch !== null && this.lastSeq !== null
+        ? `&epoch=${this.epoch}&last_seq=${this.lastSeq}`
+        : '';
+      this.ws = new WebSocket(
+        `${wsUrl}/ws/${this.inviteCode}?role=${this.role}&payload=${this.payload}${participant}${resume}`,
+        [COMPACT_PROTOCOL]
+      );
 
       this.ws.onopen = () => {
         this.reconnectAttempts = 0;
@@ -30,10 +109,10 @@ export class WebSocketClient {
 
       this.ws.onmessage = (event) => {
         try {
-          const message = JSON.parse(event.data) as WebSocketMessage;
-          if (this.onMessageCallback) {
-            this.onMessageCallback(message);
-          }
+          const data = JSON.parse(event.data);
+          const compact = (event.target as WebSocket).protocol === COMPACT_PROTOCOL;
+          const messages = (compact ? data : [data]) as WebSocketMessage[];
+          messages.forEach((message) => this.dispatch(message));
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
         }
@@ -46,6 +125,7 @@ export class WebSocketClient {
 
       this.ws.onclose = () => {
         this.ws = null;
+        this.rejectPendingRequests();
         if (this.reconnectAttempts < this.maxReconnectAttempts) {
           this.reconnectAttempts++;
           setTimeout(() => this.connect(), 1000 * this.reconnectAttempts);
@@ -65,6 +145,78 @@ export class WebSocketClient {
     this.onMessageCallback = callback;
   }
 
+  isOpen(): boolean {
+    return this.ws !== null && this.ws.readyState === WebSocket.OPEN;
+  }
+
+  // Submit an answer over the socket; resolves with the stored answer once the server acks it
+  submitAnswer(participantId: string, answer: AnswerCreate): Promise<AnswerResponse> {
+    if (!this.ws || !this.isOpen()) {
+      return Promise.reject(new Error('WebSocket is not connected'));
+    }
+    const requestId = String(this.nextRequestId++);
+    const ws = this.ws;
+    return new Promise((resolve, reject) => {
+      this.pendingRequests.set(requestId, { resolve, reject });
+      ws.send(JSON.stringify({
+        type: 'submit_answer',
+        request_id: requestId,
+        participant_id: participantId,
+        ...answer,
+      }));
+    });
+  }
+
+  private dispatch(message: WebSocketMessage): void {
+    if (message.type === 'snapshot' || message.type === 'resumed') {
+      // Sequence numbers of another epoch (e.g. before a server restart) aren't comparable
+      this.lastSeq = message.epoch === this.epoch
+        ? Math.max(this.lastSeq ?? 0, message.seq)
+        : message.seq;
+      this.epoch = message.epoch;
+    } else {
+      // Broadcasts carry their sequence number; direct replies don't
+      const seq = (message as { seq?: number }).seq;
+      if (typeof seq === 'number') {
+        this.lastSeq = seq;
+      }
+    }
+    if (message.type === 'resumed') {
+      return;
+    }
+    if (message.type === 'ping') {
+      // Heartbeat: the server closes connections that stay silent
+      this.send(JSON.stringify({ type: 'pong' }));
+      return;
+    }
+    if (message.type === 'answer_ack' || (message.type === 'error' && message.request_id)) {
+      this.settleRequest(message);
+      return;
+    }
+    if (this.onMessageCallback) {
+      this.onMessageCallback(message);
+    }
+  }
+
+  private settleRequest(message: WebSocketMessage): void {
+    if (message.type !== 'answer_ack' && message.type !== 'error') return;
+    const requestId = message.request_id;
+    if (requestId === undefined) return;
+    const pending = this.pendingRequests.get(requestId);
+    if (!pending) return;
+    this.pendingRequests.delete(requestId);
+    if (message.type === 'answer_ack') {
+      pending.resolve(message.answer);
+    } else {
+      pending.reject(new SocketRequestError(message.status_code, message.detail));
+    }
+  }
+
+  private rejectPendingRequests(): void {
+    this.pendingRequests.forEach((pending) => pending.reject(new Error('WebSocket connection closed')));
+    this.pendingRequests.clear();
+  }
+
   send(message: string): void {
     if (this.ws && this.ws.readyState === WebSocket.OPEN) {
       this.ws.send(message);